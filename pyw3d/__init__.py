@@ -18,6 +18,7 @@
 """A module for working with W3D Writing projects
 """
 import os
+import hashlib
 import json
 import logging
 import logging.handlers
@@ -32,6 +33,34 @@ LOGGER.addHandler(term_handler)
 LOGGER.setLevel(logging.WARNING)
 
 
+def source_digest():
+    """Return hex sha256 digest of the source of every pyw3d module
+
+    All Blender objects, logic and scripts in an exported project are
+    generated by this source, so caches of exported or loaded projects are
+    keyed on this digest rather than on the package version, which is not
+    changed by every edit that alters the output."""
+    try:
+        return source_digest._digest
+    except AttributeError:
+        pass
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for directory, subdirectories, filenames in os.walk(package_dir):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(directory, filename)
+            digest.update(
+                os.path.relpath(path, package_dir).replace(
+                    os.sep, "/").encode("utf-8"))
+            with open(path, "rb") as source_file:
+                digest.update(hashlib.sha256(source_file.read()).digest())
+    source_digest._digest = digest.hexdigest()
+    return source_digest._digest
+
+
 class W3DConfigError(Exception):
     """Exception thrown when an error is detected in the configuration or
     installation of Writing3D
@@ -142,6 +171,7 @@ if (
         json.dump(W3D_CONFIG, w3d_config_file)
 
 from . import project
+from . import project_cache
 from . import features
 from . import objects
 from . import psys
@@ -151,6 +181,8 @@ from . import errors
 from . import validators
 from . import xml_tools
 from . import structs
+from . import interchange
+from . import build_cache
 from . import path
 from . import activators
 from . import triggers
@@ -173,4 +205,4 @@ from .actions import W3DAction, ObjectAction, GroupAction, SoundAction, \
     MoveVRAction, TimelineAction, EventTriggerAction, W3DResetAction
 from .groups import W3DGroup
 from .sounds import W3DSound
-from .w3d_export_tools import export_to_blender
+from .w3d_export_tools import export_to_blender, export_many, BlenderWorker
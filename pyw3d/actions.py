@@ -30,7 +30,7 @@ from .validators import OptionValidator, IsNumeric,\
     ListValidator, IsBoolean, FeatureValidator, ReferenceValidator,\
     ValidPyString, IsInteger
 from .errors import BadW3DXML, InvalidArgument, ConsistencyError
-from .xml_tools import bool2text, text2bool, text2tuple
+from .xml_tools import bool2text, text2bool, text2ints3
 from .names import generate_blender_object_name, generate_group_name,\
     generate_blender_sound_name, generate_relative_to_name
 from .metaclasses import SubRegisteredClass
@@ -57,6 +57,15 @@ class W3DAction(W3DFeature, metaclass=SubRegisteredClass):
         super().__init__(*args, **kwargs)
         self.actuators = []
 
+    def table_row(self, time_condition=0):
+        """Return row of an action table describing this action for the
+        runtime in w3d_actions.py, or None if it must be generated as Python
+        logic
+
+        :param float time_condition: Time at which action should start
+        """
+        return None
+
     @staticmethod
     def fromXML(action_root):
         """Create W3DAction of appropriate subclass given xml root for any
@@ -200,6 +209,37 @@ def generate_object_action_logic(
     return start_text + cont_text + end_text
 
 
+UNTABULATED_CHANGES = ("placement", "sound_change", "link_change")
+"""Changes which cannot be described by a row of an action table"""
+
+
+def generate_table_row(
+        object_action, time_condition=0, object_name=None, group_name=None):
+    """Return row of an action table describing action for the runtime in
+    w3d_actions.py, or None if it makes any of UNTABULATED_CHANGES
+
+    Rows are tuples of start time, end time, Blender object name, group name
+    (exactly one of which is None), duration, visibility, color (with
+    channels between 0 and 1) and scale, with None for any change not made.
+
+    :param W3DAction object_action: An ObjectAction or GroupAction
+    :param float time_condition: Time at which action should start
+    :param str object_name: Name of Blender object to change
+    :param str group_name: Name of group in group_defs.py to change
+    """
+    for key in UNTABULATED_CHANGES:
+        if not object_action.is_default(key):
+            return None
+    color = None
+    if not object_action.is_default("color"):
+        color = [channel / 255. for channel in object_action["color"]]
+    return (
+        time_condition, object_action["duration"] + time_condition,
+        object_name, group_name, object_action["duration"],
+        object_action["visible"], color, object_action["scale"]
+    )
+
+
 class ObjectAction(W3DAction):
     """An action causing a change to a W3DObject
 
@@ -325,7 +365,7 @@ class ObjectAction(W3DAction):
         node = trans_root.find("Color")
         if node is not None:
             try:
-                new_action["color"] = text2tuple(node.text, evaluator=int)
+                new_action["color"] = text2ints3(node.text)
             except InvalidArgument:
                 new_action["color"] = (255, 255, 255)
         node = trans_root.find("Scale")
@@ -352,10 +392,15 @@ class ObjectAction(W3DAction):
 
         return new_action
 
+    def table_row(self, time_condition=0):
+        return generate_table_row(
+            self, time_condition,
+            object_name=generate_blender_object_name(self["object_name"]))
+
     def _blender_object_selection(self, offset=0):
         blender_object_name = generate_blender_object_name(self["object_name"])
         self.selection_offset = 0
-        return ["{}blender_object = scene.objects['{}']".format(
+        return ["{}blender_object = scene_object('{}')".format(
             "    " * offset, blender_object_name)]
 
     def generate_blender_logic(
@@ -503,7 +548,7 @@ class GroupAction(W3DAction):
         node = trans_root.find("Color")
         if node is not None:
             try:
-                new_action["color"] = text2tuple(node.text, evaluator=int)
+                new_action["color"] = text2ints3(node.text)
             except InvalidArgument:
                 new_action["color"] = (255, 255, 255)
         node = trans_root.find("Scale")
@@ -524,6 +569,13 @@ class GroupAction(W3DAction):
 
         return new_action
 
+    def table_row(self, time_condition=0):
+        if self["choose_random"]:
+            return None
+        return generate_table_row(
+            self, time_condition,
+            group_name=generate_group_name(self["group_name"]))
+
     def _blender_object_selection(self, offset=0):
         blender_group_name = generate_group_name(self["group_name"])
         if self["choose_random"]:
@@ -534,15 +586,15 @@ class GroupAction(W3DAction):
                     "    " * offset),
                 "{}    own['random_choice'] = random.choice({})".format(
                     "    " * offset, blender_group_name),
-                "{}blender_object = scene.objects[".format("    " * offset),
-                "{}    own['random_choice']]".format("    " * offset)
+                "{}blender_object = scene_object(".format("    " * offset),
+                "{}    own['random_choice'])".format("    " * offset)
             ]
             self.selection_offset = 0
         else:
             script_text = [
                 "{}for object_name in {}:".format(
                     "    " * offset, blender_group_name),
-                "{}    blender_object = scene.objects[object_name]".format(
+                "{}    blender_object = scene_object(object_name)".format(
                     "    " * offset)
             ]
             self.selection_offset = 1
@@ -907,7 +959,7 @@ class MoveVRAction(W3DAction):
 
     def _blender_object_selection(self, offset=0):
         self.selection_offset = 0
-        return ["{}blender_object = scene.objects['VRCENTER']".format(
+        return ["{}blender_object = scene_object('VRCENTER')".format(
             "    " * offset)]
 
     def generate_blender_logic(
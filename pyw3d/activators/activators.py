@@ -19,11 +19,11 @@
 """
 import logging
 from pyw3d.errors import EBKAC
+from pyw3d.logic_bricks import add_sensor, add_python_controller, \
+    add_game_property
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     LOGGER.debug(
         "Module bpy not found. Loading pyw3d.timeline as standalone")
@@ -50,6 +50,7 @@ class Activator(object):
         self.script_header = """
 import bge
 from angles import *
+from handles import scene_object
 from w3d_settings import *
 from group_defs import *
 import mathutils
@@ -72,6 +73,8 @@ def activate(cont):
         own['start_time'] = monotonic()
         data["active_actions"] = {}
         data["complete_actions"] = {}
+        data["next_action"] = 0
+        data["running_actions"] = []
         own['offset_time'] = 0
         own['status'] = 'Continue'
     if status == 'Stop':
@@ -107,11 +110,6 @@ def activate(cont):
         names.py"""
         return self.name_string
 
-    def select_base_object(self):
-        """Select base_object in Blender for modifications"""
-        bpy.context.scene.objects.active = self.base_object
-        return self.base_object
-
     def create_status_property(self, initial_value="Stop"):
         """Creates a property called "status" which defines whether the
         activator is in a "Start", "Stop", or "Continue" state
@@ -120,13 +118,8 @@ def activate(cont):
         an activator, if possible. Continue means that the actions are ongoing,
         and Start is used to initially start the actions associated with this
         activator"""
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'STRING', 'name': 'status'}
-        )
-        self.base_object.game.properties["status"].value = initial_value
-        return self.base_object.game.properties["status"]
+        return add_game_property(
+            self.base_object, "STRING", "status", initial_value)
 
     def create_enabled_property(self, initial_value=True):
         """Creates a property called "enabled" which defines whether or not
@@ -136,13 +129,8 @@ def activate(cont):
         start an activator. It is NOT checked by the activator itself. This is
         to allow the activator to be immediately disabled after activation but
         still process the remainder of its actions"""
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'BOOL', 'name': 'enabled'}
-        )
-        self.base_object.game.properties["enabled"].value = initial_value
-        return self.base_object.game.properties["enabled"]
+        return add_game_property(
+            self.base_object, "BOOL", "enabled", initial_value)
 
     def create_status_sensors(self):
         """Creates sensors to detect change in "status" of activator
@@ -155,44 +143,20 @@ def activate(cont):
         LOGGER.debug(
             "Creating status sensors for {}".format(self.name_string)
         )
-        self.select_base_object()
+        base_object = self.base_object
         # Create property sensor to initiate actions
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'start_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "start_sensor"
-        start_sensor = self.base_object.game.sensors["start_sensor"]
+        start_sensor = add_sensor(base_object, "PROPERTY", "start_sensor")
         start_sensor.property = "status"
         start_sensor.value = "Start"
 
         # Create property sensor to activate actions
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'active_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "active_sensor"
-        active_sensor = self.base_object.game.sensors["active_sensor"]
+        active_sensor = add_sensor(base_object, "PROPERTY", "active_sensor")
         active_sensor.use_pulse_true_level = True
         active_sensor.property = "status"
         active_sensor.value = "Continue"
 
         # Create property sensor to pause actions
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'stop_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "stop_sensor"
-        stop_sensor = self.base_object.game.sensors["stop_sensor"]
+        stop_sensor = add_sensor(base_object, "PROPERTY", "stop_sensor")
         stop_sensor.property = "status"
         stop_sensor.value = "Stop"
 
@@ -207,17 +171,8 @@ def activate(cont):
         LOGGER.debug(
             "Creating controller for {}".format(self.name_string)
         )
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'activate'
-            }
-        )
-        controller = self.base_object.game.controllers["activate"]
-        controller.mode = "MODULE"
-        controller.module = "{}.activate".format(self.name)
+        controller = add_python_controller(
+            self.base_object, "activate", "{}.activate".format(self.name))
         self.controller = controller
         return controller
 
@@ -22,7 +22,22 @@ from .activators import Activator
 
 
 class BlenderTimeline(Activator):
-    """Activates actions at specified times"""
+    """Activates actions at specified times
+
+    :param bool scheduled: If True, use the scheduled runtime described
+    below rather than checking the conditions of every action on every tick
+    :param bool tabulated: If True, describe actions which allow it by rows
+    of an action table interpreted by w3d_actions.py, rather than by
+    generated Python logic
+
+    With the scheduled runtime, the logic for each action is written to a
+    separate function, and the script keeps a list of actions sorted by start
+    time along with a heap of the indices of running actions. Each tick,
+    actions whose start time has passed are moved onto the heap, and only
+    the actions on the heap are run (in the same order as they would
+    otherwise be), so the cost of a tick depends on the number of running
+    actions rather than the length of the timeline.
+    """
 
     @property
     def name(self):
@@ -33,6 +48,10 @@ class BlenderTimeline(Activator):
             initial_value=("Stop", "Start")[self.start_immediately])
 
     def generate_action_logic(self):
+        if self.scheduled:
+            return self.generate_scheduled_logic()
+        if self.tabulated:
+            return self.generate_table_logic()
         action_logic = ["        # ACTION LOGIC BEGINS HERE"]
         action_index = 0
         for time, action in self.actions:
@@ -48,6 +67,101 @@ class BlenderTimeline(Activator):
         )
         return "\n".join(action_logic)
 
+    def _action_call(self, action_index):
+        """Return expression running the entry of ACTIONS with the given
+        index, which evaluates to True if the timeline must not be
+        stopped"""
+        if self.tabulated:
+            return "run_action(ACTIONS[{index}], {index}, cont, own, scene," \
+                " data, time)".format(index=action_index)
+        return "ACTIONS[{}](cont, own, scene, data, time)".format(
+            action_index)
+
+    def _action_definitions(self):
+        """Return lines defining ACTIONS, which holds a function (or, if
+        tabulated, possibly an action table row) for each action in order,
+        to be appended to the script's footer"""
+        definitions = ["", ""]
+        if self.tabulated:
+            definitions.append("from w3d_actions import run_action")
+        if self.scheduled:
+            definitions.append("import heapq")
+        entries = []
+        for action_index, (time, action) in enumerate(self.actions):
+            if self.tabulated:
+                row = action.table_row(time_condition=time)
+                if row is not None:
+                    entries.append(repr(row))
+                    continue
+            definitions.extend([
+                "",
+                "",
+                "def action_{}(cont, own, scene, data, time):".format(
+                    action_index),
+                "    stop_block = False"
+            ])
+            definitions.extend(
+                action.generate_blender_logic(
+                    time_condition=time,
+                    index_condition=action_index,
+                    offset=1)
+            )
+            definitions.append("    return stop_block")
+            entries.append("action_{}".format(action_index))
+        definitions.extend(["", "", "ACTIONS = ["])
+        definitions.extend("    {},".format(entry) for entry in entries)
+        definitions.append("]")
+        return definitions
+
+    def generate_table_logic(self):
+        """Return logic running every entry of ACTIONS in turn, adding the
+        definition of ACTIONS to the script's footer"""
+        action_logic = [
+            "        # ACTION LOGIC BEGINS HERE",
+            "        for action_index in range(len(ACTIONS)):",
+            "            if {}:".format(self._action_call("action_index")),
+            "                stop_block = True"
+        ]
+        self.script_footer = "\n".join([
+            self.script_footer.format(action_count=len(self.actions))
+        ] + self._action_definitions())
+        return "\n".join(action_logic)
+
+    def generate_scheduled_logic(self):
+        """Return logic for the scheduled runtime, adding definitions of the
+        per-action functions and schedule to the script's footer"""
+        action_logic = [
+            "        # ACTION LOGIC BEGINS HERE",
+            "        schedule_index = data['next_action']",
+            "        while (schedule_index < len(SCHEDULE) and",
+            "                SCHEDULE[schedule_index][0] <= time):",
+            "            heapq.heappush(",
+            "                data['running_actions'],"
+            " SCHEDULE[schedule_index][1])",
+            "            schedule_index += 1",
+            "        data['next_action'] = schedule_index",
+            "        running_actions = data['running_actions']",
+            "        still_running = []",
+            "        while running_actions:",
+            "            action_index = heapq.heappop(running_actions)",
+            "            if {}:".format(self._action_call("action_index")),
+            "                stop_block = True",
+            "            if action_index not in data['complete_actions']:",
+            "                still_running.append(action_index)",
+            "        data['running_actions'] = still_running  # Sorted, so a"
+            " heap"
+        ]
+        schedule = [
+            (time, action_index)
+            for action_index, (time, action) in enumerate(self.actions)
+        ]
+        self.script_footer = "\n".join(
+            [self.script_footer.format(action_count=len(self.actions))] +
+            self._action_definitions() +
+            ["SCHEDULE = {}".format(sorted(schedule))]
+        )
+        return "\n".join(action_logic)
+
     def get_actions(self):
         """Return a list of W3DActions that are controlled by this activator
 
@@ -59,6 +173,10 @@ class BlenderTimeline(Activator):
         all_actions = [action[1] for action in self.actions]
         return all_actions
 
-    def __init__(self, name, actions, start_immediately=False):
+    def __init__(
+            self, name, actions, start_immediately=False, scheduled=False,
+            tabulated=False):
         super(BlenderTimeline, self).__init__(name, actions)
         self.start_immediately = start_immediately
+        self.scheduled = scheduled
+        self.tabulated = tabulated
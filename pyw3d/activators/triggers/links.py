@@ -19,13 +19,13 @@
 """
 import logging
 from .triggers import BlenderTrigger
+from pyw3d.logic_bricks import add_sensor, add_python_controller, \
+    add_game_property
 from pyw3d.blender_scripts import DISABLE_LINK_SCRIPT, UNSELECT_LINK_SCRIPT,\
     SELECT_LINK_SCRIPT, ACTIVATE_LINK_SCRIPT
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     LOGGER.debug(
         "Module bpy not found. Loading pyw3d.timeline as standalone")
@@ -40,69 +40,21 @@ class BlenderClickTrigger(BlenderTrigger):
     def create_click_status_property(self):
         """Add property to track if link is disabled, unselected, selected, or
         activated"""
-        click_object = self.select_base_object()
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'STRING', 'name': 'click_status'}
-        )
-        click_object.game.properties["click_status"].value = "False"
-        return click_object.game.properties["click_status"]
+        return add_game_property(
+            self.base_object, "STRING", "click_status", "False")
 
     def create_click_status_sensors(self):
         """Add property sensors for click status"""
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'disabled_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "disabled_sensor"
-        click_sensor = self.base_object.game.sensors["disabled_sensor"]
-        click_sensor.property = "click_status"
-        click_sensor.value = "disabled"
-        self.disabled_sensor = click_sensor
-
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'unselected_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "unselected_sensor"
-        click_sensor = self.base_object.game.sensors["unselected_sensor"]
-        click_sensor.property = "click_status"
-        click_sensor.value = "unselected"
-        self.unselected_sensor = click_sensor
-
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'selected_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "selected_sensor"
-        click_sensor = self.base_object.game.sensors["selected_sensor"]
-        click_sensor.property = "click_status"
-        click_sensor.value = "selected"
-        self.selected_sensor = click_sensor
-
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'activated_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "activated_sensor"
-        click_sensor = self.base_object.game.sensors["activated_sensor"]
-        click_sensor.property = "click_status"
-        click_sensor.value = "activated"
-        self.activated_sensor = click_sensor
+        click_object = self.base_object
+        click_sensors = []
+        for status in ("disabled", "unselected", "selected", "activated"):
+            click_sensor = add_sensor(
+                click_object, "PROPERTY", "{}_sensor".format(status))
+            click_sensor.property = "click_status"
+            click_sensor.value = status
+            click_sensors.append(click_sensor)
+        (self.disabled_sensor, self.unselected_sensor,
+         self.selected_sensor, self.activated_sensor) = click_sensors
 
         return (self.disabled_sensor, self.unselected_sensor,
                 self.selected_sensor, self.activated_sensor)
@@ -110,58 +62,21 @@ class BlenderClickTrigger(BlenderTrigger):
     def create_click_status_controllers(self):
         """Add controllers to handle when click status changes
         """
-        click_object = self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'disabled_controller'
-            }
-        )
-        controller = click_object.game.controllers["disabled_controller"]
-        controller.mode = "MODULE"
-        controller.module = "{}.disable_link".format(self.name)
-        controller.link(sensor=self.disabled_sensor)
-        self.disabled_controller = controller
-
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'unselected_controller'
-            }
-        )
-        controller = click_object.game.controllers["unselected_controller"]
-        controller.mode = "MODULE"
-        controller.module = "{}.unselect_link".format(self.name)
-        controller.link(sensor=self.unselected_sensor)
-        self.unselected_controller = controller
-
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'selected_controller'
-            }
-        )
-        controller = click_object.game.controllers["selected_controller"]
-        controller.mode = "MODULE"
-        controller.module = "{}.select_link".format(self.name)
-        controller.link(sensor=self.selected_sensor)
-        self.selected_controller = controller
-
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'activated_controller'
-            }
-        )
-        controller = click_object.game.controllers["activated_controller"]
-        controller.mode = "MODULE"
-        controller.module = "{}.activate_link".format(self.name)
-        controller.link(sensor=self.activated_sensor)
-        self.activated_controller = controller
+        click_object = self.base_object
+        click_controllers = []
+        for status, sensor, function in (
+                ("disabled", self.disabled_sensor, "disable_link"),
+                ("unselected", self.unselected_sensor, "unselect_link"),
+                ("selected", self.selected_sensor, "select_link"),
+                ("activated", self.activated_sensor, "activate_link")):
+            controller = add_python_controller(
+                click_object, "{}_controller".format(status),
+                "{}.{}".format(self.name, function))
+            controller.link(sensor=sensor)
+            click_controllers.append(controller)
+        (self.disabled_controller, self.unselected_controller,
+         self.selected_controller, self.activated_controller) = \
+            click_controllers
 
         return (
             self.disabled_controller, self.unselected_controller,
@@ -171,29 +86,18 @@ class BlenderClickTrigger(BlenderTrigger):
     def create_click_count_property(self):
         """Add property to keep track of how many times link has been
         clicked"""
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'INT', 'name': 'clicks'}
-        )
-        self.base_object.game.properties["clicks"].value = 0
-        return self.base_object.game.properties["clicks"]
+        return add_game_property(self.base_object, "INT", "clicks", 0)
 
     def create_clickable_property(self):
         """Add property to track if object is clickable
 
         Note: In order to make an object unclickable, this property should be
         *deleted*, not merely set to False"""
-        click_object = self.select_base_object()
+        click_object = self.base_object
         if (
                 (not click_object.hide_render) and
-                self.base_object.game.properties['enabled']):
-            BPY_OPS_CALL(
-                "object.game_property_new", None,
-                {'type': 'BOOL', 'name': 'clickable'}
-            )
-            click_object.game.properties["clickable"].value = True
-            return click_object.game.properties["clickable"]
+                click_object.game.properties['enabled']):
+            return add_game_property(click_object, "BOOL", "clickable", True)
         return None
 
     def create_blender_objects(self):
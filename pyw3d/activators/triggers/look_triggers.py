@@ -22,11 +22,11 @@ import logging
 from pyw3d.names import generate_blender_object_name
 from pyw3d.errors import EBKAC
 from .triggers import BlenderTrigger
+from pyw3d.logic_bricks import add_sensor, add_controller, \
+    add_python_controller, add_actuator, add_game_property
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     LOGGER.debug(
         "Module bpy not found. Loading "
@@ -52,42 +52,18 @@ class BlenderLookAtTrigger(BlenderTrigger):
         trigger.This allows camera to only go through costly detection actions
         when the trigger is enabled.
         """
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'enabled_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "enabled_sensor"
-        enabled_sensor = self.base_object.game.sensors["enabled_sensor"]
+        base_object = self.base_object
+        enabled_sensor = add_sensor(base_object, "PROPERTY", "enabled_sensor")
         enabled_sensor.property = "enabled"
         enabled_sensor.evaluation_type = "PROPCHANGED"
 
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'LOGIC_AND', 'object': self.name,
-                'name': 'enable'
-            }
-        )
-        controller = self.base_object.game.controllers["enable"]
+        controller = add_controller(base_object, "LOGIC_AND", "enable")
 
-        camera_object = self.select_camera()
-        BPY_OPS_CALL(
-            "logic.actuator_add", None,
-            {
-                'type': 'PROPERTY', 'object': 'CAMERA',
-                'name': self.name
-            }
-        )
-        camera_object.game.actuators[-1].name = self.name
-        property_copier = camera_object.game.actuators[self.name]
+        property_copier = add_actuator(
+            self.select_camera(), "PROPERTY", self.name)
         property_copier.mode = "COPY"
         property_copier.property = self.name
-        property_copier.object = self.base_object
+        property_copier.object = base_object
         property_copier.object_property = "enabled"
 
         return (enabled_sensor, controller, property_copier)
@@ -102,22 +78,10 @@ class BlenderLookAtTrigger(BlenderTrigger):
         """
         camera_object = self.select_camera()
         # Property on camera to keep track of when trigger is enabled
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'BOOL', 'name': self.name}
-        )
-        camera_object.game.properties[
-            self.name].value = self.enable_immediately
+        add_game_property(
+            camera_object, "BOOL", self.name, self.enable_immediately)
         # Sensor to fire continuously while trigger is enabled
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': 'CAMERA',
-                'name': self.name
-            }
-        )
-        camera_object.game.sensors[-1].name = self.name
-        camera_enable_sensor = camera_object.game.sensors[self.name]
+        camera_enable_sensor = add_sensor(camera_object, "PROPERTY", self.name)
         camera_enable_sensor.use_pulse_true_level = True
         camera_enable_sensor.tick_skip = 0
         camera_enable_sensor.property = self.name
@@ -125,18 +89,8 @@ class BlenderLookAtTrigger(BlenderTrigger):
         self.camera_enable_sensor = camera_enable_sensor
 
         # Create controller to detect trigger events
-        camera_object = self.select_camera()
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': 'CAMERA',
-                'name': self.name
-            }
-        )
-        camera_object.game.controllers[-1].name = self.name
-        controller = camera_object.game.controllers[self.name]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
+        add_python_controller(
+            camera_object, self.name, "{}.detect_event".format(self.name))
 
         return camera_object
 
@@ -186,7 +140,7 @@ class BlenderPointTrigger(BlenderLookAtTrigger):
             "\ndef detect_event(cont):",
             "    scene = bge.logic.getCurrentScene()",
             "    own = cont.owner",
-            "    trigger = scene.objects['{}']".format(
+            "    trigger = scene_object('{}')".format(
                 self.name),
             "    # Following is total hack since pointInsideFrustum seems to",
             "    # give false positive on first frame in certain",
@@ -228,7 +182,7 @@ class BlenderDirectionTrigger(BlenderLookAtTrigger):
             "    target_dir = mathutils.Vector({})".format(
                 tuple(self.direction)),
             "    angle = abs(cam_dir.angle(target_dir, 3.14))",
-            "    trigger = scene.objects['{}']".format(
+            "    trigger = scene_object('{}')".format(
                 self.name),
             "    if (angle < {}".format(math.radians(self.angle)),
             "            and trigger['enabled'] and",
@@ -260,9 +214,9 @@ class BlenderLookObjectTrigger(BlenderLookAtTrigger):
             "\ndef detect_event(cont):",
             "    scene = bge.logic.getCurrentScene()",
             "    own = cont.owner",
-            "    position = scene.objects['{}'].position".format(
+            "    position = scene_object('{}').position".format(
                 self.look_at_object),
-            "    trigger = scene.objects['{}']".format(
+            "    trigger = scene_object('{}')".format(
                 self.name),
             "    # Following is total hack since pointInsideFrustum seems to",
             "    # give false positive on first frame in certain",
@@ -22,10 +22,9 @@ import logging
 LOGGER = logging.getLogger("pyw3d")
 from pyw3d.errors import EBKAC
 from .triggers import BlenderTrigger
+from pyw3d.logic_bricks import add_sensor, add_python_controller
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     LOGGER.debug(
         "Module bpy not found. Loading "
@@ -41,20 +40,14 @@ class BlenderObjectPositionTrigger(BlenderTrigger):
     :param bool detect_any: True if trigger should activate when any
     specified object passes the box's boundaries as specified, False if
     trigger should activate when ALL specified objects have done so
+    :param bool indexed: If True, the box is checked by the shared script of
+    :py:mod:`pyw3d.event_boxes` rather than by a controller of this trigger
     """
 
     def create_enabled_sensor(self):
         """Add a sensor to fire continuously while trigger is enabled"""
-        self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'enabled_sensor'
-            }
-        )
-        self.base_object.game.sensors[-1].name = "enabled_sensor"
-        enable_sensor = self.base_object.game.sensors["enabled_sensor"]
+        enable_sensor = add_sensor(
+            self.base_object, "PROPERTY", "enabled_sensor")
         enable_sensor.use_pulse_true_level = True
         enable_sensor.tick_skip = 0
         enable_sensor.property = "enabled"
@@ -65,17 +58,8 @@ class BlenderObjectPositionTrigger(BlenderTrigger):
 
     def create_detection_controller(self):
         """Add a controller for detecting specified event"""
-
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'detect'
-            }
-        )
-        controller = self.base_object.game.controllers["detect"]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
+        controller = add_python_controller(
+            self.base_object, "detect", "{}.detect_event".format(self.name))
         self.detect_controller = controller
         return controller
 
@@ -94,26 +78,34 @@ class BlenderObjectPositionTrigger(BlenderTrigger):
     def generate_detection_logic(self):
         """Add a function to Python control script to detect user position
         """
+        if self.indexed:
+            return ""
 
+        if self.box["direction"] == "Inside":
+            condition = ("inside_count == len(all_objects)", "inside_count")[
+                self.detect_any]
+        else:
+            condition = (
+                "not inside_count", "inside_count < len(all_objects)")[
+                    self.detect_any]
         detection_logic = [
             "\ndef detect_event(cont):",
-            "    scene = bge.logic.getCurrentScene()",
             "    own = cont.owner",
             "    corners = {}".format(
-                zip(self["box"]["corner1"], self["box"]["corner2"])),
+                list(zip(self.box["corner1"], self.box["corner2"]))),
             "    all_objects = {}".format(self.objects_string),
-            "    all_objects = ["
-            "scene.objects[object_name] for object_name in all_objects]",
-            "    in_region = {}".format(not self.detect_any),
-            "    for object_ in all_objects:",
-            "        position = object_.position",
-            "        in_region = (in_region {}".format(
-                ("or", "and")[not self.detect_any]),
-            "            {}(position[i] < min(corners[i]) or".format(
-                ("", "not ")[self.box["direction"] == "Inside"]),
-            "               position[i] > max(corners[i])))",
-            "    if (",
-            "            in_region and own['enabled'] and",
+            "    inside_count = 0",
+            "    for object_name in all_objects:",
+            "        position = scene_object(object_name).position",
+            "        for i in range({}):".format(
+                (3, 2)[self.box["ignore_y"]]),
+            "            if (",
+            "                    position[i] < min(corners[i]) or",
+            "                    position[i] > max(corners[i])):",
+            "                break",
+            "        else:",
+            "            inside_count += 1",
+            "    if ({} and own['enabled'] and".format(condition),
             "            own['status'] == 'Stop'):",
             "        own['status'] = 'Start'"
         ]
@@ -122,19 +114,24 @@ class BlenderObjectPositionTrigger(BlenderTrigger):
 
     def create_blender_objects(self):
         super(BlenderObjectPositionTrigger, self).create_blender_objects()
-        self.create_enabled_sensor()
-        self.create_detection_controller()
+        if not self.indexed:
+            self.create_enabled_sensor()
+            self.create_detection_controller()
 
     def link_logic_bricks(self):
         super(BlenderObjectPositionTrigger, self).link_logic_bricks()
-        self.link_detection_bricks()
+        if not self.indexed:
+            self.link_detection_bricks()
 
     def __init__(
             self, name, actions, box, objects_string, duration=0,
-            enable_immediately=True, remain_enabled=True, detect_any=True):
+            enable_immediately=True, remain_enabled=True, detect_any=True,
+            indexed=False):
         super(BlenderObjectPositionTrigger, self).__init__(
-            name, actions, enable_imediately=enable_immediately,
+            name, actions, duration=duration,
+            enable_immediately=enable_immediately,
             remain_enabled=remain_enabled)
         self.box = box
         self.objects_string = objects_string
         self.detect_any = detect_any
+        self.indexed = indexed
@@ -22,10 +22,9 @@ import logging
 LOGGER = logging.getLogger("pyw3d")
 from pyw3d.errors import EBKAC
 from .triggers import BlenderTrigger
+from pyw3d.logic_bricks import add_sensor, add_python_controller
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     LOGGER.debug(
         "Module bpy not found. Loading "
@@ -35,20 +34,15 @@ except ImportError:
 
 
 class BlenderPositionTrigger(BlenderTrigger):
-    """Activator based on position of user in virtual space"""
+    """Activator based on position of user in virtual space
+
+    :param bool indexed: If True, the box is checked by the shared script of
+    :py:mod:`pyw3d.event_boxes` rather than by a controller of this trigger
+    """
 
     def create_enabled_sensor(self):
         """Add a sensor to fire continuously while trigger is enabled"""
-        base_object = self.select_base_object()
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': self.name,
-                'name': 'enabled_sensor'
-            }
-        )
-        base_object.game.sensors[-1].name = self.name
-        enable_sensor = base_object.game.sensors[self.name]
+        enable_sensor = add_sensor(self.base_object, "PROPERTY", self.name)
         enable_sensor.use_pulse_true_level = True
         enable_sensor.tick_skip = 0
         enable_sensor.property = "enabled"
@@ -58,17 +52,8 @@ class BlenderPositionTrigger(BlenderTrigger):
 
     def create_detection_controller(self):
         """Add a controller for detecting specified event"""
-
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': self.name,
-                'name': 'detect'
-            }
-        )
-        controller = self.base_object.game.controllers["detect"]
-        controller.mode = "MODULE"
-        controller.module = "{}.detect_event".format(self.name)
+        controller = add_python_controller(
+            self.base_object, "detect", "{}.detect_event".format(self.name))
         self.detect_controller = controller
         return controller
 
@@ -86,11 +71,13 @@ class BlenderPositionTrigger(BlenderTrigger):
 
     def generate_detection_logic(self):
         """Add a function to Python control script to detect user position"""
+        if self.indexed:
+            return ""
         detection_logic = [
             "\ndef detect_event(cont):",
             "    scene = bge.logic.getCurrentScene()",
             "    own = cont.owner",
-            "    position = scene.objects['CAMERA'].position",
+            "    position = scene_object('CAMERA').position",
             "    inside = True",
             "    corners = {}".format(
                 list(zip(self.box["corner1"], self.box["corner2"]))),
@@ -111,18 +98,21 @@ class BlenderPositionTrigger(BlenderTrigger):
 
     def create_blender_objects(self):
         super(BlenderPositionTrigger, self).create_blender_objects()
-        self.create_enabled_sensor()
-        self.create_detection_controller()
+        if not self.indexed:
+            self.create_enabled_sensor()
+            self.create_detection_controller()
 
     def link_logic_bricks(self):
         super(BlenderPositionTrigger, self).link_logic_bricks()
-        self.link_detection_bricks()
+        if not self.indexed:
+            self.link_detection_bricks()
 
     def __init__(
             self, name, actions, box, duration=0, enable_immediately=True,
-            remain_enabled=True):
+            remain_enabled=True, indexed=False):
         super(BlenderPositionTrigger, self).__init__(
             name, actions, duration=duration,
             enable_immediately=enable_immediately,
             remain_enabled=remain_enabled)
         self.box = box
+        self.indexed = indexed
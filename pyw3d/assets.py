@@ -0,0 +1,190 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Descriptions of the asset files used by projects
+
+An asset manifest is a JSON-compatible dictionary mapping the absolute
+filename of each image, model, font and sound used by a project to a record
+of the file's size in bytes, modification time and SHA-256 digest, along with
+anything read from its header (the dimensions of an image or the format of a
+WAV file). Manifests are made in plain Python before a project is handed to
+Blender (see :py:func:`pyw3d.w3d_export_tools.prepare_assets`), so that
+Blender need not hash or open files merely to inspect them.
+
+Records are only used while the size and modification time of their file are
+unchanged. Lookups outside Blender are given the manifest of the project
+concerned explicitly, since several projects may be prepared at once. Within
+Blender, a project is built with its manifest put in use for the whole
+interpreter (see :py:func:`use_asset_manifest`), as only one project is
+built at a time.
+"""
+import logging
+import os
+import struct
+from .project_cache import hash_file
+LOGGER = logging.getLogger("pyw3d")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+
+_manifest = {}
+"""Manifest in use by the project being built in this interpreter"""
+
+
+def _jpeg_size(image_file):
+    """Return (width, height) from the frame header of a JPEG file positioned
+    just after its start-of-image marker, or None if none is found"""
+    while True:
+        marker = image_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        while code == 0xFF:  # Fill bytes
+            next_byte = image_file.read(1)
+            if not next_byte:
+                return None
+            code = next_byte[0]
+        if code == 0x01 or 0xD0 <= code <= 0xD8:  # No length field
+            continue
+        length_bytes = image_file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length, = struct.unpack(">H", length_bytes)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            frame = image_file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        image_file.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(filename):
+    """Return (width, height) of PNG, JPEG, GIF or BMP image from its header,
+    or None if it cannot be determined"""
+    with open(filename, "rb") as image_file:
+        header = image_file.read(26)
+        if (header.startswith(b"\x89PNG\r\n\x1a\n") and
+                header[12:16] == b"IHDR"):
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header.startswith(b"BM") and len(header) == 26:
+            width, height = struct.unpack("<ii", header[18:26])
+            return width, abs(height)
+        if header.startswith(b"\xff\xd8"):
+            image_file.seek(2)
+            return _jpeg_size(image_file)
+    return None
+
+
+def read_wav_format(filename):
+    """Return dictionary of channels, framerate and bits per sample from the
+    format chunk of a WAV file, or None if it has none"""
+    with open(filename, "rb") as sound_file:
+        header = sound_file.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WAVE":
+            return None
+        while True:
+            chunk_header = sound_file.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                chunk = sound_file.read(16)
+                if len(chunk) < 16:
+                    return None
+                channels, framerate, bits = struct.unpack(
+                    "<2xHI6xH", chunk)
+                return {
+                    "channels": channels, "framerate": framerate,
+                    "bits": bits
+                }
+            sound_file.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def describe_asset(filename):
+    """Return manifest record for given file
+
+    Problems with the file's contents are logged rather than raised, so that
+    they are reported by Blender in the usual way when the file is loaded.
+
+    :param str filename: Absolute path of the file
+    :raises OSError: if the file cannot be read
+    """
+    file_stat = os.stat(filename)
+    record = {
+        "bytes": file_stat.st_size,
+        "mtime": file_stat.st_mtime,
+        "sha256": hash_file(filename)
+    }
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        image_size = read_image_size(filename)
+        if image_size is None:
+            LOGGER.warning("Could not read dimensions of image {}".format(
+                filename))
+        else:
+            record["image_size"] = list(image_size)
+    elif extension == ".wav":
+        sound_format = read_wav_format(filename)
+        if sound_format is None:
+            LOGGER.warning("{} is not a valid WAV file".format(filename))
+        else:
+            record["sound"] = sound_format
+    return record
+
+
+def use_asset_manifest(manifest):
+    """Use given manifest for all subsequent lookups
+
+    :param dict manifest: Asset manifest, or None to forget the manifest in
+    use
+    """
+    _manifest.clear()
+    if manifest is not None:
+        _manifest.update(manifest)
+
+
+def asset_record(filename, manifest=None):
+    """Return record of file from given manifest, or None if it is not
+    listed or has changed since
+
+    :param dict manifest: Asset manifest to look in. Defaults to the
+    manifest in use.
+    """
+    if manifest is None:
+        manifest = _manifest
+    record = manifest.get(os.path.abspath(filename))
+    if record is None:
+        return None
+    try:
+        file_stat = os.stat(filename)
+    except OSError:
+        return None
+    if (file_stat.st_size != record["bytes"] or
+            file_stat.st_mtime != record["mtime"]):
+        return None
+    return record
+
+
+def file_digest(filename, manifest=None):
+    """Return hex SHA-256 digest of file, from given manifest (or else the
+    manifest in use) if possible"""
+    record = asset_record(filename, manifest)
+    if record is None:
+        return hash_file(filename)
+    return record["sha256"]
@@ -0,0 +1,159 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tools for packing many small images into shared texture atlases
+
+Images are packed onto horizontal shelves, tallest first, leaving a gap of
+ATLAS_PADDING transparent pixels around each so that filtering does not blend
+neighbouring images. Each atlas is a square ATLAS_SIZE pixels wide, cropped to
+the smallest power-of-two height holding its shelves, and is packed into the
+.blend file as a PNG.
+"""
+import logging
+from array import array
+from collections import namedtuple
+from .names import generate_blender_atlas_name
+from .assets import asset_record
+LOGGER = logging.getLogger("pyw3d")
+try:
+    import bpy
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.atlas as standalone")
+
+ATLAS_SIZE = 2048
+ATLAS_PADDING = 2
+
+AtlasRegion = namedtuple("AtlasRegion", ["image", "offset", "scale"])
+"""Location of an image within an atlas
+
+:ivar image: The Blender image of the atlas
+:ivar tuple offset: UV coordinates of the image's lower-left corner
+:ivar tuple scale: Width and height of the image in UV coordinates
+"""
+
+
+def pack_rectangles(sizes, atlas_size=ATLAS_SIZE, padding=ATLAS_PADDING):
+    """Assign positions to rectangles within as few square atlases as
+    possible
+
+    :param list sizes: List of (width, height) tuples, none of which may
+    exceed atlas_size in either dimension
+    :param int atlas_size: Width and height of each atlas
+    :param int padding: Gap to leave between rectangles
+    :returns: List of (atlas index, x, y) tuples giving the lower-left corner
+    of each rectangle, in the same order as sizes
+    """
+    positions = [None] * len(sizes)
+    atlas_index = x = y = shelf_height = 0
+    for index in sorted(
+            range(len(sizes)), key=lambda index: sizes[index][1],
+            reverse=True):
+        width, height = sizes[index]
+        if x + width > atlas_size:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        if y + height > atlas_size:
+            atlas_index += 1
+            x = y = shelf_height = 0
+        positions[index] = (atlas_index, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    return positions
+
+
+def _power_of_two(value):
+    """Return smallest power of two no less than value"""
+    power = 1
+    while power < value:
+        power *= 2
+    return power
+
+
+def build_atlases(filenames, threshold, atlas_size=ATLAS_SIZE):
+    """Pack images from given files which are no larger than threshold into
+    new Blender images
+
+    :param filenames: Filenames of all images used by a project
+    :param int threshold: Maximum width and height in pixels of images to be
+    packed
+    :param int atlas_size: Width of each atlas in pixels
+    :returns: Dictionary mapping filenames of packed images to
+    :py:class:`AtlasRegion` tuples. Images which were not packed are absent.
+    """
+    threshold = min(threshold, atlas_size)
+    images = {}
+    for filename in sorted(set(filenames)):
+        record = asset_record(filename)
+        if record is not None and "image_size" in record and max(
+                record["image_size"]) > threshold:
+            continue  # Known to be too large without loading it
+        image = bpy.data.images.load(filename)
+        if 0 < min(image.size) and max(image.size) <= threshold:
+            images[filename] = image
+        else:
+            bpy.data.images.remove(image)
+    if len(images) < 2:  # Nothing to be gained
+        for image in images.values():
+            bpy.data.images.remove(image)
+        return {}
+
+    filenames = sorted(images)
+    positions = pack_rectangles(
+        [tuple(images[filename].size) for filename in filenames], atlas_size)
+    atlas_heights = {}
+    for filename, (atlas_index, x, y) in zip(filenames, positions):
+        atlas_heights[atlas_index] = max(
+            atlas_heights.get(atlas_index, 0),
+            y + images[filename].size[1])
+
+    atlases = []
+    atlas_pixels = []
+    for atlas_index in range(len(atlas_heights)):
+        height = _power_of_two(atlas_heights[atlas_index])
+        atlases.append(bpy.data.images.new(
+            generate_blender_atlas_name(atlas_index), atlas_size, height,
+            alpha=True))
+        atlas_pixels.append(array("f", [0.0]) * (atlas_size * height * 4))
+
+    regions = {}
+    for filename, (atlas_index, x, y) in zip(filenames, positions):
+        image = images[filename]
+        width, height = image.size
+        source = image.pixels[:]  # Rows of RGBA values, bottom row first
+        pixels = atlas_pixels[atlas_index]
+        for row in range(height):
+            start = ((y + row) * atlas_size + x) * 4
+            pixels[start:start + width * 4] = array(
+                "f", source[row * width * 4:(row + 1) * width * 4])
+        bpy.data.images.remove(image)
+
+        atlas = atlases[atlas_index]
+        # Inset by half a pixel so that filtering stays within the image
+        regions[filename] = AtlasRegion(
+            atlas,
+            ((x + 0.5) / atlas.size[0], (y + 0.5) / atlas.size[1]),
+            ((width - 1) / atlas.size[0], (height - 1) / atlas.size[1])
+        )
+
+    for atlas, pixels in zip(atlases, atlas_pixels):
+        atlas.pixels[:] = pixels
+        atlas.pack(as_png=True)
+    LOGGER.info("Packed {} images into {} atlases".format(
+        len(regions), len(atlases)))
+    return regions
@@ -32,7 +32,7 @@ class LinkAction(object):
     @property
     def start_string(self):
         script_text = [
-            "trigger = scene.objects['{}']".format(self.link_name)
+            "trigger = scene_object('{}')".format(self.link_name)
         ]
         if self.change == "Enable":
             script_text.append(
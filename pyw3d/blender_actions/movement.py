@@ -81,7 +81,7 @@ class MoveAction(object):
         script_text = [
             "pos_vector = mathutils.Vector({})".format(
                 self.placement["position"]),
-            "relative_object = scene.objects['{}']".format(
+            "relative_object = scene_object('{}')".format(
                 generate_relative_to_name(
                     self.placement['relative_to']
                 )
@@ -105,7 +105,7 @@ class MoveAction(object):
             "data['active_actions'][current_index]['initial_orientation'] ="
             " initial_orientation",
             "pos_vector.rotate(relative_object.orientation.to_quaternion()"
-            ".rotation_difference(scene.objects['VRCENTER']"
+            ".rotation_difference(scene_object('VRCENTER')"
             ".orientation.to_quaternion()))",
         ])
 
@@ -36,7 +36,7 @@ class SoundChange(object):
             "W3D_LOG.debug('{}ing sound {}')".format(
                 self.change, self.sound_name
             ),
-            "sound_object = scene.objects['{}']".format(self.object_name),
+            "sound_object = scene_object('{}')".format(self.object_name),
             "sound_actuator = sound_object.actuators['{}']".format(
                 self.sound_name
             )
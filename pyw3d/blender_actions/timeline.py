@@ -32,7 +32,7 @@ class TimelineStarter(object):
     @property
     def start_string(self):
         script_text = [
-            "trigger = scene.objects['{}']".format(self.timeline),
+            "trigger = scene_object('{}')".format(self.timeline),
             "W3D_LOG.debug(",
             "    'Starting timeline {} in {}'.format(",
             "        trigger.name, own.name))",
@@ -31,7 +31,7 @@ class TriggerEnabler(object):
     @property
     def start_string(self):
         script_text = [
-            "trigger = scene.objects['{}']".format(self.trigger)
+            "trigger = scene_object('{}')".format(self.trigger)
             ]
         script_text.append(
             "trigger['enabled'] = {}".format(self.enable)
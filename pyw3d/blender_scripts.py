@@ -139,6 +139,36 @@ def move_toggle(cont):
         bge.render.showMouse(not cont.owner["toggle_movement"])
 """
 
+OBJECT_HANDLES_SCRIPT = """
+import bge
+
+# Game objects of the current scene by name. Looking up an object by name in
+# scene.objects searches every object in the scene, so the scene is indexed
+# once and indexed again only when an object is missing from the index or
+# has since been removed.
+_handles = {}
+
+
+def _index_scene():
+    _handles.clear()
+    for game_object in bge.logic.getCurrentScene().objects:
+        _handles.setdefault(game_object.name, game_object)
+
+
+def scene_object(name):
+    try:
+        game_object = _handles[name]
+        if not game_object.invalid:
+            return game_object
+    except KeyError:
+        pass
+    _index_scene()
+    try:
+        return _handles[name]
+    except KeyError:
+        return bge.logic.getCurrentScene().objects[name]
+"""
+
 DISABLE_LINK_SCRIPT = """
 def disable_link(cont):
     scene = bge.logic.getCurrentScene()
@@ -191,3 +221,269 @@ def activate_link(cont):
         else:
             own['click_status'] = 'disabled'
 """
+
+ACTION_TABLE_SCRIPT = """
+import bge
+import group_defs
+from time import monotonic
+from handles import scene_object
+from w3d_settings import *
+
+# Changes in progress, one per object and property, stored as parallel
+# lists which animate advances together once per logic tick
+_objects = []
+_owners = []
+_timeline_data = []
+_indices = []
+_states = []
+_end_times = []
+_properties = []
+_deltas = []
+_COLUMNS = (
+    _objects, _owners, _timeline_data, _indices, _states, _end_times,
+    _properties, _deltas)
+
+
+def _ticks(duration):
+    if duration == 0:
+        return 1
+    return duration * bge.logic.getLogicTicRate()
+
+
+def _add_change(blender_object, own, data, index, end_time, property_,
+                delta):
+    _objects.append(blender_object)
+    _owners.append(own)
+    _timeline_data.append(data)
+    _indices.append(index)
+    _states.append(data['active_actions'][index])
+    _end_times.append(end_time)
+    _properties.append(property_)
+    _deltas.append(delta)
+
+
+def _targets(row):
+    object_name, group_name = row[2:4]
+    if group_name is None:
+        return [scene_object(object_name)]
+    return [
+        scene_object(object_name)
+        for object_name in getattr(group_defs, group_name)]
+
+
+def start_row(row, index, own, data):
+    end_time = row[1]
+    duration, visible, color, scale = row[4:8]
+    for blender_object in _targets(row):
+        if visible is not None:
+            blender_object.color[3] = int(blender_object.visible)
+            blender_object.setVisible(True)
+            delta_alpha = int(visible) - blender_object.color[3]
+            W3D_LOG.debug('object {} visibility set to {}'.format(
+                blender_object.name, delta_alpha > 0))
+            blender_object['visible_tag'] = 'delta_alpha > 0'
+            _add_change(
+                blender_object, own, data, index, end_time, 'alpha',
+                delta_alpha / _ticks(duration))
+        if color is not None:
+            _add_change(
+                blender_object, own, data, index, end_time, 'color', [
+                    (color[i] - blender_object.color[i]) / _ticks(duration)
+                    for i in range(len(color))])
+        if scale is not None:
+            _add_change(
+                blender_object, own, data, index, end_time, 'scale', [
+                    (scale - blender_object.scaling[i]) / _ticks(duration)
+                    for i in range(len(blender_object.scaling))])
+
+
+def end_row(row):
+    visible, color, scale = row[5:8]
+    for blender_object in _targets(row):
+        if visible is not None:
+            new_color = blender_object.color
+            new_color[3] = int(visible)
+            blender_object.color = new_color
+            blender_object.setVisible(visible)
+            if 'clicks' in blender_object:
+                if blender_object.visible:
+                    blender_object['clickable'] = True
+                else:
+                    try:
+                        del blender_object['clickable']
+                    except KeyError:
+                        pass  # Already unclickable
+        if color is not None:
+            new_color = list(color)
+            if len(new_color) < 4 and len(blender_object.color) == 4:
+                new_color.append(blender_object.color[3])
+            blender_object.color = new_color
+        if scale is not None:
+            blender_object.scaling = [scale] * 3
+
+
+def run_row(row, index, own, scene, data, time):
+    start_time, end_time = row[:2]
+    if (time >= start_time and index not in data['active_actions'] and
+            index not in data['complete_actions']):
+        W3D_LOG.debug('Starting action {}'.format(index))
+        data['active_actions'][index] = {}
+        start_row(row, index, own, data)
+    if time >= end_time and index in data['active_actions']:
+        W3D_LOG.debug('Ending action {}'.format(index))
+        data['complete_actions'][index] = data['active_actions'][index]
+        del data['active_actions'][index]
+        end_row(row)
+        own['random_choice'] = None
+
+
+def run_action(action, index, cont, own, scene, data, time):
+    if callable(action):
+        return action(cont, own, scene, data, time)
+    run_row(action, index, own, scene, data, time)
+    return False
+
+
+def _advance(blender_object, property_, delta):
+    if property_ == 'alpha':
+        new_color = blender_object.color
+        new_color[3] += delta
+        blender_object.color = new_color
+    elif property_ == 'color':
+        new_color = blender_object.color
+        for i in range(len(delta)):
+            new_color[i] += delta[i]
+        blender_object.color = new_color
+    else:
+        blender_object.scaling = [
+            blender_object.scaling[i] + delta[i]
+            for i in range(len(blender_object.scaling))]
+
+
+def animate(cont):
+    now = monotonic()
+    kept = 0
+    for i in range(len(_objects)):
+        blender_object = _objects[i]
+        own = _owners[i]
+        if (blender_object.invalid or own.invalid or
+                _timeline_data[i]['active_actions'].get(_indices[i]) is not
+                _states[i]):
+            continue  # Ended, or its timeline was restarted
+        if own['status'] == 'Continue':
+            if own.get('offset_time', 0) != 0:  # Not yet resumed
+                time = own['offset_time']
+            else:
+                time = now - own['start_time']
+            if time >= _end_times[i]:
+                continue
+            _advance(blender_object, _properties[i], _deltas[i])
+        if kept != i:
+            for column in _COLUMNS:
+                column[kept] = column[i]
+        kept += 1
+    for column in _COLUMNS:
+        del column[kept:]
+"""
+
+EVENT_BOX_SCRIPT = """
+import bge
+import group_defs
+from handles import scene_object
+
+# Each box is filed under every cell of a uniform grid over the x and y axes
+# which it overlaps, in a separate grid for each object it tracks, so that
+# each tick only the boxes filed under the cell holding a tracked object are
+# tested. Boxes overlapping more than MAX_BOX_CELLS cells are tested every
+# tick instead. The set of boxes whose trigger condition holds is updated
+# only for boxes whose count of contained objects has changed. BOXES and
+# CELL_SIZE are appended when the project is exported.
+MAX_BOX_CELLS = 64
+_grids = {}
+_large_boxes = {}
+_box_sizes = []
+_counts = {}
+_satisfied = set()
+
+
+def _cell(position):
+    return (int(position[0] // CELL_SIZE), int(position[1] // CELL_SIZE))
+
+
+def _is_satisfied(box_index, count):
+    detect_any, inside = BOXES[box_index][2:4]
+    size = _box_sizes[box_index]
+    if inside:
+        if detect_any:
+            return count > 0
+        return count == size
+    if detect_any:
+        return count < size
+    return count == 0
+
+
+def _build_index():
+    for box_index, box in enumerate(BOXES):
+        trackers, lower, upper = box[1], box[5], box[6]
+        if isinstance(trackers, str):
+            trackers = getattr(group_defs, trackers)
+        trackers = set(trackers)
+        _box_sizes.append(len(trackers))
+        low_cell = _cell(lower)
+        high_cell = _cell(upper)
+        cells = None
+        if ((high_cell[0] - low_cell[0] + 1) *
+                (high_cell[1] - low_cell[1] + 1) <= MAX_BOX_CELLS):
+            cells = [
+                (x, y)
+                for x in range(low_cell[0], high_cell[0] + 1)
+                for y in range(low_cell[1], high_cell[1] + 1)]
+        for tracker in trackers:
+            grid = _grids.setdefault(tracker, {})
+            large_boxes = _large_boxes.setdefault(tracker, [])
+            if cells is None:
+                large_boxes.append(box_index)
+            else:
+                for cell in cells:
+                    grid.setdefault(cell, []).append(box_index)
+        if _is_satisfied(box_index, 0):
+            _satisfied.add(box_index)
+
+
+def _contains(box, position):
+    lower, upper = box[5], box[6]
+    for i in range(box[4]):
+        if position[i] < lower[i] or position[i] > upper[i]:
+            return False
+    return True
+
+
+def _count_boxes(box_indices, position, counts):
+    for box_index in box_indices:
+        if _contains(BOXES[box_index], position):
+            counts[box_index] = counts.get(box_index, 0) + 1
+
+
+def detect(cont):
+    if len(_box_sizes) < len(BOXES):
+        _build_index()
+    counts = {}
+    for tracker, grid in _grids.items():
+        try:
+            position = scene_object(tracker).position
+        except KeyError:
+            continue  # Not in the scene
+        _count_boxes(grid.get(_cell(position), ()), position, counts)
+        _count_boxes(_large_boxes[tracker], position, counts)
+    for box_index in set(counts).union(_counts):
+        if _is_satisfied(box_index, counts.get(box_index, 0)):
+            _satisfied.add(box_index)
+        else:
+            _satisfied.discard(box_index)
+    _counts.clear()
+    _counts.update(counts)
+    for box_index in _satisfied:
+        trigger = scene_object(BOXES[box_index][0])
+        if trigger['enabled'] and trigger['status'] == 'Stop':
+            trigger['status'] = 'Start'
+"""
@@ -0,0 +1,189 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Content-addressed cache of exported .blend files
+
+Each exported project is stored under a key computed from a canonical
+encoding of the project, the contents of every asset file it references
+(images, models, fonts and sounds), the pyw3d source (see
+:py:func:`pyw3d.source_digest`) and the Blender executable used. Exporting
+a project with the same key again can then simply copy the stored .blend.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from . import source_digest, WORKSPACE, BLENDER_EXEC
+from .features import W3DFeature
+from .structs import SortedList, LazyFeatureList
+from .validators import ValidFile, ValidFontFile
+from .interchange import encode_value
+from .assets import file_digest
+LOGGER = logging.getLogger("pyw3d")
+
+BUILD_CACHE_DIR = os.path.join(WORKSPACE, "build_cache")
+MAX_CACHED_BUILDS = 50
+"""Maximum number of .blend files kept in BUILD_CACHE_DIR"""
+
+
+def _canonical(encoded):
+    """Sort the key-value pairs of a value returned by encode_value so that
+    equal projects have identical encodings"""
+    if isinstance(encoded, list):
+        return [_canonical(item) for item in encoded]
+    if isinstance(encoded, dict):
+        canonical = {}
+        for tag, content in encoded.items():
+            if tag in ("i", "d"):
+                canonical[tag] = sorted(
+                    ([_canonical(key), _canonical(item)]
+                     for key, item in content),
+                    key=lambda pair: json.dumps(pair[0], sort_keys=True)
+                )
+            else:
+                canonical[tag] = _canonical(content)
+        return canonical
+    return encoded
+
+
+def canonical_encoding(value):
+    """Return JSON-compatible encoding of value which is identical for equal
+    values, regardless of the order in which their options were set"""
+    return _canonical(encode_value(value))
+
+
+def _asset_filename(validator, value, directory):
+    filename = os.path.join(directory, value)
+    if os.path.isfile(filename):
+        return os.path.abspath(filename)
+    if isinstance(validator, ValidFontFile):
+        font_file = os.path.join(directory, "fonts", value)
+        if os.path.isfile(font_file):
+            return os.path.abspath(font_file)
+    return None
+
+
+def asset_files(value, directory):
+    """Return sorted list of absolute paths of files referenced by value
+
+    Any W3DFeature option validated by :py:class:`ValidFile` is considered a
+    file reference. Relative paths are resolved against directory, which
+    should be the call_directory of the project containing value, since that
+    is where Blender builds the project. Material libraries of .obj models
+    are included.
+
+    :param value: A W3DFeature (e.g. a W3DProject) or container of them
+    :param str directory: Directory against which relative paths are
+    resolved
+    """
+    found = set()
+    pending = [value]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, W3DFeature):
+            for key, item in value.items():
+                validator = value.argument_validators.get(key)
+                if isinstance(validator, ValidFile) and isinstance(item, str):
+                    filename = _asset_filename(validator, item, directory)
+                    if filename is not None:
+                        found.add(filename)
+                        material_file = os.path.splitext(filename)[0] + ".mtl"
+                        if (filename.lower().endswith(".obj") and
+                                os.path.isfile(material_file)):
+                            found.add(material_file)
+                else:
+                    pending.append(item)
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple, SortedList, LazyFeatureList)):
+            pending.extend(value)
+    return sorted(found)
+
+
+def build_key(project, assets=None):
+    """Return hex digest identifying the .blend file that project exports to
+
+    :param W3DProject project: The project to be exported
+    :param dict assets: Asset manifest of the project, used to avoid
+    hashing its files again
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        [source_digest(), BLENDER_EXEC, canonical_encoding(project)],
+        sort_keys=True).encode("utf-8"))
+    for filename in asset_files(project, project.call_directory):
+        digest.update(filename.encode("utf-8"))
+        digest.update(file_digest(filename, assets).encode("ascii"))
+    return digest.hexdigest()
+
+
+def cached_build(key):
+    """Return filename of cached .blend for given key or None if not cached
+    """
+    filename = os.path.join(BUILD_CACHE_DIR, "{}.blend".format(key))
+    if not os.path.isfile(filename):
+        return None
+    try:
+        os.utime(filename)  # Mark as recently used
+    except OSError:
+        pass
+    return filename
+
+
+def store_build(key, blend_filename):
+    """Copy exported .blend file into the cache under given key
+
+    Least recently used builds are removed so that at most MAX_CACHED_BUILDS
+    remain. Failures are logged but not raised.
+    """
+    try:
+        os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+        cache_fd, temp_filename = tempfile.mkstemp(
+            dir=BUILD_CACHE_DIR, suffix=".tmp")
+    except OSError as error:
+        LOGGER.info("Could not cache {}: {}".format(blend_filename, error))
+        return
+    try:
+        with os.fdopen(cache_fd, "wb") as cache_file:
+            with open(blend_filename, "rb") as blend_file:
+                shutil.copyfileobj(blend_file, cache_file)
+        os.replace(
+            temp_filename,
+            os.path.join(BUILD_CACHE_DIR, "{}.blend".format(key)))
+    except OSError as error:
+        LOGGER.info("Could not cache {}: {}".format(blend_filename, error))
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+        return
+    _prune()
+
+
+def _prune():
+    try:
+        builds = [
+            os.path.join(BUILD_CACHE_DIR, name)
+            for name in os.listdir(BUILD_CACHE_DIR) if name.endswith(".blend")
+        ]
+        builds.sort(key=os.path.getmtime, reverse=True)
+        for filename in builds[MAX_CACHED_BUILDS:]:
+            os.remove(filename)
+    except OSError as error:
+        LOGGER.info("Could not prune build cache: {}".format(error))
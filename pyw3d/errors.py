@@ -24,6 +24,19 @@ class BadW3DXML(Exception):
         super(BadW3DXML, self).__init__(message)
 
 
+class BadInterchange(Exception):
+    """Exception thrown for attempting to read a malformed or incompatible
+    interchange stream"""
+    def __init__(self, message):
+        super(BadInterchange, self).__init__(message)
+
+
+class ExportError(Exception):
+    """Exception thrown if Blender fails to export a project"""
+    def __init__(self, message):
+        super(ExportError, self).__init__(message)
+
+
 class InvalidArgument(Exception):
     """Exception thrown for invalid argument to a W3D feature
 
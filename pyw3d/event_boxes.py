@@ -0,0 +1,90 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Shared detection of the boxes of HeadPositionTriggers and
+MovementTriggers
+
+Rather than giving each such trigger a controller which tests its own box
+every tick, a single controller on the camera calls the script
+EVENT_BOX_TEXT, which files every box in a uniform grid for each tracked
+object and only tests the boxes near each object (see EVENT_BOX_SCRIPT in
+:py:mod:`pyw3d.blender_scripts`). As before, a trigger is started whenever
+its condition holds while it is enabled and stopped.
+"""
+import logging
+from .blender_scripts import EVENT_BOX_SCRIPT
+from .logic_bricks import add_sensor, add_python_controller
+LOGGER = logging.getLogger("pyw3d")
+try:
+    import bpy
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.event_boxes as standalone")
+
+EVENT_BOX_TEXT = "event_boxes.py"
+
+
+def box_table(triggers):
+    """Return entries of the table of boxes for the given W3DTriggers
+
+    See :py:meth:`pyw3d.triggers.W3DTrigger.box_entry`
+    """
+    return [
+        entry for entry in (trigger.box_entry() for trigger in triggers)
+        if entry is not None
+    ]
+
+
+def grid_cell_size(boxes):
+    """Return width of the grid cells used to index boxes, which is the mean
+    width of the boxes along the x and y axes"""
+    widths = [
+        max(upper[0] - lower[0], upper[1] - lower[1])
+        for lower, upper in (box[5:7] for box in boxes)
+    ]
+    if not widths or sum(widths) <= 0:
+        return 1.0
+    return sum(widths) / len(widths)
+
+
+def generate_event_box_script(triggers):
+    """Return text of EVENT_BOX_TEXT for the given W3DTriggers"""
+    boxes = box_table(triggers)
+    script_text = [EVENT_BOX_SCRIPT, "BOXES = ["]
+    script_text.extend("    {},".format(repr(box)) for box in boxes)
+    script_text.extend([
+        "]",
+        "CELL_SIZE = {}".format(grid_cell_size(boxes))
+    ])
+    return "\n".join(script_text)
+
+
+def setup_event_boxes(triggers):
+    """Write EVENT_BOX_TEXT for the given W3DTriggers, replacing any earlier
+    version, and make sure the camera calls it every tick"""
+    if EVENT_BOX_TEXT in bpy.data.texts:
+        bpy.data.texts.remove(bpy.data.texts[EVENT_BOX_TEXT])
+    bpy.data.texts.new(EVENT_BOX_TEXT)
+    bpy.data.texts[EVENT_BOX_TEXT].write(generate_event_box_script(triggers))
+
+    camera = bpy.data.objects["CAMERA"]
+    if "event_boxes" not in camera.game.controllers:
+        sensor = add_sensor(camera, "ALWAYS", "event_boxes")
+        sensor.use_pulse_true_level = True
+        controller = add_python_controller(
+            camera, "event_boxes", "event_boxes.detect")
+        controller.link(sensor=sensor)
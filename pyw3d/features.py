@@ -26,6 +26,46 @@ position, and potentially multiple kinds of rotation).
 from .errors import InvalidArgument, ConsistencyError, ValidationError
 
 
+def _contains_dirty(value):
+    """Return True if value is or contains a W3DFeature that has been modified
+    since it was last marked clean"""
+    if isinstance(value, W3DFeature):
+        return value.is_dirty()
+    if isinstance(value, str):
+        return False
+    if isinstance(value, dict):
+        return any(_contains_dirty(item) for item in value.values())
+    try:
+        return any(_contains_dirty(item) for item in value)
+    except TypeError:
+        return False
+
+
+def _mark_clean(value):
+    """Mark value and any W3DFeatures it contains as unmodified"""
+    if isinstance(value, W3DFeature):
+        value.mark_clean()
+    elif isinstance(value, str):
+        pass
+    elif isinstance(value, dict):
+        for item in value.values():
+            _mark_clean(item)
+    else:
+        try:
+            for item in value:
+                _mark_clean(item)
+        except TypeError:
+            pass
+
+
+def _restore_feature(feature_class, items, state):
+    """Recreate a pickled W3DFeature without revalidating its values"""
+    feature = feature_class.__new__(feature_class)
+    dict.update(feature, items)
+    feature.__dict__.update(state)
+    return feature
+
+
 class W3DFeature(dict):
     """Base class for all W3D features
 
@@ -59,6 +99,7 @@ class W3DFeature(dict):
 
     def __init__(self, *args, **kwargs):
         super(W3DFeature, self).__init__()
+        self._dirty = True
         self.update(args)
         self.update(kwargs.items())
         self._validation_hashes = {}
@@ -71,18 +112,24 @@ class W3DFeature(dict):
         if key not in self.argument_validators:
             raise InvalidArgument(
                 "{} not a valid option for this W3D feature".format(key))
-        if not self.argument_validators[key](value):
+        validator = self.argument_validators[key]
+        if not validator(value):
             try:
-                value = self.argument_validators[key].coerce(value)
+                value = validator.coerce(value)
             except:
                 raise InvalidArgument(
                     "{} is not a valid value for option {}".format(value, key))
-        if not self.argument_validators[key](value):
-            raise InvalidArgument(
-                "{} is not a valid value for option {}\nAdditional Info: "
-                "{}".format(
-                    value, key, self.argument_validators[key].help_string))
+            if not validator(value):
+                raise InvalidArgument(
+                    "{} is not a valid value for option {}\nAdditional Info: "
+                    "{}".format(value, key, validator.help_string))
         super(W3DFeature, self).__setitem__(key, value)
+        self._dirty = True
+
+    def __reduce_ex__(self, protocol):
+        # Values were validated when first set, so bypass __setitem__ when
+        # unpickling
+        return (_restore_feature, (type(self), dict(self), self.__dict__))
 
     def __missing__(self, key):
         try:
@@ -183,3 +230,23 @@ class W3DFeature(dict):
     def is_default(self, key):
         """Return true if value has not been set for key"""
         return key not in self
+
+    def is_dirty(self):
+        """Return True if this feature or any feature it contains has been
+        modified since mark_clean was last called
+
+        .. note:: Only changes made through __setitem__ are tracked. Code
+        which mutates a stored list or dict in place must call mark_dirty, as
+        :py:class:`pyw3d.path.ProjectPath` does for every change it makes."""
+        return self._dirty or any(
+            _contains_dirty(value) for value in self.values())
+
+    def mark_dirty(self):
+        """Flag this feature as modified"""
+        self._dirty = True
+
+    def mark_clean(self):
+        """Flag this feature and all features it contains as unmodified"""
+        self._dirty = False
+        for value in self.values():
+            _mark_clean(value)
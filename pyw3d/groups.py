@@ -29,6 +29,31 @@ except ImportError:
         "Module bpy not found. Loading pyw3d.actions as standalone")
 
 
+def group_members(groups):
+    """Return dictionary mapping each group name to set of names of all
+    objects in that group or any group it contains
+
+    :param list groups: List of W3DGroups
+    """
+    direct = {group["name"]: group for group in groups}
+    members = {}
+
+    def collect(name, visiting):
+        if name in members:
+            return members[name]
+        found = set(direct[name]["objects"])
+        visiting.add(name)
+        for subgroup in direct[name]["groups"]:
+            if subgroup in direct and subgroup not in visiting:
+                found.update(collect(subgroup, visiting))
+        members[name] = found
+        return found
+
+    for name in direct:
+        collect(name, set())
+    return members
+
+
 class W3DGroup(W3DFeature):
     """Organize W3DObjects (or other W3DGroups) into groups
 
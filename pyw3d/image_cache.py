@@ -0,0 +1,245 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Cache of downscaled copies of the images used by projects
+
+The resolution needed for each W3DImage is estimated from how large its
+object appears to a viewer at the center of the CAVE: an image plane of
+IMAGE_PLANE_WIDTH, enlarged by the object's scale, is projected onto a wall
+WALL_DISTANCE away which displays WALL_RESOLUTION pixels across. Images
+larger than needed (or than a project's maximum) are scaled down to
+power-of-two dimensions, so that the game engine need not rescale them again
+before generating mipmaps, and stored under IMAGE_CACHE_DIR with a name
+derived from the digest of the source file. JPEG sources are stored as JPEG
+and all others as PNG, preserving any alpha channel.
+
+Images are normally scaled within Blender as a project is built. If Pillow
+is installed, :py:func:`downscale_image_file` can fill the cache beforehand
+without Blender, in which case Blender simply uses the cached copies.
+"""
+import logging
+import math
+import os
+import tempfile
+from . import WORKSPACE
+from .objects import W3DImage
+from .placement import WALL_POSITIONS
+from .assets import asset_record, file_digest
+LOGGER = logging.getLogger("pyw3d")
+try:
+    import bpy
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.image_cache as standalone")
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+    LOGGER.debug("Module PIL not found. Images will be scaled by Blender")
+
+IMAGE_CACHE_DIR = os.path.join(WORKSPACE, "image_cache")
+IMAGE_PLANE_WIDTH = 0.3048
+"""Width in Blender units of the plane created by W3DImage.blend"""
+WALL_DISTANCE = 4 * 0.3048
+"""Distance in Blender units from the center of the CAVE to each wall"""
+WALL_RESOLUTION = 1920
+"""Number of pixels displayed across each wall"""
+MIN_VIEW_DISTANCE = 0.3
+"""Closest distance at which an image is expected to be viewed"""
+
+
+def required_image_size(object_):
+    """Return width in pixels at which the image of a W3DObject with
+    W3DImage content appears to a viewer at the center of the CAVE"""
+    placement = object_["placement"]
+    wall_position = WALL_POSITIONS.get(placement["relative_to"], (0, 0, 0))
+    distance = math.sqrt(sum(
+        (position + offset) ** 2
+        for position, offset in zip(placement["position"], wall_position)
+    ))
+    wall_pixels = WALL_RESOLUTION / (2 * WALL_DISTANCE)
+    return int(math.ceil(
+        IMAGE_PLANE_WIDTH * object_["scale"] * wall_pixels * WALL_DISTANCE /
+        max(distance, MIN_VIEW_DISTANCE)
+    ))
+
+
+def _power_of_two_below(value):
+    """Return largest power of two no greater than value (at least 1)"""
+    power = 1
+    while power * 2 <= value:
+        power *= 2
+    return power
+
+
+def _nearest_power_of_two(value):
+    """Return power of two nearest to value on a logarithmic scale"""
+    power = _power_of_two_below(value)
+    if value >= power * math.sqrt(2):
+        return power * 2
+    return power
+
+
+def target_dimensions(size, long_side):
+    """Return power-of-two (width, height) to which an image should be
+    scaled so that its longer side is long_side pixels
+
+    :param tuple size: Current width and height of the image
+    :param int long_side: Power of two
+    :returns: New dimensions, or None if the image is already no larger
+    """
+    if max(size) <= long_side:
+        return None
+    scale = long_side / max(size)
+    return tuple(
+        long_side if dimension == max(size) else
+        min(long_side, _nearest_power_of_two(dimension * scale))
+        for dimension in size
+    )
+
+
+def _cache_location(filename, long_side, manifest=None):
+    """Return base name of cached copies of image scaled to long_side pixels,
+    along with the format and extension in which they are stored"""
+    if os.path.splitext(filename)[1].lower() in (".jpg", ".jpeg"):
+        file_format, extension = "JPEG", ".jpg"
+    else:
+        file_format, extension = "PNG", ".png"
+    cache_name = os.path.join(
+        IMAGE_CACHE_DIR,
+        "{}_{}".format(file_digest(filename, manifest), long_side))
+    return cache_name, file_format, extension
+
+
+def downscale_image_file(filename, long_side, manifest=None):
+    """Fill the cache for image scaled down to long_side pixels without
+    Blender, if Pillow is installed
+
+    :param dict manifest: Asset manifest of the project using the image
+    :returns: True if the cache now holds the scaled image or records that
+    the image should be used unchanged
+    """
+    if Image is None:
+        return False
+    cache_name, file_format, extension = _cache_location(
+        filename, long_side, manifest)
+    if (os.path.isfile(cache_name + extension) or
+            os.path.isfile(cache_name + ".orig")):
+        return True
+    try:
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        with Image.open(filename) as image:
+            dimensions = target_dimensions(image.size, long_side)
+            if dimensions is None:
+                open(cache_name + ".orig", "w").close()
+                return True
+            scaled_image = image.resize(dimensions, Image.LANCZOS)
+        if file_format == "JPEG" and scaled_image.mode not in ("RGB", "L"):
+            scaled_image = scaled_image.convert("RGB")
+        cache_fd, temp_filename = tempfile.mkstemp(
+            dir=IMAGE_CACHE_DIR, suffix=extension)
+        os.close(cache_fd)
+        scaled_image.save(temp_filename, file_format)
+        os.replace(temp_filename, cache_name + extension)
+    except (OSError, ValueError) as error:
+        LOGGER.info("Could not scale {}: {}".format(filename, error))
+        return False
+    return True
+
+
+def _downscaled_image(filename, long_side):
+    """Return filename of cached copy of image scaled down to long_side
+    pixels, creating it if necessary, or None if the image should be used
+    unchanged"""
+    cache_name, file_format, extension = _cache_location(
+        filename, long_side)
+    if os.path.isfile(cache_name + extension):
+        return cache_name + extension
+    if os.path.isfile(cache_name + ".orig"):
+        return None
+    record = asset_record(filename)
+    if record is not None and "image_size" in record and target_dimensions(
+            tuple(record["image_size"]), long_side) is None:
+        return None
+
+    try:
+        image = bpy.data.images.load(filename)
+    except RuntimeError:  # Reported when the image itself is created
+        return None
+    try:
+        os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+        dimensions = target_dimensions(tuple(image.size), long_side)
+        if dimensions is None:
+            # Record that this image is small enough already
+            open(cache_name + ".orig", "w").close()
+            return None
+        LOGGER.info("Scaling {} from {}x{} to {}x{}".format(
+            filename, image.size[0], image.size[1], *dimensions))
+        image.scale(*dimensions)
+        cache_fd, temp_filename = tempfile.mkstemp(
+            dir=IMAGE_CACHE_DIR, suffix=extension)
+        os.close(cache_fd)
+        image.filepath_raw = temp_filename
+        image.file_format = file_format
+        image.save()
+        os.replace(temp_filename, cache_name + extension)
+    except OSError as error:
+        LOGGER.info("Could not cache {}: {}".format(filename, error))
+        return None
+    finally:
+        bpy.data.images.remove(image)
+    return cache_name + extension
+
+
+def image_targets(objects, max_size):
+    """Return dictionary mapping filename of each image used by W3DObjects
+    with W3DImage content to the power of two to which its longer side should
+    be scaled down
+
+    :param objects: Iterable of W3DObjects
+    :param int max_size: Maximum width or height of any image in pixels
+    """
+    required = {}
+    for object_ in objects:
+        if isinstance(object_["content"], W3DImage):
+            filename = object_["content"]["filename"]
+            required[filename] = max(
+                required.get(filename, 0), required_image_size(object_))
+    max_size = _power_of_two_below(max_size)
+    return {
+        filename: min(max_size, _power_of_two_below(2 * size - 1))
+        for filename, size in required.items()
+    }
+
+
+def preprocess_images(objects, max_size):
+    """Scale down images of W3DObjects with W3DImage content which are
+    larger than needed
+
+    :param objects: Iterable of W3DObjects
+    :param int max_size: Maximum width or height of any image in pixels
+    :returns: Dictionary mapping filenames of source images to filenames of
+    the images which should be used in their place. Images which should be
+    used unchanged are absent.
+    """
+    processed = {}
+    for filename, long_side in sorted(
+            image_targets(objects, max_size).items()):
+        processed_file = _downscaled_image(filename, long_side)
+        if processed_file is not None:
+            processed[filename] = processed_file
+    return processed
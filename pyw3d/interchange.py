@@ -0,0 +1,300 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Streaming interchange format for passing W3DProjects between interpreters
+
+A stream consists of the four bytes "W3DI" and a two-byte big-endian format
+version, followed by records. Each record is a four-byte big-endian length
+and that many bytes of UTF-8 JSON. A record of length zero ends the stream.
+
+The first record holds the project's class, call directory and settings,
+along with the names of the objects which particle systems may emit (see
+W3DProject.particle_object_names), since these cannot be found by a receiver
+which starts building objects before all of them have been read. Each
+following record is a [section, feature] pair (e.g. ["objects", {...}]), with
+all features of a section sent together and sections sent in the order of
+SECTION_ORDER, which matches the order in which W3DProject.blend builds them.
+This allows the receiving side to start building a project before the stream
+is complete.
+
+Features are encoded by class and values only, so the two interpreters need
+not share identical class layouts. Tuples, dictionaries and SortedLists
+(which JSON cannot represent faithfully) are tagged explicitly.
+"""
+import importlib
+import json
+import struct
+from collections import defaultdict
+from .features import W3DFeature
+from .structs import SortedList, LazyFeatureList
+from .errors import BadInterchange
+
+INTERCHANGE_MAGIC = b"W3DI"
+INTERCHANGE_VERSION = 2
+SECTION_ORDER = (
+    "groups", "sounds", "objects", "particle_actions", "timelines",
+    "trigger_events"
+)
+"""Order in which project sections are sent"""
+
+_HEADER = struct.Struct(">4sH")
+_LENGTH = struct.Struct(">I")
+_DEFAULT_FACTORIES = {"list": list, "dict": dict}
+
+
+def _class_path(feature_class):
+    return "{}:{}".format(feature_class.__module__, feature_class.__qualname__)
+
+
+def _class_from_path(class_path):
+    try:
+        module_name, class_name = class_path.split(":")
+        feature_class = getattr(
+            importlib.import_module(module_name), class_name)
+    except (ValueError, ImportError, AttributeError):
+        raise BadInterchange("Unknown feature class {}".format(class_path))
+    if not issubclass(feature_class, W3DFeature):
+        raise BadInterchange("{} is not a W3DFeature".format(class_path))
+    return feature_class
+
+
+def encode_value(value):
+    """Convert value into a structure that can be stored as JSON"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, W3DFeature):
+        return {
+            "f": _class_path(type(value)),
+            "i": [[key, encode_value(item)] for key, item in value.items()]
+        }
+    if isinstance(value, (list, LazyFeatureList)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {"t": [encode_value(item) for item in value]}
+    if isinstance(value, SortedList):
+        if value.sort_key is not None:
+            raise TypeError("Cannot encode SortedList with custom sort key")
+        return {"s": [encode_value(item) for item in value]}
+    if isinstance(value, dict):
+        encoded = {
+            "d": [
+                [encode_value(key), encode_value(item)]
+                for key, item in value.items()
+            ]
+        }
+        if isinstance(value, defaultdict):
+            factory = value.default_factory
+            if factory not in _DEFAULT_FACTORIES.values():
+                raise TypeError(
+                    "Cannot encode defaultdict with factory {}".format(
+                        factory))
+            encoded["default"] = factory.__name__
+        return encoded
+    raise TypeError("Cannot encode value {} of type {}".format(
+        value, type(value).__name__))
+
+
+def new_feature(feature_class, items):
+    """Create feature of given class with values that were validated before
+    being encoded"""
+    feature = feature_class()
+    dict.update(feature, items)
+    return feature
+
+
+def _decode_object(obj):
+    if "f" in obj:
+        return new_feature(_class_from_path(obj["f"]), obj["i"])
+    if "t" in obj:
+        return tuple(obj["t"])
+    if "s" in obj:
+        return SortedList(obj["s"])
+    if "d" in obj:
+        if "default" in obj:
+            try:
+                value = defaultdict(_DEFAULT_FACTORIES[obj["default"]])
+            except KeyError:
+                raise BadInterchange(
+                    "Unknown default factory {}".format(obj["default"]))
+        else:
+            value = {}
+        for key, item in obj["d"]:
+            value[key] = item
+        return value
+    raise BadInterchange("Unrecognized object in interchange stream")
+
+
+def _decode_record(data):
+    try:
+        return json.loads(data.decode("utf-8"), object_hook=_decode_object)
+    except ValueError as error:
+        raise BadInterchange("Malformed interchange record: {}".format(error))
+
+
+def write_record(stream, record):
+    """Write a single length-prefixed JSON record to binary stream
+
+    :param record: Any value accepted by json.dumps
+    """
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    stream.write(_LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+def write_end(stream):
+    """Write the zero-length record which ends a sequence of records"""
+    stream.write(_LENGTH.pack(0))
+    stream.flush()
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise BadInterchange("Interchange stream ended unexpectedly")
+        data += chunk
+    return data
+
+
+def _read_raw_record(stream):
+    length, = _LENGTH.unpack(_read_exactly(stream, _LENGTH.size))
+    if length == 0:
+        return None
+    return _read_exactly(stream, length)
+
+
+def read_record(stream):
+    """Read a single record written by write_record from binary stream
+
+    :returns: The decoded record or None if the end of a sequence of records
+    was reached
+    """
+    data = _read_raw_record(stream)
+    if data is None:
+        return None
+    return _decode_record(data)
+
+
+def write_project(project, stream):
+    """Write W3DProject to binary stream in interchange format
+
+    :param W3DProject project: The project to write
+    :param stream: A writable binary file-like object
+    """
+    stream.write(_HEADER.pack(INTERCHANGE_MAGIC, INTERCHANGE_VERSION))
+    settings = [
+        [key, encode_value(value)] for key, value in project.items()
+        if key not in SECTION_ORDER
+    ]
+    write_record(stream, [
+        _class_path(type(project)), project.call_directory, settings,
+        sorted(project.particle_object_names())])
+    for section in SECTION_ORDER:
+        for feature in project[section]:
+            write_record(stream, [section, encode_value(feature)])
+    write_end(stream)
+
+
+class ProjectReader(object):
+    """Read a W3DProject from a binary stream in interchange format
+
+    The project's settings are read immediately and are available as
+    self.project, and the names of objects which its particle systems may
+    emit as self.particle_objects. Features are added to self.project as they
+    are read, either all at once with :py:meth:`read_all` or section by
+    section with :py:meth:`receive`.
+
+    :param stream: A readable binary file-like object
+    :raises BadInterchange: if the stream does not begin with a compatible
+    interchange header
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        try:
+            magic, version = _HEADER.unpack(
+                _read_exactly(stream, _HEADER.size))
+        except BadInterchange:
+            raise BadInterchange("Stream is not in W3D interchange format")
+        if magic != INTERCHANGE_MAGIC:
+            raise BadInterchange("Stream is not in W3D interchange format")
+        if version != INTERCHANGE_VERSION:
+            raise BadInterchange(
+                "Unsupported interchange version {} (expected {})".format(
+                    version, INTERCHANGE_VERSION))
+        self.finished = False
+        project_path, call_directory, settings, particle_objects = \
+            self._next_record()
+        self.particle_objects = set(particle_objects)
+        self.project = _class_from_path(project_path)(
+            call_directory=call_directory)
+        dict.update(self.project, settings)
+        for section in SECTION_ORDER:
+            dict.__setitem__(self.project, section, [])
+        self._pending = self._next_record()
+        self._section_index = 0
+
+    def _next_record(self):
+        record = read_record(self.stream)
+        if record is None:
+            self.finished = True
+        return record
+
+    def receive(self, section):
+        """Yield each feature of given section as it is read, adding it to
+        the project
+
+        :param str section: The section to read, which must not precede in
+        SECTION_ORDER any section already received
+        """
+        try:
+            index = SECTION_ORDER.index(section)
+        except ValueError:
+            raise BadInterchange("Unknown section {}".format(section))
+        if index < self._section_index:
+            raise BadInterchange(
+                "Section {} has already been received".format(section))
+        self._section_index = index
+        while self._pending is not None:
+            record_section, feature = self._pending
+            if record_section not in SECTION_ORDER:
+                raise BadInterchange(
+                    "Unknown section {}".format(record_section))
+            record_index = SECTION_ORDER.index(record_section)
+            if record_index < index:
+                raise BadInterchange(
+                    "Section {} received out of order".format(record_section))
+            if record_index > index:
+                return
+            self.project[section].append(feature)
+            self._pending = self._next_record()
+            yield feature
+
+    def discard(self):
+        """Skip over the rest of the stream without decoding it, e.g. after
+        an error, so that any records which follow it can be read"""
+        while not self.finished:
+            if _read_raw_record(self.stream) is None:
+                self.finished = True
+        self._pending = None
+
+    def read_all(self):
+        """Read all remaining features and return the complete project"""
+        for section in SECTION_ORDER[self._section_index:]:
+            for feature in self.receive(section):
+                pass
+        return self.project
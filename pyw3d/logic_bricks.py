@@ -0,0 +1,151 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tools for adding game engine logic bricks and properties to Blender
+objects
+
+Blender offers no data API for creating sensors, controllers, actuators or
+game properties, so each is added with a single direct call to the
+corresponding operator. The operator is given the target object through a
+context override rather than by name or by making it the active object,
+which avoids both a search through every object in the file and any changes
+to the scene's selection. Everything else (settings, names and links between
+bricks) is then done through the data API on the brick that is returned.
+"""
+import logging
+LOGGER = logging.getLogger("pyw3d")
+try:
+    from _bpy import ops as ops_module
+    BPY_OPS_CALL = ops_module.call
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.logic_bricks as standalone")
+
+
+def _object_context(blender_object):
+    """Return context override which makes operators act on blender_object
+    """
+    return {"object": blender_object, "active_object": blender_object}
+
+
+def _add_brick(operator, bricks, blender_object, brick_type, name):
+    BPY_OPS_CALL(
+        operator, _object_context(blender_object),
+        {'type': brick_type, 'name': name}
+    )
+    brick = bricks[-1]
+    # Blender may have altered the name to make it unique
+    brick.name = name
+    return brick
+
+
+def add_sensor(blender_object, sensor_type, name):
+    """Add sensor to Blender object
+
+    :param blender_object: The object to add the sensor to
+    :param str sensor_type: Blender sensor type (e.g. "PROPERTY")
+    :param str name: Name for the sensor
+    :returns: The new sensor
+    """
+    return _add_brick(
+        "logic.sensor_add", blender_object.game.sensors, blender_object,
+        sensor_type, name)
+
+
+def add_controller(blender_object, controller_type, name):
+    """Add controller to Blender object
+
+    :param blender_object: The object to add the controller to
+    :param str controller_type: Blender controller type (e.g. "PYTHON")
+    :param str name: Name for the controller
+    :returns: The new controller
+    """
+    return _add_brick(
+        "logic.controller_add", blender_object.game.controllers,
+        blender_object, controller_type, name)
+
+
+def add_python_controller(blender_object, name, module):
+    """Add Python controller in module mode to Blender object
+
+    :param blender_object: The object to add the controller to
+    :param str name: Name for the controller
+    :param str module: Function to be called by the controller, given as
+    "script.function" where script.py is a text block
+    :returns: The new controller
+    """
+    controller = add_controller(blender_object, "PYTHON", name)
+    controller.mode = "MODULE"
+    controller.module = module
+    return controller
+
+
+def add_actuator(blender_object, actuator_type, name):
+    """Add actuator to Blender object
+
+    :param blender_object: The object to add the actuator to
+    :param str actuator_type: Blender actuator type (e.g. "SOUND")
+    :param str name: Name for the actuator
+    :returns: The new actuator
+    """
+    return _add_brick(
+        "logic.actuator_add", blender_object.game.actuators, blender_object,
+        actuator_type, name)
+
+
+def add_game_property(blender_object, property_type, name, value=None):
+    """Add game property to Blender object
+
+    :param blender_object: The object to add the property to
+    :param str property_type: Blender property type (e.g. "BOOL")
+    :param str name: Name for the property, which should not already be used
+    by another property of the same object
+    :param value: Optional initial value for the property
+    :returns: The new property
+    """
+    BPY_OPS_CALL(
+        "object.game_property_new", _object_context(blender_object),
+        {'type': property_type, 'name': name}
+    )
+    game_property = blender_object.game.properties[-1]
+    if value is not None:
+        game_property.value = value
+    return game_property
+
+
+def remove_named_logic(blender_object, name):
+    """Remove game property and any logic bricks with the given name from
+    Blender object
+
+    :param blender_object: The object to remove the property and bricks from
+    :param str name: Name of the property and bricks to remove
+    """
+    context = _object_context(blender_object)
+    game = blender_object.game
+    for operator, bricks, keyword in (
+            ("logic.sensor_remove", game.sensors, "sensor"),
+            ("logic.controller_remove", game.controllers, "controller"),
+            ("logic.actuator_remove", game.actuators, "actuator")):
+        if name in bricks:
+            BPY_OPS_CALL(
+                operator, context,
+                {keyword: name, 'object': blender_object.name}
+            )
+    index = game.properties.find(name)
+    if index != -1:
+        BPY_OPS_CALL(
+            "object.game_property_remove", context, {'index': index})
@@ -88,3 +88,8 @@ def generate_blender_particle_name(string):
 def generate_blender_curve_name(string):
     """Generate name used for Blender curves"""
     return "curve_{}".format(string)
+
+
+def generate_blender_atlas_name(index):
+    """Generate name used for Blender texture atlas images"""
+    return "atlas_{}".format(index)
@@ -23,7 +23,8 @@ from collections import defaultdict
 import math
 import platform
 from .errors import BadW3DXML, InvalidArgument, EBKAC, ConsistencyError
-from .xml_tools import find_xml_text, text2bool, text2tuple, bool2text
+from .xml_tools import text2bool, text2ints3, bool2text, XMLCodec, \
+    XMLField, text_field, feature_field
 from .features import W3DFeature
 from .actions import W3DAction, ObjectAction, GroupAction,\
     SoundAction, EventTriggerAction
@@ -38,11 +39,15 @@ from .names import generate_blender_object_name,\
 from .metaclasses import SubRegisteredClass
 from .activators import BlenderClickTrigger
 from .sounds import audio_playback_object
+from .selection import SelectionManager
+from .logic_bricks import add_sensor, add_python_controller, add_actuator, \
+    add_game_property
 import logging
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
     import mathutils
+    import bmesh
     from _bpy import ops as ops_module
     BPY_OPS_CALL = ops_module.call
 except ImportError:
@@ -91,10 +96,14 @@ def set_object_center(blender_object, center_vec):
     blender_object.matrix_world.translation = center_vec
 
 
-def duplicate_object(original):
-    """Duplicate given object"""
+def duplicate_object(original, share_data=False):
+    """Duplicate given object
+
+    :param bool share_data: If True, the duplicate uses the same mesh (or
+    other data) as the original rather than a copy of it
+    """
     new = original.copy()
-    if original.data is not None:
+    if original.data is not None and not share_data:
         new.data = original.data.copy()
     new.animation_data_clear()
     bpy.context.scene.objects.link(new)
@@ -138,8 +147,100 @@ def _alpha_prep(slot, material):
     material.alpha = 0
 
 
-def generate_material_from_image(filename, double_sided=True):
-    """Generate Blender material from image for texturing"""
+def _read_link_actions(link, actions_node):
+    """Store actions from Actions node in W3DLink"""
+    num_clicks = -1
+    clicks_node = actions_node.find("Clicks")
+    if clicks_node is not None:
+        num_clicks_node = clicks_node.find("NumClicks")
+        if num_clicks_node is not None:
+            try:
+                num_clicks = int(
+                    num_clicks_node.attrib["num_clicks"]
+                )
+            except (KeyError, ValueError):
+                raise BadW3DXML(
+                    "num_clicks attribute not set to an integer in"
+                    "NumClicks node"
+                )
+            try:
+                if text2bool(num_clicks_node.attrib["reset"]):
+                    if (
+                            num_clicks < link["reset"] or
+                            link["reset"] == -1):
+                        link["reset"] = num_clicks
+            except KeyError:
+                pass
+    for child in actions_node:
+        if child.tag != "Clicks":
+            link["actions"][num_clicks].append(
+                W3DAction.fromXML(child))
+
+
+def _write_link_actions(link, link_node):
+    """Store actions of W3DLink as Actions nodes within Link node"""
+    for clicks, action_list in link["actions"].items():
+        for current_action in action_list:
+            actions_node = ET.SubElement(link_node, "Actions")
+            current_action.toXML(actions_node)
+            clicks_node = ET.SubElement(actions_node, "Clicks")
+            if clicks < 0:
+                ET.SubElement(clicks_node, "Any")
+            else:
+                ET.SubElement(
+                    clicks_node,
+                    "NumClicks",
+                    attrib={
+                        "num_clicks": str(clicks),
+                        "reset": bool2text(link["reset"] == clicks)
+                    }
+                )
+
+
+def _read_object_scale(object_, node):
+    """Store legacy scale from Scale node in W3DObject
+
+    Scale is converted to Blender units once content has been read"""
+    object_["scale"] = float(node.text)
+
+
+def _write_object_scale(object_, object_root):
+    """Store scale of W3DObject in legacy units as Scale node"""
+    node = ET.SubElement(object_root, "Scale")
+    node.text = str(object_["scale"] / object_["content"].blender_scaling)
+
+
+def _read_object_sound(object_, node):
+    """Store name of sound from SoundRef node in W3DObject"""
+    try:
+        object_["sound"] = node.attrib["name"]
+    except KeyError:
+        object_["sound"] = node.text.strip()
+        if not object_["sound"]:
+            raise BadW3DXML(
+                "SoundRef node must specify name attribute")
+
+
+def _write_object_sound(object_, object_root):
+    """Store name of sound associated with W3DObject as SoundRef node"""
+    if object_["sound"] is not None:
+        node = ET.SubElement(
+            object_root, "SoundRef", attrib={"name": object_["sound"]})
+        node.text = object_["sound"]
+
+
+def _color2text(color):
+    return "{},{},{}".format(*color)
+
+
+def generate_material_from_image(filename, double_sided=True, image=None):
+    """Generate Blender material from image for texturing
+
+    :param str filename: Filename of image, also used to identify materials
+    already generated
+    :param bool double_sided: Return material without backface culling?
+    :param image: Optional Blender image to use instead of loading filename
+    """
     try:
         return generate_material_from_image._materials[
             filename][double_sided]
@@ -162,7 +263,9 @@ def generate_material_from_image(filename, double_sided=True):
              "image_texture")
         )
         image_texture = bpy.data.textures.new(name=texture_name, type="IMAGE")
-        image_texture.image = bpy.data.images.load(filename)
+        if image is None:
+            image = bpy.data.images.load(filename)
+        image_texture.image = image
         # NOTE: The above already raises a sensible RuntimeError if file is not
         # found
         image_texture.image.use_alpha = True
@@ -186,7 +289,7 @@ def generate_material_from_image(filename, double_sided=True):
         )
 
     return generate_material_from_image(
-        filename, double_sided=double_sided)
+        filename, double_sided=double_sided, image=image)
 
 
 class W3DLink(W3DFeature):
@@ -227,6 +330,23 @@ class W3DLink(W3DFeature):
         "reset": -1
     }
 
+    xml_codec = XMLCodec(
+        text_field(
+            "Enabled", "enabled", from_text=text2bool, to_text=bool2text),
+        text_field(
+            "RemainEnabled", "remain_enabled", from_text=text2bool,
+            to_text=bool2text),
+        text_field(
+            "EnabledColor", "enabled_color", from_text=text2ints3,
+            to_text=_color2text),
+        text_field(
+            "SelectedColor", "selected_color", from_text=text2ints3,
+            to_text=_color2text),
+        XMLField(
+            "Actions", _read_link_actions, _write_link_actions,
+            repeated=True)
+    )
+
     def __init__(self, *args, **kwargs):
         super(W3DLink, self).__init__(*args, **kwargs)
         if "actions" not in self:
@@ -240,33 +360,7 @@ class W3DLink(W3DFeature):
         """
         linkroot_node = ET.SubElement(object_root, "LinkRoot")
         link_node = ET.SubElement(linkroot_node, "Link")
-
-        node = ET.SubElement(link_node, "Enabled")
-        node.text = bool2text(self["enabled"])
-        node = ET.SubElement(link_node, "RemainEnabled")
-        node.text = bool2text(self["remain_enabled"])
-        node = ET.SubElement(link_node, "EnabledColor")
-        node.text = "{},{},{}".format(*self["enabled_color"])
-        node = ET.SubElement(link_node, "SelectedColor")
-        node.text = "{},{},{}".format(*self["selected_color"])
-
-        for clicks, action_list in self["actions"].items():
-            for current_action in action_list:
-                actions_node = ET.SubElement(link_node, "Actions")
-                current_action.toXML(actions_node)
-                clicks_node = ET.SubElement(actions_node, "Clicks")
-                if clicks < 0:
-                    ET.SubElement(clicks_node, "Any")
-                else:
-                    ET.SubElement(
-                        clicks_node,
-                        "NumClicks",
-                        attrib={
-                            "num_clicks": str(clicks),
-                            "reset": bool2text(self["reset"] == clicks)
-                        }
-                    )
-
+        self.xml_codec.write(self, link_node)
         return linkroot_node
 
     @classmethod
@@ -279,43 +373,7 @@ class W3DLink(W3DFeature):
         link_node = link_root.find("Link")
         if link_node is None:
             raise BadW3DXML("LinkRoot element has no Link subelement")
-        link["enabled"] = text2bool(find_xml_text(link_node, "Enabled"))
-        link["remain_enabled"] = text2bool(
-            find_xml_text(link_node, "RemainEnabled"))
-        node = link_node.find("EnabledColor")
-        if node is not None:
-            link["enabled_color"] = text2tuple(node.text, evaluator=int)
-        node = link_node.find("SelectedColor")
-        if node is not None:
-            link["selected_color"] = text2tuple(node.text, evaluator=int)
-        for actions_node in link_node.findall("Actions"):
-            num_clicks = -1
-            clicks_node = actions_node.find("Clicks")
-            if clicks_node is not None:
-                num_clicks_node = clicks_node.find("NumClicks")
-                if num_clicks_node is not None:
-                    try:
-                        num_clicks = int(
-                            num_clicks_node.attrib["num_clicks"]
-                        )
-                    except (KeyError, ValueError):
-                        raise BadW3DXML(
-                            "num_clicks attribute not set to an integer in"
-                            "NumClicks node"
-                        )
-                    try:
-                        if text2bool(num_clicks_node.attrib["reset"]):
-                            if (
-                                    num_clicks < link["reset"] or
-                                    link["reset"] == -1):
-                                link["reset"] = num_clicks
-                    except KeyError:
-                        pass
-            for child in actions_node:
-                if child.tag != "Clicks":
-                    link["actions"][num_clicks].append(
-                        W3DAction.fromXML(child))
-
+        link_class.xml_codec.read(link, link_node)
         return link
 
     def blend(self, object_name):
@@ -359,6 +417,44 @@ class W3DContent(W3DFeature, metaclass=SubRegisteredClass):
     blender_scaling = 1
     ui_order = []
 
+    instanced = False
+    """True if Blender objects for identical content of this class may share
+    the same data (e.g. mesh)"""
+    _instanced_data = {}
+    """Dictionary mapping instance keys to Blender data already created and
+    the transform of the object first created with it"""
+
+    def instance_key(self):
+        """Return hashable key which is equal for identical content, or None
+        if this content cannot be instanced"""
+        if not self.instanced:
+            return None
+        return (type(self).__name__,) + tuple(
+            (key, self.get(key, self.default_arguments.get(key)))
+            for key in sorted(self.argument_validators)
+        )
+
+    def blend_instance(self):
+        """Create Blender object for this content, sharing the data of an
+        earlier object with identical content where possible
+
+        :returns: The new Blender object and True if its data is shared or
+        False if it was newly created
+        """
+        key = self.instance_key()
+        if key is not None and key in self._instanced_data:
+            data, matrix_basis = self._instanced_data[key]
+            blender_object = bpy.data.objects.new(type(self).__name__, data)
+            # Match any transform applied on creation (e.g. by an importer)
+            blender_object.matrix_basis = matrix_basis
+            bpy.context.scene.objects.link(blender_object)
+            return blender_object, True
+        blender_object = self.blend()
+        if key is not None:
+            W3DContent._instanced_data[key] = (
+                blender_object.data, blender_object.matrix_basis.copy())
+        return blender_object, False
+
     @staticmethod
     def fromXML(content_root):
         """Create object of appropriate subclass from Content node
@@ -391,6 +487,7 @@ class W3DShape(W3DContent):
     :param int depth: height of shape, if shape is cone/cylinder
     """
     ui_order = ["shape_type", "radius", "depth"]
+    instanced = True
     argument_validators = {
         "shape_type": OptionValidator(
             "Sphere", "Cube", "Cone", "Cylinder", "Monkey"),
@@ -498,8 +595,13 @@ class W3DText(W3DContent):
     object_count = 0
 
     ui_order = ["text", "halign", "valign", "font", "depth"]
+    instanced = True
 
     _loaded_fonts = {}
+    _line_meshes = {}
+    """Dictionary mapping (line, font, depth, halign) to mesh of that line"""
+    _line_spacings = {}
+    """Dictionary mapping fonts to distance between lines of text"""
 
     def toXML(self, object_root):
         """Store W3DText as Content node within Object node
@@ -550,14 +652,8 @@ class W3DText(W3DContent):
         raise InvalidArgument(
             "Content node must contain Text node to create W3DText object")
 
-    def blend(self):
-        """Create representation of W3DText in Blender"""
-        type(self).object_count += 1
-        text_content = self["text"].strip()
-        new_text_object = add_text_object(
-            "text_{}".format(type(self).object_count), text_content
-        )
-        lines = line_count(text_content)
+    def _apply_font(self, text_curve):
+        """Set font of Blender text curve, loading the font if necessary"""
         font_spec = self["font"]
         if font_spec is None:
             if platform.system() == "Darwin":
@@ -569,45 +665,122 @@ class W3DText(W3DContent):
 
         if font_spec is not None:
             if self["font"] in self._loaded_fonts:
-                new_text_object.data.font = self._loaded_fonts[self["font"]]
+                text_curve.font = self._loaded_fonts[self["font"]]
             elif not os.path.isabs(font_spec):
                 font_file = os.path.join(os.getcwd(), font_spec)
                 try:
-                    new_text_object.data.font = bpy.data.fonts.load(font_file)
+                    text_curve.font = bpy.data.fonts.load(font_file)
                 except:
                     fontdirs = ["fonts", "Fonts", "FONTS"]
                     for fontdir in fontdirs:
                         if os.path.exists(os.path.join(os.getcwd(), fontdir)):
                             break
                     try:
-                        new_text_object.data.font = bpy.data.fonts.load(
+                        text_curve.font = bpy.data.fonts.load(
                             os.path.join(os.getcwd(), fontdir, self["font"])
                         )
                     except:
                         raise ConsistencyError(
                             "Font file {} could not be found".format(font_file)
                         )
-                self._loaded_fonts[self["font"]] = new_text_object.data.font
+                self._loaded_fonts[self["font"]] = text_curve.font
             else:
                 font_file = font_spec
                 try:
-                    new_text_object.data.font = bpy.data.fonts.load(font_file)
+                    text_curve.font = bpy.data.fonts.load(font_file)
                 except:
                     raise ConsistencyError(
                         "Font file {} could not be found".format(font_file)
                     )
-                self._loaded_fonts[self["font"]] = new_text_object.data.font
+                self._loaded_fonts[self["font"]] = text_curve.font
+
+    def _text_mesh(self, text, align_y):
+        """Return new mesh for text in this content's font, depth and
+        horizontal alignment
+
+        :param str text: The text to be converted
+        :param str align_y: Blender vertical alignment (e.g. "CENTER")
+        """
+        new_text_object = add_text_object(
+            "text_{}".format(type(self).object_count), text
+        )
+        text_curve = new_text_object.data
+        self._apply_font(text_curve)
         #if font_spec is not None:
-        #    new_text_object.data.resolution_u = 1
-        #    new_text_object.data.resolution_v = 1
-        new_text_object.data.extrude = self["depth"]
-        new_text_object.location.y += new_text_object.data.extrude
-        new_text_object.data.fill_mode = "BOTH"
-        new_text_object.data.align_x = self["halign"].upper()
-        new_text_object.data.align_y = self["valign"].upper()
+        #    text_curve.resolution_u = 1
+        #    text_curve.resolution_v = 1
+        text_curve.extrude = self["depth"]
+        text_curve.fill_mode = "BOTH"
+        text_curve.align_x = self["halign"].upper()
+        text_curve.align_y = align_y
 
         mesh = new_text_object.to_mesh(bpy.context.scene, False, 'PREVIEW')
+        bpy.data.objects.remove(new_text_object)
+        bpy.data.curves.remove(text_curve)
+        return mesh
+
+    def _line_spacing(self):
+        """Return distance between baselines of consecutive lines in this
+        content's font"""
+        if self["font"] not in self._line_spacings:
+            one_line, two_lines = (
+                self._text_mesh(text, "TOP_BASELINE")
+                for text in ("X", "X\nX")
+            )
+            self._line_spacings[self["font"]] = (
+                min(vert.co.y for vert in one_line.vertices) -
+                min(vert.co.y for vert in two_lines.vertices)
+            )
+            bpy.data.meshes.remove(one_line)
+            bpy.data.meshes.remove(two_lines)
+        return self._line_spacings[self["font"]]
+
+    def _line_mesh(self, line):
+        """Return mesh for a single line of text with its baseline at y=0,
+        reusing any identical line already converted"""
+        key = (line, self["font"], self["depth"], self["halign"])
+        if key not in self._line_meshes:
+            self._line_meshes[key] = self._text_mesh(line, "TOP_BASELINE")
+        return self._line_meshes[key]
+
+    def _paragraph_mesh(self, lines):
+        """Return new mesh for several lines of text, assembled from the
+        meshes of individual lines
+
+        Lines are stacked from a baseline at y=0 regardless of valign, which
+        only shifts the text as a whole and so is undone when W3DObject
+        centers the mesh.
+        """
+        spacing = self._line_spacing()
+        paragraph = bmesh.new()
+        for line_number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            first_vert = len(paragraph.verts)
+            paragraph.from_mesh(self._line_mesh(line))
+            paragraph.verts.ensure_lookup_table()
+            bmesh.ops.translate(
+                paragraph, verts=paragraph.verts[first_vert:],
+                vec=(0, -line_number * spacing, 0)
+            )
+        mesh = bpy.data.meshes.new(
+            "text_{}".format(type(self).object_count))
+        paragraph.to_mesh(mesh)
+        paragraph.free()
+        return mesh
 
+    def blend(self):
+        """Create representation of W3DText in Blender
+
+        Text of several lines is assembled from cached meshes of its
+        individual lines, since long paragraphs often share lines.
+        """
+        type(self).object_count += 1
+        lines = self["text"].strip().split("\n")
+        if len(lines) > 1:
+            mesh = self._paragraph_mesh(lines)
+        else:
+            mesh = self._text_mesh(lines[0], self["valign"].upper())
 
         final_object = bpy.data.objects.new(
             "mesh_text_{}".format(type(self).object_count), mesh
@@ -632,9 +805,21 @@ class W3DImage(W3DContent):
 
     :param str filename: Filename of image to be displayed"""
     ui_order = ["filename"]
+    instanced = True
     argument_validators = {
         "filename": ValidFile()}
 
+    processed_files = {}
+    """Dictionary mapping filenames of images to filenames of preprocessed
+    (e.g. downscaled) copies to be used in their place"""
+    atlas_regions = {}
+    """Dictionary mapping filenames of images packed into texture atlases to
+    :py:class:`pyw3d.atlas.AtlasRegion` tuples"""
+    atlas_materials = {}
+    """Dictionary mapping (atlas image name, lighting, double_sided) to the
+    material shared by all objects with those settings whose images are
+    packed into that atlas"""
+
     def toXML(self, object_root):
         """Store W3DImage as Content node within Object node
 
@@ -665,6 +850,15 @@ class W3DImage(W3DContent):
         raise InvalidArgument(
             "Content node must contain Image node to create W3DImage object")
 
+    def processed_filename(self):
+        """Return filename of the image file to be used for this content"""
+        return self.processed_files.get(self["filename"], self["filename"])
+
+    def atlas_region(self):
+        """Return :py:class:`pyw3d.atlas.AtlasRegion` of this image, or None
+        if it is not packed into a texture atlas"""
+        return self.atlas_regions.get(self.processed_filename())
+
     def blend(self):
         """Create representation of W3DImage in Blender"""
         BPY_OPS_CALL(
@@ -674,13 +868,25 @@ class W3DImage(W3DContent):
         new_image_object = bpy.context.object
         apply_euler_rotation(new_image_object, math.pi / 2, 0, 0)
 
-        material = generate_material_from_image(self["filename"])
+        filename = self.processed_filename()
+        region = self.atlas_region()
+        if region is None:
+            material = generate_material_from_image(filename)
+        else:
+            material = generate_material_from_image(
+                region.image.name, image=region.image)
         material.use_nodes = False
         image = material.texture_slots[0].texture.image
 
         new_image_object.active_material = material
 
         new_image_object.data.uv_textures.new()
+        if region is not None:
+            for loop_uv in new_image_object.data.uv_layers[0].data:
+                loop_uv.uv = [
+                    region.offset[i] + loop_uv.uv[i] * region.scale[i]
+                    for i in range(2)
+                ]
         new_image_object.data.materials.append(material)
         new_image_object.data.uv_textures[0].data[0].image = image
         material.game_settings.alpha_blend = 'ALPHA'
@@ -747,6 +953,7 @@ class W3DModel(W3DContent):
     """
     # TODO: Does not seem to play nice with GLSL shader. FIX THIS.
     ui_order = ["filename"]
+    instanced = True
     argument_validators = {
         "filename": ValidFile(),
         "check_collisions": IsBoolean()}
@@ -970,6 +1177,29 @@ class W3DObject(W3DFeature):
         "double_sided": True
     }
 
+    xml_codec = XMLCodec(
+        text_field(
+            "Visible", "visible", from_text=text2bool, to_text=bool2text),
+        text_field(
+            "DoubleSided", "double_sided", from_text=text2bool,
+            to_text=bool2text, write_default=False),
+        text_field(
+            "Color", "color", from_text=text2ints3, to_text=_color2text),
+        text_field(
+            "Lighting", "lighting", from_text=text2bool, to_text=bool2text),
+        text_field(
+            "ClickThrough", "click_through", from_text=text2bool,
+            to_text=bool2text),
+        text_field(
+            "AroundSelfAxis", "around_own_axis", from_text=text2bool,
+            to_text=bool2text),
+        XMLField("Scale", _read_object_scale, _write_object_scale),
+        XMLField("SoundRef", _read_object_sound, _write_object_sound),
+        feature_field("Placement", "placement", W3DPlacement),
+        feature_field("LinkRoot", "link", W3DLink),
+        feature_field("Content", "content", W3DContent)
+    )
+
     def __init__(self, *args, **kwargs):
         super(W3DObject, self).__init__(*args, **kwargs)
         self.ui_order = [
@@ -986,30 +1216,7 @@ class W3DObject(W3DFeature):
         """
         object_root = ET.SubElement(
             all_objects_root, "Object", attrib={"name": self["name"]})
-        node = ET.SubElement(object_root, "Visible")
-        node.text = bool2text(self["visible"])
-        if not self.is_default("double_sided"):
-            node = ET.SubElement(object_root, "DoubleSided")
-            node.text = bool2text(self["double_sided"])
-        node = ET.SubElement(object_root, "Color")
-        node.text = "{},{},{}".format(*self["color"])
-        node = ET.SubElement(object_root, "Lighting")
-        node.text = bool2text(self["lighting"])
-        node = ET.SubElement(object_root, "ClickThrough")
-        node.text = bool2text(self["click_through"])
-        node = ET.SubElement(object_root, "AroundSelfAxis")
-        node.text = bool2text(self["around_own_axis"])
-        node = ET.SubElement(object_root, "Scale")
-        node.text = str(self["scale"] / self["content"].blender_scaling)
-        if self["sound"] is not None:
-            node = ET.SubElement(
-                object_root, "SoundRef", attrib={"name": self["sound"]})
-            node.text = self["sound"]
-        self["placement"].toXML(object_root)
-        if self["link"] is not None:
-            self["link"].toXML(object_root)
-        self["content"].toXML(object_root)
-
+        self.xml_codec.write(self, object_root)
         return object_root
 
     @classmethod
@@ -1023,51 +1230,19 @@ class W3DObject(W3DFeature):
             new_object["name"] = object_root.attrib["name"]
         except KeyError:
             raise BadW3DXML("All Object nodes must have a name attribute set")
-        node = object_root.find("Visible")
-        if node is not None:
-            new_object["visible"] = text2bool(node.text)
-        node = object_root.find("DoubleSided")
-        if node is not None:
-            new_object["double_sided"] = text2bool(node.text)
-        node = object_root.find("Color")
-        if node is not None:
-            new_object["color"] = text2tuple(node.text, evaluator=int)
-        node = object_root.find("Lighting")
-        if node is not None:
-            new_object["lighting"] = text2bool(node.text)
-        node = object_root.find("ClickThrough")
-        if node is not None:
-            new_object["click_through"] = text2bool(node.text)
-        node = object_root.find("AroundSelfAxis")
-        if node is not None:
-            new_object["around_own_axis"] = text2bool(node.text)
-        node = object_root.find("Scale")
-        if node is not None:
-            new_object["scale"] = float(node.text)
-        node = object_root.find("SoundRef")
-        if node is not None:
-            try:
-                new_object["sound"] = node.attrib["name"]
-            except KeyError:
-                new_object["sound"] = node.text.strip()
-                if not new_object["sound"]:
-                    raise BadW3DXML(
-                        "SoundRef node must specify name attribute")
-        node = object_root.find("Placement")
-        if node is not None:
-            new_object["placement"] = W3DPlacement.fromXML(node)
-        node = object_root.find("LinkRoot")
-        if node is not None:
-            new_object["link"] = W3DLink.fromXML(node)
-        node = object_root.find("Content")
-        if node is not None:
-            new_object["content"] = W3DContent.fromXML(node)
+        object_class.xml_codec.read(new_object, object_root)
+        if "content" in new_object:
             new_object["scale"] = (
                 new_object["scale"] * new_object["content"].blender_scaling)
         return new_object
 
-    def apply_material(self, blender_object):
-        """Apply properties of object to material for Blender object"""
+    def apply_material(self, blender_object, shared_data=False):
+        """Apply properties of object to material for Blender object
+
+        :param bool shared_data: True if blender_object shares its data (and
+        so its materials) with other objects, in which case its materials are
+        linked to the object itself instead
+        """
         if not len(blender_object.material_slots):
             blender_object.active_material = bpy.data.materials.new(
                 generate_blender_material_name(self["name"]))
@@ -1077,8 +1252,28 @@ class W3DObject(W3DFeature):
                         not self["double_sided"]
                     )
         else:
+            region = None
+            if isinstance(self["content"], W3DImage):
+                region = self["content"].atlas_region()
             for slot in blender_object.material_slots:
-                slot.material = slot.material.copy()
+                # Objects with images in the same atlas and the same settings
+                # share one material, so that they can be drawn together
+                if region is not None:
+                    atlas_key = (
+                        region.image.name, self["lighting"],
+                        self["double_sided"])
+                    material = W3DImage.atlas_materials.get(atlas_key)
+                else:
+                    material = None
+                if material is None:
+                    material = slot.material.copy()
+                    material.game_settings.use_backface_culling = (
+                        not self["double_sided"])
+                    if region is not None:
+                        W3DImage.atlas_materials[atlas_key] = material
+                if shared_data:
+                    slot.link = "OBJECT"
+                slot.material = material
 
         for slot in blender_object.material_slots:
             material = slot.material
@@ -1096,39 +1291,34 @@ class W3DObject(W3DFeature):
         bpy.data.lamps[new_light_object.name].color = color
         return new_light_object
 
-    def blend(self):
-        """Create representation of W3DObject in Blender"""
-        blender_object = self["content"].blend()
+    def blend(self, particle_template=True):
+        """Create representation of W3DObject in Blender
+
+        :param bool particle_template: Also create a template from which a
+        W3DPSys may emit copies of this object (see
+        :py:meth:`blend_particle_template`)
+        """
+        blender_object, shared_data = self["content"].blend_instance()
         blender_object.name = generate_blender_object_name(self["name"])
         blender_object.hide_render = not self["visible"]
-        try:
-            new_center = find_object_midpoint(blender_object)
-            new_center.y = 0
-            set_object_center(blender_object, new_center)
-        except AttributeError:  # Non-mesh
-            pass
+        if not shared_data:  # Shared data has already been centered
+            try:
+                new_center = find_object_midpoint(blender_object)
+                new_center.y = 0
+                set_object_center(blender_object, new_center)
+            except AttributeError:  # Non-mesh
+                pass
         blender_object.scale = [self["scale"], ] * 3
         self["placement"].place(blender_object)
         LOGGER.debug("Object: {}".format(blender_object.name))
         LOGGER.debug("Position: {}".format(blender_object.location))
 
-        for object_ in bpy.context.selectable_objects:
-            object_.select = False
-
-        blender_object.select = True
-        bpy.context.scene.objects.active = blender_object
+        SelectionManager.select_only(blender_object)
 
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'BOOL', 'name': 'visible_tag'}
-        )
-        blender_object.game.properties["visible_tag"].value = self["visible"]
-        BPY_OPS_CALL(
-            "object.game_property_new", None,
-            {'type': 'BOOL', 'name': 'click_through'}
-        )
-        blender_object.game.properties[
-            "click_through"].value = self["click_through"]
+        add_game_property(
+            blender_object, "BOOL", "visible_tag", self["visible"])
+        add_game_property(
+            blender_object, "BOOL", "click_through", self["click_through"])
 
         blender_object.game.physics_type = 'DYNAMIC'
         blender_object.game.use_ghost = True
@@ -1140,21 +1330,12 @@ class W3DObject(W3DFeature):
             blender_lamp.name = generate_light_object_name(self["name"])
             self.apply_lamp_color(blender_lamp)
 
-        self.apply_material(blender_object)
+        self.apply_material(blender_object, shared_data=shared_data)
         blender_object.layers = [layer == 0 for layer in range(20)]
 
 
-        # TODO: It is *ridiculous* to duplicate every single object to get
-        # particle copies. This should be handled smartly in psys.py
-        particle_name = generate_blender_particle_name(blender_object.name)
-        particle_copy = duplicate_object(blender_object)
-        particle_copy.name = particle_name
-        particle_copy.hide_render = False
-        particle_copy.color[3] = 1
-        bpy.data.objects[particle_name].layers = [
-            layer == 5 for layer in range(20)
-        ]
-        bpy.data.objects[particle_name].game.physics_type = 'DYNAMIC'
+        if particle_template:
+            self.blend_particle_template(blender_object)
 
         if self["link"] is not None:
             self["link"].blend(generate_blender_object_name(self["name"]))
@@ -1162,16 +1343,9 @@ class W3DObject(W3DFeature):
         if self["sound"] is not None:
             sound_name = generate_blender_sound_name(self["sound"])
             sound_actuator_name = generate_blender_sound_name(self["name"])
-            BPY_OPS_CALL(
-                "logic.actuator_add", None,
-                {
-                    'type': 'SOUND',
-                    'object': blender_object.name,
-                    'name': sound_actuator_name
-                }
-            )
+            actuator = add_actuator(
+                blender_object, "SOUND", sound_actuator_name)
             try:
-                actuator = blender_object.game.actuators[sound_actuator_name]
                 central_actuator = audio_playback_object().game.actuators[
                     sound_name]
             except KeyError:
@@ -1189,6 +1363,22 @@ class W3DObject(W3DFeature):
 
         return blender_object
 
+    def blend_particle_template(self, blender_object):
+        """Create copy of Blender object on an inactive layer, for a W3DPSys
+        to emit
+
+        The copy shares the object's mesh rather than duplicating it.
+        """
+        particle_copy = duplicate_object(blender_object, share_data=True)
+        SelectionManager.track(particle_copy)  # Copied with selection state
+        particle_copy.name = generate_blender_particle_name(
+            blender_object.name)
+        particle_copy.hide_render = False
+        particle_copy.color[3] = 1
+        particle_copy.layers = [layer == 5 for layer in range(20)]
+        particle_copy.game.physics_type = 'DYNAMIC'
+        return particle_copy
+
     def write_blender_logic(self):
         """Write Python logic for this object to associated script"""
         try:
@@ -1346,33 +1536,14 @@ def activate_particles(cont):
         psys_object = bpy.data.objects.new(psys_name, None)
         bpy.context.scene.objects.link(psys_object)
 
-        bpy.context.scene.objects.active = psys_object
-
-        BPY_OPS_CALL(
-            "logic.sensor_add", None,
-            {
-                'type': 'PROPERTY', 'object': psys_object.name,
-                'name': 'visible_sensor'
-            }
-        )
-        psys_object.game.sensors[-1].name = "visible_sensor"
-        visible_sensor = psys_object.game.sensors["visible_sensor"]
+        visible_sensor = add_sensor(psys_object, "PROPERTY", "visible_sensor")
         visible_sensor.property = "visible_tag"
         visible_sensor.value = "True"
         visible_sensor.use_pulse_true_level = True
 
-        bpy.context.scene.objects.active = psys_object
-        BPY_OPS_CALL(
-            "logic.controller_add", None,
-            {
-                'type': 'PYTHON', 'object': psys_object.name,
-                'name': 'activate_particles'
-            }
-        )
-        psys_object.game.controllers[-1].name = "activate_particles"
-        controller = psys_object.game.controllers["activate_particles"]
-        controller.mode = "MODULE"
-        controller.module = "{}.activate_particles".format(psys_name)
+        controller = add_python_controller(
+            psys_object, "activate_particles",
+            "{}.activate_particles".format(psys_name))
         controller.link(visible_sensor)
 
         script.write(self.generate_logic())
@@ -33,9 +33,31 @@ class UnsetValueError(Exception):
 class ProjectPath(object):
     """Specifies a location within W3DProject tree"""
 
+    def mark_modified(self):
+        """Flag the innermost W3DFeature containing the element specified by
+        this path as modified
+
+        Changes made directly to a W3DFeature are tracked by the feature
+        itself, but lists and dictionaries it stores cannot report in-place
+        changes, so anything that alters them must call this (see
+        :py:meth:`pyw3d.features.W3DFeature.is_dirty`)"""
+        element = self.project
+        owner = None
+        for spec in [None] + self.path:
+            if spec is not None:
+                try:
+                    element = element[spec]
+                except (KeyError, IndexError, TypeError):
+                    break
+            if hasattr(element, "mark_dirty"):
+                owner = element
+        if owner is not None:
+            owner.mark_dirty()
+
     def insert_index_element(self, index, value):
         """Insert element in list and update indices in path"""
         self.get_element().insert(index, value)
+        self.mark_modified()
         for i in range(index+1, len(self.get_element())):
             try:
                 self.get_element()[i].project_path.set_specifier(i+1)
@@ -45,12 +67,18 @@ class ProjectPath(object):
     def remove_index_element(self, index):
         """Removes an element from a list within W3DProject tree"""
         del self.get_element()[index]
+        self.mark_modified()
         for i in range(len(self.get_element())):
             try:
                 self.get_element()[i].project_path.set_specifier(i)
             except AttributeError:
                 pass
 
+    def append_element(self, value):
+        """Append an element to a list within W3DProject tree"""
+        self.get_element().append(value)
+        self.mark_modified()
+
     def create_child_path(self, specifier):
         """Create a new path with given specifier appended"""
         new_path = [spec for spec in self.path]
@@ -85,6 +113,7 @@ class ProjectPath(object):
         """Delete the element specified by this path"""
         parent = self.get_element_parent()
         del parent[self.path[-1]]
+        self.create_parent_path().mark_modified()
 
     def set_element(self, value):
         """Set the element specified by this path to given value"""
@@ -102,6 +131,7 @@ class ProjectPath(object):
             else:
                 raise PathError(
                     "Element could not be created at given index")
+        self.create_parent_path().mark_modified()
 
     def get_element(self):
         """Return the value of the option specified by this path
@@ -22,7 +22,7 @@ from .features import W3DFeature
 from .validators import OptionValidator, ListValidator, IsNumeric, \
     FeatureValidator
 from .errors import BadW3DXML, ConsistencyError
-from .xml_tools import text2tuple
+from .xml_tools import text2floats3, XMLCodec, text_field, feature_field
 from .names import generate_relative_to_name
 import logging
 LOGGER = logging.getLogger("pyw3d")
@@ -52,6 +52,15 @@ def convert_to_legacy_axes(vector):
     return list((vector[0] / 0.3048, vector[2] / 0.3048, -vector[1] / 0.3048))
 
 
+WALL_POSITIONS = {
+    "Center": convert_to_blender_axes((0, 0, 0)),
+    "FrontWall": convert_to_blender_axes((0, 0, -4)),
+    "LeftWall": convert_to_blender_axes((-4, 0, 0)),
+    "RightWall": convert_to_blender_axes((4, 0, 0)),
+    "FloorWall": convert_to_blender_axes((0, -4, 0))}
+"""Default positions of the objects representing each relative_to option"""
+
+
 def matrix_from_look(look_direction, up_direction=None):
     """Create rotation_matrix from look-at direction"""
     if up_direction is None:  # Gracefully handle no mathutils module
@@ -112,12 +121,12 @@ class W3DRotation(W3DFeature):
         try:
             rotation_vector = rot_root.attrib["rotation"]
             rotation["rotation_vector"] = convert_to_blender_axes(
-                text2tuple(rotation_vector, evaluator=float))
+                text2floats3(rotation_vector))
         except KeyError:
             try:
                 rotation_vector = rot_root.attrib["target"]
                 rotation["rotation_vector"] = convert_to_blender_axes(
-                    text2tuple(rotation_vector, evaluator=float))
+                    text2floats3(rotation_vector))
             except KeyError:  # No rotation vector specified
                 pass
         try:
@@ -194,6 +203,22 @@ class W3DPlacement(W3DFeature):
         "relative_to": "Center",
         "position": (0, 0, 0),
     }
+    xml_codec = XMLCodec(
+        text_field("RelativeTo", "relative_to", from_text=str.strip),
+        text_field(
+            "Position", "position",
+            from_text=lambda text: convert_to_blender_axes(
+                text2floats3(text)),
+            to_text=lambda position: str(tuple(
+                convert_to_legacy_axes(position))),
+            write_default=False
+        ),
+        feature_field(
+            ("Axis", "LookAt", "Normal"), "rotation", W3DRotation,
+            write_default=False
+        )
+    )
+
     relative_to_objects = {}
     """Dictionary mapping names of relative_to options to Blender
     representations
@@ -208,42 +233,19 @@ class W3DPlacement(W3DFeature):
 
     def toXML(self, parent_root):
         place_root = ET.SubElement(parent_root, "Placement")
-        rel_root = ET.SubElement(place_root, "RelativeTo")
-        rel_root.text = self["relative_to"]
-        if not self.is_default("position"):
-            pos_root = ET.SubElement(place_root, "Position")
-            pos_root.text = str(tuple(
-                convert_to_legacy_axes(self["position"])))
-        if not self.is_default("rotation"):
-            self["rotation"].toXML(place_root)
+        self.xml_codec.write(self, place_root)
         return place_root
 
     @classmethod
     def fromXML(place_class, place_root):
         placement = place_class()
-        rel_root = place_root.find("RelativeTo")
-        if rel_root is not None:
-            placement["relative_to"] = rel_root.text.strip()
-        pos_root = place_root.find("Position")
-        if pos_root is not None:
-            placement["position"] = convert_to_blender_axes(
-                text2tuple(pos_root.text.strip(), evaluator=float))
-        for rotation_mode in ["Axis", "LookAt", "Normal"]:
-            rot_root = place_root.find(rotation_mode)
-            if rot_root is not None:
-                placement["rotation"] = W3DRotation.fromXML(rot_root)
-                return placement
+        place_class.xml_codec.read(placement, place_root)
         return placement
 
     @classmethod
     def _create_relative_to_objects(
             place_class,
-            wall_positions={
-                "Center": convert_to_blender_axes((0, 0, 0)),
-                "FrontWall": convert_to_blender_axes((0, 0, -4)),
-                "LeftWall": convert_to_blender_axes((-4, 0, 0)),
-                "RightWall": convert_to_blender_axes((4, 0, 0)),
-                "FloorWall": convert_to_blender_axes((0, -4, 0))},
+            wall_positions=WALL_POSITIONS,
             wall_rotations={
                 "Center": (0, 0, 0),
                 "FrontWall": (0, 0, 0),
@@ -274,6 +276,18 @@ class W3DPlacement(W3DFeature):
 
         return place_class.relative_to_objects
 
+    @classmethod
+    def _find_relative_to_objects(place_class):
+        """Use the relative_to objects already present in the current
+        Blender file, e.g. after reopening a previously exported project"""
+        place_class.relative_to_objects.clear()
+        for wall_name in place_class.argument_validators[
+                "relative_to"].valid_options:
+            if wall_name not in ("Camera",):
+                place_class.relative_to_objects[wall_name] = bpy.data.objects[
+                    generate_relative_to_name(wall_name)]
+        return place_class.relative_to_objects
+
     def place(self, blender_object):
         """Place Blender object in specified position and orientation
         """
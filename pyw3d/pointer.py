@@ -20,6 +20,7 @@
 
 import logging
 from .blender_scripts import MOUSE_LOOK_SCRIPT
+from .logic_bricks import add_sensor, add_python_controller, add_actuator
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
@@ -29,42 +30,17 @@ except ImportError:
 
 
 def setup_mouselook(project):
-    bpy.context.scene.objects.active = project.main_camera
-    bpy.ops.logic.sensor_add(
-        type="MOUSE",
-        object=project.main_camera.name,
-        name="Look"
-    )
-    project.main_camera.game.sensors[-1].name = "Look"
-    sensor = project.main_camera.game.sensors["Look"]
+    camera = project.main_camera
+    sensor = add_sensor(camera, "MOUSE", "Look")
     sensor.mouse_event = "MOVEMENT"
-    bpy.ops.logic.controller_add(
-        type='PYTHON',
-        object=project.main_camera.name,
-        name="Look")
-    project.main_camera.game.controllers[-1].name = "Look"
-    controller = project.main_camera.game.controllers["Look"]
-    controller.mode = "MODULE"
-    controller.module = "mouse.look"
+    controller = add_python_controller(camera, "Look", "mouse.look")
     controller.link(sensor=sensor)
-    bpy.ops.logic.actuator_add(
-        type="MOTION",
-        object=project.main_camera.name,
-        name="Look_x"
-    )
-    project.main_camera.game.actuators[-1].name = "Look_x"
-    actuator = project.main_camera.game.actuators["Look_x"]
+    actuator = add_actuator(camera, "MOTION", "Look_x")
     actuator.mode = "OBJECT_NORMAL"
     actuator.use_local_rotation = True
     controller.link(actuator=actuator)
 
-    bpy.ops.logic.actuator_add(
-        type="MOTION",
-        object=project.main_camera.name,
-        name="Look_y"
-    )
-    project.main_camera.game.actuators[-1].name = "Look_y"
-    actuator = project.main_camera.game.actuators["Look_y"]
+    actuator = add_actuator(camera, "MOTION", "Look_y")
     actuator.mode = "OBJECT_NORMAL"
     actuator.use_local_rotation = False
     controller.link(actuator=actuator)
@@ -77,22 +53,9 @@ def setup_mouselook(project):
 
 
 def setup_click(project):
-    bpy.ops.logic.sensor_add(
-        type="MOUSE",
-        object=project.main_camera.name,
-        name="Click"
-    )
-    project.main_camera.game.sensors[-1].name = "Click"
-    click_sensor = project.main_camera.game.sensors["Click"]
+    click_sensor = add_sensor(project.main_camera, "MOUSE", "Click")
     click_sensor.mouse_event = "LEFTCLICK"
 
-    bpy.ops.logic.controller_add(
-        type='PYTHON',
-        object=project.main_camera.name,
-        name="Click"
-    )
-    project.main_camera.game.controllers[-1].name = "Click"
-    controller = project.main_camera.game.controllers["Click"]
-    controller.mode = "MODULE"
-    controller.module = "mouse.click"
+    controller = add_python_controller(
+        project.main_camera, "Click", "mouse.click")
     controller.link(sensor=click_sensor)
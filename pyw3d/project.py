@@ -18,26 +18,41 @@
 """Tools for working with W3D projects
 """
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
+import io
 import logging
 import math
 import os
+import shutil
 import sys
+import tempfile
 from .features import W3DFeature
 from .placement import W3DPlacement, W3DRotation, convert_to_blender_axes
 from .validators import ListValidator, IsNumeric, OptionValidator,\
     IsBoolean, FeatureValidator, IsInteger, DictValidator
-from .xml_tools import bool2text, text2tuple, attrib2bool, text2bool
-from .objects import W3DObject
+from .xml_tools import bool2text, text2ints3, attrib2bool, text2bool, \
+    index_xml_nodes, write_pretty_xml, pretty_xml_node, preparse_positions
+from .structs import LazyFeatureList
+from .project_cache import hash_file, load_project_cache, save_project_cache
+from .scene_manifest import MANIFEST_SECTIONS, project_manifest, \
+    plan_rebuild, read_manifest, write_manifest, remove_blender_features
+from .objects import W3DObject, W3DContent, W3DText, W3DImage, W3DPSys, \
+    generate_object_from_model, generate_material_from_image
+from .atlas import build_atlases
+from .image_cache import preprocess_images
 from .psys import W3DPAction
-from .sounds import W3DSound
+from .sounds import W3DSound, generate_blender_audio_from_file
 from .timeline import W3DTimeline
-from .groups import W3DGroup
+from .groups import W3DGroup, group_members
 from .triggers import W3DTrigger
 from .errors import BadW3DXML
-from .blender_scripts import MOVE_TOGGLE_SCRIPT, ANGLES_SCRIPT
+from .blender_scripts import MOVE_TOGGLE_SCRIPT, ANGLES_SCRIPT, \
+    ACTION_TABLE_SCRIPT, OBJECT_HANDLES_SCRIPT
 from .names import generate_light_object_name
 from .pointer import setup_mouselook, setup_click
+from .event_boxes import setup_event_boxes
+from .selection import SelectionManager
+from .logic_bricks import add_sensor, add_controller, add_python_controller, \
+    add_actuator, add_game_property
 LOGGER = logging.getLogger("pyw3d")
 try:
     import bpy
@@ -46,14 +61,52 @@ except ImportError:
         "Module bpy not found. Loading pyw3d.project as standalone")
 
 
+def _read_bytes(source_file, start, end):
+    """Read the given byte range of an open binary file"""
+    source_file.seek(start)
+    return source_file.read(end - start)
+
+
 def clear_blender_scene():
     LOGGER.debug("Clearing all objects from Blender scene...")
     for obj in bpy.context.scene.objects:
         obj.select = True
     bpy.ops.object.delete()
+    SelectionManager.forget()
     bpy.data.lamps[-1].name = generate_light_object_name("first")
 
 
+def reset_blender_state():
+    """Return Blender to its startup state and forget any Blender data cached
+    by pyw3d, so that another project can be built in the same session"""
+    LOGGER.debug("Resetting Blender session...")
+    bpy.ops.wm.read_homefile()
+    _forget_blender_data()
+
+
+def open_blender_file(filename):
+    """Open a previously exported .blend file for further changes, forgetting
+    any Blender data cached by pyw3d"""
+    LOGGER.debug("Opening {}...".format(filename))
+    bpy.ops.wm.open_mainfile(filepath=filename)
+    _forget_blender_data()
+
+
+def _forget_blender_data():
+    SelectionManager.forget()
+    generate_object_from_model._models = {}
+    generate_material_from_image._materials = {}
+    generate_blender_audio_from_file._sounds = {}
+    W3DText._loaded_fonts.clear()
+    W3DText._line_meshes.clear()
+    W3DText._line_spacings.clear()
+    W3DContent._instanced_data.clear()
+    W3DImage.processed_files = {}
+    W3DImage.atlas_regions = {}
+    W3DImage.atlas_materials = {}
+    W3DPlacement.relative_to_objects.clear()
+
+
 def setup_blender_layout():
     """Put Blender interface in a convenient layout"""
     bpy.context.window.screen = bpy.data.screens["Game Logic"]
@@ -74,29 +127,10 @@ def add_key_movement(
     :param str key: Key used to activate motion
     :param int direction: 0, 1, 2 for x, y, z
     :param float speed: Speed of motion"""
-    bpy.context.scene.objects.active = blender_object
-    bpy.ops.logic.sensor_add(
-        type="KEYBOARD",
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.sensors[-1].name = move_name
-    sensor = blender_object.game.sensors[move_name]
+    sensor = add_sensor(blender_object, "KEYBOARD", move_name)
     sensor.key = key
-    bpy.ops.logic.controller_add(
-        type='LOGIC_AND',
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.controllers[-1].name = move_name
-    controller = blender_object.game.controllers[move_name]
-    bpy.ops.logic.actuator_add(
-        type="MOTION",
-        object=blender_object.name,
-        name=move_name
-    )
-    blender_object.game.actuators[-1].name = move_name
-    actuator = blender_object.game.actuators[move_name]
+    controller = add_controller(blender_object, "LOGIC_AND", move_name)
+    actuator = add_actuator(blender_object, "MOTION", move_name)
     actuator.mode = "OBJECT_NORMAL"
     actuator.offset_location[direction] = speed
     actuator.use_local_location = True
@@ -122,6 +156,21 @@ class W3DProject(W3DFeature):
     :param bool allow_rotation: Allow user to rotate withing project?
     :param bool debug: Turn on debug-level logging
     :param bool profile: Turn on performance profiling
+    :param int atlas_threshold: Pack images no larger than this many pixels
+    in width and height into shared texture atlases, whose objects then
+    share materials where their settings allow (0 to disable)
+    :param int max_image_size: Scale down images to no more than this many
+    pixels in width or height, and to no more than is needed at their
+    distance from the viewer (0 to disable)
+    :param bool scheduled_timelines: Run timelines from a precomputed
+    schedule, so that only running actions are checked each tick
+    :param bool action_tables: Describe timeline actions which only change
+    the visibility, color or scale of an object or group by rows of data
+    interpreted by a shared script, which advances all such changes together
+    each tick, rather than by generated Python logic
+    :param bool indexed_triggers: Check the boxes of all head position and
+    movement triggers from a single script using a spatial index, rather
+    than from a separate script for each trigger
     :param dict wall_placements: Dictionary mapping names of walls to
     W3DPlacements specifying their position and orientation
     """
@@ -173,6 +222,11 @@ class W3DProject(W3DFeature):
         "allow_rotation": IsBoolean(),
         "debug": IsBoolean(),
         "profile": IsBoolean(),
+        "atlas_threshold": IsInteger(min_value=0),
+        "max_image_size": IsInteger(min_value=0),
+        "scheduled_timelines": IsBoolean(),
+        "action_tables": IsBoolean(),
+        "indexed_triggers": IsBoolean(),
         "wall_placements": DictValidator(
             OptionValidator(
                 "Center", "FrontWall", "LeftWall", "RightWall", "FloorWall"),
@@ -187,7 +241,29 @@ class W3DProject(W3DFeature):
         "allow_rotation": True,
         "debug": False,
         "profile": False,
+        "atlas_threshold": 0,
+        "max_image_size": 0,
+        "scheduled_timelines": False,
+        "action_tables": False,
+        "indexed_triggers": False,
+    }
+
+    STREAM_BATCH_SIZE = 256
+    """Number of section children whose positions are parsed together by
+    fromXML and fromXML_stream"""
+
+    section_tags = {
+        "ObjectRoot": ("Object", "objects", W3DObject),
+        "GroupRoot": ("Group", "groups", W3DGroup),
+        "TimelineRoot": ("Timeline", "timelines", W3DTimeline),
+        "SoundRoot": ("Sound", "sounds", W3DSound),
+        "ParticleActionRoot": (
+            "ParticleActionList", "particle_actions", W3DPAction),
+        "EventRoot": ("EventTrigger", "trigger_events", W3DTrigger)
     }
+    """Dictionary mapping tags of top-level Story sections to the tag of
+    their children, the project key in which those children are stored, and
+    the W3DFeature subclass used to read them"""
 
     def __setitem__(self, key, value):
         if key == "debug":
@@ -200,9 +276,16 @@ class W3DProject(W3DFeature):
     def __init__(self, *args, **kwargs):
         self.call_directory = kwargs.pop("call_directory", None)
         if self.call_directory is None:
-            self.call_directory = os.path.normpath(
-                os.path.dirname(sys.argv[0])
-            )
+            self.call_directory = os.path.dirname(sys.argv[0])
+        # Asset paths are resolved against this even after the working
+        # directory has changed
+        self.call_directory = os.path.abspath(self.call_directory)
+        # Data on the XML file this project was last read from or written to,
+        # used for incremental saves
+        self.source_file = None
+        self._source_stat = None
+        self._source_layout = None
+        self._source_spans = {}
         super(W3DProject, self).__init__(*args, **kwargs)
         os.chdir(self.call_directory)
         if "objects" not in self:
@@ -274,24 +357,19 @@ class W3DProject(W3DFeature):
         """Store W3DProject as W3D XML tree
         """
         project_root = ET.Element("Story", attrib={"version": "8"})
-        object_root = ET.SubElement(project_root, "ObjectRoot")
-        for object_ in self["objects"]:
-            object_.toXML(object_root)
-        group_root = ET.SubElement(project_root, "GroupRoot")
-        for group in self["groups"]:
-            group.toXML(group_root)
-        timeline_root = ET.SubElement(project_root, "TimelineRoot")
-        for timeline in self["timelines"]:
-            timeline.toXML(timeline_root)
-        sound_root = ET.SubElement(project_root, "SoundRoot")
-        for sound in self["sounds"]:
-            sound.toXML(sound_root)
-        paction_root = ET.SubElement(project_root, "ParticleActionRoot")
-        for paction in self["particle_actions"]:
-            paction.toXML(paction_root)
-        event_root = ET.SubElement(project_root, "EventRoot")
-        for trigger in self["trigger_events"]:
-            trigger.toXML(event_root)
+        for section_tag, (child_tag, key, feature_class) in (
+                self.section_tags.items()):
+            section_root = ET.SubElement(project_root, section_tag)
+            for feature in self[key]:
+                feature.toXML(section_root)
+        self._global_toXML(project_root)
+        self._walls_toXML(project_root)
+
+        return project_root
+
+    def _global_toXML(self, project_root):
+        """Store camera, background, and navigation settings as Global node
+        within Story node"""
         global_node = ET.SubElement(project_root, "Global")
         camera_node = ET.SubElement(
             global_node, "CameraPos", attrib={
@@ -314,12 +392,30 @@ class W3DProject(W3DFeature):
         debug_node.text = bool2text(self["debug"])
         profile_node = ET.SubElement(global_node, "Profile")
         profile_node.text = bool2text(self["profile"])
+        if not self.is_default("atlas_threshold"):
+            atlas_node = ET.SubElement(global_node, "AtlasThreshold")
+            atlas_node.text = str(self["atlas_threshold"])
+        if not self.is_default("max_image_size"):
+            size_node = ET.SubElement(global_node, "MaxImageSize")
+            size_node.text = str(self["max_image_size"])
+        if not self.is_default("scheduled_timelines"):
+            schedule_node = ET.SubElement(global_node, "ScheduledTimelines")
+            schedule_node.text = bool2text(self["scheduled_timelines"])
+        if not self.is_default("action_tables"):
+            table_node = ET.SubElement(global_node, "ActionTables")
+            table_node.text = bool2text(self["action_tables"])
+        if not self.is_default("indexed_triggers"):
+            index_node = ET.SubElement(global_node, "IndexedTriggers")
+            index_node.text = bool2text(self["indexed_triggers"])
+        return global_node
+
+    def _walls_toXML(self, project_root):
+        """Store wall placements as PlacementRoot node within Story node"""
         wall_root = ET.SubElement(project_root, "PlacementRoot")
         for wall, placement in self["wall_placements"].items():
             place_root = placement.toXML(wall_root)
             place_root.attrib["name"] = wall
-
-        return project_root
+        return wall_root
 
     @classmethod
     def fromXML(project_class, project_root, call_directory=None):
@@ -328,116 +424,463 @@ class W3DProject(W3DFeature):
         :param :py:class:xml.etree.ElementTree.Element project_root
         """
         new_project = project_class(call_directory=call_directory)
-        object_root = project_root.find("ObjectRoot")
-        if object_root is not None:
-            for child in object_root.findall("Object"):
-                new_project["objects"].append(W3DObject.fromXML(child))
-        group_root = project_root.find("GroupRoot")
-        if group_root is not None:
-            for child in group_root.findall("Group"):
-                new_project["groups"].append(W3DGroup.fromXML(child))
-        timeline_root = project_root.find("TimelineRoot")
-        if timeline_root is not None:
-            for child in timeline_root.findall("Timeline"):
-                new_project["timelines"].append(W3DTimeline.fromXML(child))
-        sound_root = project_root.find("SoundRoot")
-        if sound_root is not None:
-            for child in sound_root.findall("Sound"):
-                new_project["sounds"].append(W3DSound.fromXML(child))
-        paction_root = project_root.find("ParticleActionRoot")
-        if paction_root is not None:
-            for child in paction_root.findall("ParticleActionList"):
-                new_project["particle_actions"].append(
-                    W3DPAction.fromXML(child))
-        trigger_root = project_root.find("EventRoot")
-        if trigger_root is not None:
-            for child in trigger_root.findall("EventTrigger"):
-                new_project["trigger_events"].append(W3DTrigger.fromXML(child))
+        batch_size = project_class.STREAM_BATCH_SIZE
+        for section_tag, (child_tag, key, feature_class) in (
+                project_class.section_tags.items()):
+            section_root = project_root.find(section_tag)
+            if section_root is not None:
+                children = section_root.findall(child_tag)
+                # Parse positions a batch at a time so that the cache still
+                # holds them when each feature is read
+                for start in range(0, len(children), batch_size):
+                    batch = children[start:start + batch_size]
+                    preparse_positions(*batch)
+                    for child in batch:
+                        new_project[key].append(feature_class.fromXML(child))
 
         global_root = project_root.find("Global")
         if global_root is None:
             raise BadW3DXML("Story root has no Global node")
+        new_project._global_fromXML(global_root)
 
+        wall_root = project_root.find("PlacementRoot")
+        new_project._walls_fromXML(wall_root)
+        return new_project
+
+    def _global_fromXML(self, global_root):
+        """Read camera, background, and navigation settings from Global node
+
+        :param :py:class:xml.etree.ElementTree.Element global_root
+        """
         camera_node = global_root.find("CaveCameraPos")
         if camera_node is None:
             raise BadW3DXML("Global node has no CaveCameraPos child")
         if "far-clip" in camera_node.attrib:
-            new_project["far_clip"] = float(camera_node.attrib["far-clip"])
+            self["far_clip"] = float(camera_node.attrib["far-clip"])
         place_node = camera_node.find("Placement")
         if camera_node is None:
             raise BadW3DXML("CameraPos node has no Placement child")
-        new_project["camera_placement"] = W3DPlacement.fromXML(place_node)
+        self["camera_placement"] = W3DPlacement.fromXML(place_node)
 
         camera_node = global_root.find("CameraPos")
         if camera_node is None:
             raise BadW3DXML("Global node has no CameraPos child")
         if "far-clip" in camera_node.attrib:
-            new_project["far_clip"] = float(camera_node.attrib["far-clip"])
+            self["far_clip"] = float(camera_node.attrib["far-clip"])
         place_node = camera_node.find("Placement")
         if camera_node is None:
             raise BadW3DXML("CameraPos node has no Placement child")
-        new_project["desktop_camera_placement"] = W3DPlacement.fromXML(
-            place_node)
+        self["desktop_camera_placement"] = W3DPlacement.fromXML(place_node)
 
         bg_node = global_root.find("Background")
         if bg_node is None:
             raise BadW3DXML("Global node has no Background child")
         if "color" in bg_node.attrib:
-            new_project["background"] = text2tuple(
-                bg_node.attrib["color"],
-                evaluator=int
-            )
+            self["background"] = text2ints3(bg_node.attrib["color"])
 
         wand_node = global_root.find("WandNavigation")
         if wand_node is None:
             raise BadW3DXML("Global node has no WandNavigation child")
-        new_project["allow_rotation"] = attrib2bool(
+        self["allow_rotation"] = attrib2bool(
             wand_node, "allow-rotation", default=False)
-        new_project["allow_movement"] = attrib2bool(
+        self["allow_movement"] = attrib2bool(
             wand_node, "allow-movement", default=False)
 
         debug_node = global_root.find("Debug")
         if debug_node is not None:
-            new_project["debug"] = text2bool(debug_node.text)
+            self["debug"] = text2bool(debug_node.text)
         profile_node = global_root.find("Profile")
         if profile_node is not None:
-            new_project["profile"] = text2bool(profile_node.text)
+            self["profile"] = text2bool(profile_node.text)
+        atlas_node = global_root.find("AtlasThreshold")
+        if atlas_node is not None:
+            self["atlas_threshold"] = int(atlas_node.text)
+        size_node = global_root.find("MaxImageSize")
+        if size_node is not None:
+            self["max_image_size"] = int(size_node.text)
+        schedule_node = global_root.find("ScheduledTimelines")
+        if schedule_node is not None:
+            self["scheduled_timelines"] = text2bool(schedule_node.text)
+        table_node = global_root.find("ActionTables")
+        if table_node is not None:
+            self["action_tables"] = text2bool(table_node.text)
+        index_node = global_root.find("IndexedTriggers")
+        if index_node is not None:
+            self["indexed_triggers"] = text2bool(index_node.text)
 
-        wall_root = project_root.find("PlacementRoot")
+    def _walls_fromXML(self, wall_root):
+        """Read wall placements from PlacementRoot node
+
+        :param :py:class:xml.etree.ElementTree.Element wall_root
+        """
         for placement in wall_root.findall("Placement"):
             try:
                 wall_name = placement.attrib["name"]
             except KeyError:
                 raise BadW3DXML(
                     "Placements within PlacementRoot must specify name")
-            new_project["wall_placements"][
+            self["wall_placements"][
                 wall_name] = W3DPlacement.fromXML(placement)
-        return new_project
 
     @classmethod
-    def fromXML_file(project_class, filename):
+    def fromXML_file(project_class, filename, lazy=False, use_cache=False):
         """Create W3DProject from XML file of given filename
 
+        The file is read incrementally (see :py:meth:`fromXML_stream`), so
+        memory use is bounded by the largest single feature rather than by the
+        size of the whole document.
+
+        If use_cache is set (and lazy is not), the resulting project is also
+        stored in a binary cache in the workspace (see
+        :py:mod:`pyw3d.project_cache`). If the XML file and pyw3d source are
+        unchanged the next time it is opened, the project is loaded from this
+        cache without parsing or validation.
+
+        :param str filename: Filename of XML file for project
+        :param bool lazy: If True, defer reading of objects, groups,
+        timelines, etc. until they are accessed (see
+        :py:meth:`fromXML_lazy`)
+        :param bool use_cache: If True, read and write the project cache
+        """
+        if lazy:
+            return project_class.fromXML_lazy(filename)
+        if not use_cache:
+            return project_class.fromXML_stream(filename)
+
+        filename = os.path.abspath(filename)
+        xml_digest = hash_file(filename)
+        new_project = load_project_cache(filename, xml_digest)
+        if isinstance(new_project, project_class):
+            LOGGER.debug("Loaded {} from cache".format(filename))
+            # The same story may have been cached from another directory, and
+            # asset paths are relative to the story's own directory
+            new_project.call_directory = os.path.dirname(filename)
+            os.chdir(new_project.call_directory)
+            new_project._set_source(
+                filename, new_project._source_layout,
+                new_project._source_spans)
+            return new_project
+        new_project = project_class.fromXML_stream(filename)
+        save_project_cache(new_project, filename, xml_digest)
+        return new_project
+
+    @classmethod
+    def fromXML_lazy(project_class, filename):
+        """Create W3DProject whose features are read from XML on demand
+
+        Only the byte offsets of each child of a section root (e.g. each
+        Object within ObjectRoot) are found when the project is opened. The
+        corresponding W3DFeature is created the first time it is accessed by
+        index or through :py:meth:`LazyFeatureList.get_by_name`.
+
+        .. warning:: The file must not be modified by anything other than
+        this project while unread features remain.
+
+        :param str filename: Filename of XML file for project
+        """
+        # For relative paths...
+        call_directory = os.path.normpath(os.path.dirname(filename))
+        # Project creation changes the working directory
+        filename = os.path.abspath(filename)
+        new_project = project_class(call_directory=call_directory)
+        spans = {}
+        for child_tag, key, feature_class in (
+                project_class.section_tags.values()):
+            spans[key] = []
+            new_project[key] = LazyFeatureList(
+                feature_class, filename, spans[key])
+
+        layout = []
+        global_found = False
+        wall_found = False
+        with open(filename, "rb") as xml_file:
+            for depth, parent_tag, tag, attrib, start, end in index_xml_nodes(
+                    filename):
+                if depth == 1:
+                    layout.append((tag, start, end))
+                if depth == 2:
+                    try:
+                        child_tag, key, feature_class = (
+                            project_class.section_tags[parent_tag])
+                    except KeyError:
+                        continue
+                    if tag == child_tag:
+                        new_project[key].add_unread(
+                            start, end, attrib.get("name"))
+                elif depth == 1 and tag in ("Global", "PlacementRoot"):
+                    xml_file.seek(start)
+                    node = ET.fromstring(xml_file.read(end - start))
+                    if tag == "Global":
+                        new_project._global_fromXML(node)
+                        global_found = True
+                    else:
+                        new_project._walls_fromXML(node)
+                        wall_found = True
+
+        if not global_found:
+            raise BadW3DXML("Story root has no Global node")
+        if not wall_found:
+            raise BadW3DXML("Story root has no PlacementRoot node")
+        new_project._set_source(filename, layout, spans)
+        return new_project
+
+    @classmethod
+    def fromXML_stream(project_class, filename):
+        """Create W3DProject from XML file without building the full tree
+
+        Children of section roots (e.g. Objects within ObjectRoot) are
+        converted to W3DFeatures in batches of STREAM_BATCH_SIZE, so that the
+        positions of each batch can be parsed together (see
+        :py:func:`pyw3d.xml_tools.preparse_positions`), and are then
+        discarded from the partially built tree.
+
         :param str filename: Filename of XML file for project
         """
         # For relative paths...
         call_directory = os.path.normpath(os.path.dirname(filename))
-        return project_class.fromXML(
-            ET.parse(filename).getroot(), call_directory)
+        # Project creation changes the working directory
+        filename = os.path.abspath(filename)
+        new_project = project_class(call_directory=call_directory)
+        spans = {
+            key: [] for child_tag, key, feature_class in
+            project_class.section_tags.values()
+        }
+
+        pending = []
+
+        def read_pending():
+            """Create features from all section children read so far"""
+            preparse_positions(*(entry[2] for entry in pending))
+            for key, feature_class, node in pending:
+                feature = feature_class.fromXML(node)
+                feature.mark_clean()
+                # Byte ranges are found on first incremental save
+                feature._xml_source = (spans[key], len(new_project[key]))
+                new_project[key].append(feature)
+            del pending[:]
+
+        open_nodes = []
+        global_found = False
+        wall_found = False
+        for event, node in ET.iterparse(filename, events=("start", "end")):
+            if event == "start":
+                open_nodes.append(node)
+                continue
+            open_nodes.pop()
+            if len(open_nodes) == 2:
+                section_root = open_nodes[1]
+                try:
+                    child_tag, key, feature_class = project_class.section_tags[
+                        section_root.tag]
+                except KeyError:
+                    continue
+                if node.tag == child_tag:
+                    pending.append((key, feature_class, node))
+                    if len(pending) >= project_class.STREAM_BATCH_SIZE:
+                        read_pending()
+                section_root.remove(node)
+            elif len(open_nodes) == 1:
+                if node.tag == "Global":
+                    new_project._global_fromXML(node)
+                    global_found = True
+                elif node.tag == "PlacementRoot":
+                    new_project._walls_fromXML(node)
+                    wall_found = True
+                open_nodes[0].remove(node)
+
+        read_pending()
+
+        if not global_found:
+            raise BadW3DXML("Story root has no Global node")
+        if not wall_found:
+            raise BadW3DXML("Story root has no PlacementRoot node")
+        new_project._set_source(filename, None, spans)
+        return new_project
 
     def toprettyxml(self):
+        """Return W3DProject as an indented W3D XML string"""
+        xml_file = io.StringIO()
+        write_pretty_xml(self.toXML(), xml_file)
+        return xml_file.getvalue()
+
+    def save_XML(self, filename, incremental=False):
+        """Write W3DProject as indented W3D XML to given file
+
+        :param str filename: Filename of XML file to write
+        :param bool incremental: If True and this project was read from or
+        last saved to an XML file which has not since been changed on disk,
+        regenerate only objects, groups, timelines, etc. which have been
+        modified (see :py:meth:`W3DFeature.is_dirty`) and copy all other
+        nodes verbatim from that file. Copied nodes keep their original
+        attribute order and number formatting, so the result is identical to
+        a full save only if that file was itself written by save_XML
+        """
+        filename = os.path.abspath(filename)
+        if incremental and self._index_source():
+            self._save_incremental(filename)
+            return
+        # Build tree before opening, since features of a lazily-loaded project
+        # may still need to be read from filename
         tree = self.toXML()
-        xml_string = ET.tostring(tree, encoding="unicode")
-        xml_string = minidom.parseString(xml_string).toprettyxml()
-        # WARNING: Need to make sure that this doesn't miss up paragraphs of
-        # text
-        xml_string = "\n".join(
-            [line for line in xml_string.split("\n") if line.strip()])
-        return xml_string
-
-    def save_XML(self, filename):
-        with open(filename, "w") as file_:
-            file_.write(self.toprettyxml())
+        with open(filename, "w", encoding="utf-8") as file_:
+            write_pretty_xml(tree, file_)
+
+        spans = {}
+        for child_tag, key, feature_class in self.section_tags.values():
+            spans[key] = []
+            if isinstance(self[key], LazyFeatureList):
+                self[key].set_source(filename, spans[key])
+            for index, feature in enumerate(self[key]):
+                feature.mark_clean()
+                feature._xml_source = (spans[key], index)
+        self._set_source(filename, None, spans)
+
+    def _set_source(self, filename, layout, spans):
+        """Record the XML file that features of this project were read from or
+        written to
+
+        :param str filename: Absolute path to XML file
+        :param list layout: List of (tag, start, end) byte ranges for each
+        child of the Story node or None if not yet known
+        :param dict spans: Dictionary mapping section keys (e.g. "objects")
+        to lists of (start, end) byte ranges of each feature's node"""
+        self.source_file = filename
+        stat = os.stat(filename)
+        self._source_stat = (stat.st_size, stat.st_mtime_ns)
+        self._source_layout = layout
+        self._source_spans = spans
+
+    def _index_source(self):
+        """Find byte ranges of all nodes in source_file if necessary
+
+        :returns: True if source_file can be used for an incremental save"""
+        if self.source_file is None:
+            return False
+        try:
+            stat = os.stat(self.source_file)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != self._source_stat:
+            LOGGER.info("{} has changed on disk; saving in full".format(
+                self.source_file))
+            return False
+        if self._source_layout is None:
+            layout = []
+            for spans in self._source_spans.values():
+                del spans[:]
+            for depth, parent_tag, tag, attrib, start, end in index_xml_nodes(
+                    self.source_file):
+                if depth == 1:
+                    layout.append((tag, start, end))
+                elif depth == 2:
+                    try:
+                        child_tag, key, feature_class = self.section_tags[
+                            parent_tag]
+                    except KeyError:
+                        continue
+                    if tag == child_tag:
+                        self._source_spans[key].append((start, end))
+            self._source_layout = layout
+        tags = [tag for tag, start, end in self._source_layout]
+        for tag in list(self.section_tags) + ["Global", "PlacementRoot"]:
+            if tags.count(tag) != 1:
+                return False
+        return True
+
+    def _clean_span(self, key, feature):
+        """Return byte range of feature's node in source_file or None if
+        feature is new or has been modified"""
+        try:
+            spans, index = feature._xml_source
+        except AttributeError:
+            return None
+        if spans is not self._source_spans.get(key) or feature.is_dirty():
+            return None
+        return spans[index]
+
+    def _write_section(self, source, output, section_tag):
+        """Write section node (e.g. ObjectRoot), copying unmodified children
+        from source
+
+        :returns: List of (start, end) byte ranges of each child in output"""
+        child_tag, key, feature_class = self.section_tags[section_tag]
+        features = self[key]
+        new_spans = []
+        if not len(features):
+            output.write("<{}/>".format(section_tag).encode("utf-8"))
+            return new_spans
+        output.write("<{}>".format(section_tag).encode("utf-8"))
+        for index in range(len(features)):
+            output.write(b"\n\t\t")
+            start = output.tell()
+            span = None
+            if isinstance(features, LazyFeatureList):
+                span = features.unread_span(index)
+            if span is None:
+                span = self._clean_span(key, features[index])
+            if span is None:
+                section_root = ET.Element(section_tag)
+                features[index].toXML(section_root)
+                output.write("\n\t\t".join(
+                    pretty_xml_node(node, level=2) for node in section_root
+                ).encode("utf-8"))
+            else:
+                output.write(_read_bytes(source, *span))
+            new_spans.append((start, output.tell()))
+        output.write("\n\t</{}>".format(section_tag).encode("utf-8"))
+        return new_spans
+
+    def _save_incremental(self, filename):
+        """Write project to filename, regenerating only modified features
+
+        Must be called only after _index_source has returned True"""
+        new_layout = []
+        new_spans = {}
+        temp_fd, temp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(filename), suffix=".xml")
+        try:
+            with open(self.source_file, "rb") as source, \
+                    os.fdopen(temp_fd, "wb") as output:
+                position = 0
+                for tag, start, end in self._source_layout:
+                    output.write(_read_bytes(source, position, start))
+                    new_start = output.tell()
+                    if tag in self.section_tags:
+                        key = self.section_tags[tag][1]
+                        new_spans[key] = self._write_section(
+                            source, output, tag)
+                    elif tag == "Global":
+                        output.write(pretty_xml_node(
+                            self._global_toXML(ET.Element("Story")), level=1
+                        ).encode("utf-8"))
+                    elif tag == "PlacementRoot":
+                        output.write(pretty_xml_node(
+                            self._walls_toXML(ET.Element("Story")), level=1
+                        ).encode("utf-8"))
+                    else:
+                        output.write(_read_bytes(source, start, end))
+                    new_layout.append((tag, new_start, output.tell()))
+                    position = end
+                source.seek(position)
+                shutil.copyfileobj(source, output)
+            shutil.copymode(self.source_file, temp_filename)
+            os.replace(temp_filename, filename)
+        except:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+
+        for key, spans in new_spans.items():
+            features = self[key]
+            lazy = isinstance(features, LazyFeatureList)
+            if lazy:
+                features.set_source(filename, spans)
+            for index in range(len(features)):
+                if lazy and not features.is_read(index):
+                    continue
+                features[index].mark_clean()
+                features[index]._xml_source = (spans, index)
+        self._set_source(filename, new_layout, new_spans)
 
     def sort_groups(self):
         """Sort groups such that no group contains a later group"""
@@ -453,6 +896,20 @@ class W3DProject(W3DFeature):
                 new_groups.append(group)
         self["groups"] = new_groups
 
+    def particle_object_names(self):
+        """Return set of names of objects which may be emitted by a W3DPSys
+        """
+        members = group_members(self["groups"])
+        particle_groups = set(
+            object_["content"]["particle_group"]
+            for object_ in self["objects"]
+            if isinstance(object_["content"], W3DPSys)
+        )
+        names = set()
+        for group_name in particle_groups:
+            names.update(members.get(group_name, ()))
+        return names
+
     def setup_controls(self):
         self.add_move_toggle()
 
@@ -466,8 +923,29 @@ class W3DProject(W3DFeature):
         bpy.data.texts.new("angles.py")
         script = bpy.data.texts["angles.py"]
         script.write(ANGLES_SCRIPT)
+        self.setup_handles()
+        if self["action_tables"]:
+            self.add_animator()
         return script
 
+    def setup_handles(self):
+        """Write handles.py, through which generated scripts find game
+        objects by name"""
+        bpy.data.texts.new("handles.py")
+        bpy.data.texts["handles.py"].write(OBJECT_HANDLES_SCRIPT)
+
+    def add_animator(self):
+        """Write the runtime for action tables to w3d_actions.py and advance
+        the changes it makes once per logic tick"""
+        bpy.data.texts.new("w3d_actions.py")
+        bpy.data.texts["w3d_actions.py"].write(ACTION_TABLE_SCRIPT)
+
+        sensor = add_sensor(self.main_camera, "ALWAYS", "animate")
+        sensor.use_pulse_true_level = True
+        controller = add_python_controller(
+            self.main_camera, "animate", "w3d_actions.animate")
+        controller.link(sensor=sensor)
+
     def setup_camera(self):
         bpy.ops.object.camera_add(rotation=(math.pi / 2, 0, 0))
         bpy.data.cameras[-1].clip_end = self["far_clip"]
@@ -507,28 +985,12 @@ class W3DProject(W3DFeature):
         settings_script.write("\n".join(script_text))
 
     def add_move_toggle(self):
-        bpy.context.scene.objects.active = self.main_camera
-        bpy.ops.logic.controller_add(
-            type='PYTHON',
-            object=self.main_camera.name,
-            name="move_toggle")
-        self.main_camera.game.controllers[-1].name = "move_toggle"
-        controller = self.main_camera.game.controllers["move_toggle"]
-        controller.mode = "MODULE"
-        controller.module = "move.move_toggle"
-
-        bpy.ops.object.game_property_new(
-            type="BOOL",
-            name="toggle_movement"
-        )
-        self.main_camera.game.properties["toggle_movement"].value = False
-        bpy.ops.logic.sensor_add(
-            type="KEYBOARD",
-            object=self.main_camera.name,
-            name="toggle_movement"
-        )
-        self.main_camera.game.sensors[-1].name = "toggle_movement"
-        sensor = self.main_camera.game.sensors["toggle_movement"]
+        controller = add_python_controller(
+            self.main_camera, "move_toggle", "move.move_toggle")
+
+        add_game_property(
+            self.main_camera, "BOOL", "toggle_movement", False)
+        sensor = add_sensor(self.main_camera, "KEYBOARD", "toggle_movement")
         sensor.key = "TAB"
 
         bpy.data.texts.new("move.py")
@@ -537,8 +999,18 @@ class W3DProject(W3DFeature):
 
         controller.link(sensor=sensor)
 
-    def blend(self):
-        """Create representation of W3DProject in Blender"""
+    def blend(self, reader=None, previous=None):
+        """Create representation of W3DProject in Blender
+
+        :param reader: Optional :py:class:`pyw3d.interchange.ProjectReader`
+        for this project whose features have not yet been fully read. Each
+        feature is then created in Blender as soon as it arrives.
+        :param str previous: Optional filename of a .blend file exported from
+        an earlier version of this project. It is opened and only the
+        objects, timelines and triggers which have changed since are rebuilt
+        (see :py:mod:`pyw3d.scene_manifest`), unless the changes require a
+        full rebuild.
+        """
         # if self["debug"]:
         #     LOGGER.debug("Validating project")
         #     self.validate(project=self)
@@ -546,12 +1018,32 @@ class W3DProject(W3DFeature):
         if self["profile"]:
             import cProfile
             cProfile.runctx(
-                'self._blend()', {}, {"self": self}, "profile.out"
+                'self._blend(reader, previous)', {},
+                {"self": self, "reader": reader, "previous": previous},
+                "profile.out"
             )
         else:
-            self._blend()
+            self._blend(reader, previous)
+
+    def _blend(self, reader=None, previous=None):
+        if previous is not None:
+            if reader is not None:
+                reader.read_all()
+                reader = None
+            if self._blend_incremental(previous):
+                return
+            reset_blender_state()
+        if reader is not None and (
+                self["atlas_threshold"] or self["max_image_size"]):
+            # All images are needed before any can be preprocessed
+            reader.read_all()
+            reader = None
+
+        def section(key):
+            if reader is None:
+                return self[key]
+            return reader.receive(key)
 
-    def _blend(self):
         clear_blender_scene()
         bpy.data.scenes["Scene"].game_settings.physics_gravity = 0
         bpy.data.scenes["Scene"].game_settings.material_mode = "GLSL"
@@ -565,7 +1057,31 @@ class W3DProject(W3DFeature):
         self.setup_scripts()
         setup_mouselook(self)
         setup_click(self)
+        # All groups are needed before they can be sorted
+        for group in section("groups"):
+            pass
         self.sort_groups()
+        # Particle systems are not known in advance when streaming, so the
+        # sender finds their objects instead
+        if reader is None:
+            particle_objects = self.particle_object_names()
+        else:
+            particle_objects = reader.particle_objects
+        W3DImage.processed_files = {}
+        if self["max_image_size"]:
+            W3DImage.processed_files = preprocess_images(
+                self["objects"], self["max_image_size"])
+        W3DImage.atlas_regions = {}
+        W3DImage.atlas_materials = {}
+        if self["atlas_threshold"]:
+            W3DImage.atlas_regions = build_atlases(
+                [
+                    object_["content"].processed_filename()
+                    for object_ in self["objects"]
+                    if isinstance(object_["content"], W3DImage)
+                ],
+                self["atlas_threshold"]
+            )
         bpy.data.texts.new("group_defs.py")  # Script for assigning group names
         bpy.data.worlds["World"].horizon_color = [
             value / 255.0 for value in self["background"]
@@ -575,7 +1091,7 @@ class W3DProject(W3DFeature):
         # ]
 
         # Create assets
-        for sound in self["sounds"]:
+        for sound in section("sounds"):
             sound.blend()
 
         # Create Objects
@@ -583,36 +1099,103 @@ class W3DProject(W3DFeature):
             group.blend_objects()
         for group in self["groups"]:
             group.blend_groups()
-        for object_ in self["objects"]:
-            object_.blend()
+        for object_ in section("objects"):
+            object_.blend(
+                particle_template=object_["name"] in particle_objects)
         bpy.context.scene.update()
 
         # Create particle action logic
-        for paction in self["particle_actions"]:
+        for paction in section("particle_actions"):
             paction.blend()
 
         # Create Activators
-        for timeline in self["timelines"]:
-            timeline.blend()
-        for trigger in self["trigger_events"]:
-            trigger.blend()
+        for timeline in section("timelines"):
+            timeline.blend(
+                scheduled=self["scheduled_timelines"],
+                tabulated=self["action_tables"])
+        for trigger in section("trigger_events"):
+            trigger.blend(indexed=self["indexed_triggers"])
+        self._blend_activator_logic(
+            self["objects"], self["timelines"], self["trigger_events"])
+        if self["indexed_triggers"]:
+            setup_event_boxes(self["trigger_events"])
+        write_manifest(project_manifest(self))
+
+        bpy.context.scene.update()
+        setup_blender_layout()
+        bpy.ops.file.pack_all()
+
+    def _blend_activator_logic(self, objects, timelines, triggers):
+        """Write and link game engine logic for the Activators of the given
+        features"""
         # Write any necessary game engine logic for Activators
-        for timeline in self["timelines"]:
+        for timeline in timelines:
             timeline.write_blender_logic()
-        for object_ in self["objects"]:
+        for object_ in objects:
             if object_["link"] is not None:
                 object_["link"].write_blender_logic()
-        for trigger in self["trigger_events"]:
+        for trigger in triggers:
             trigger.write_blender_logic()
         # Link game engine logic bricks for Activators
-        for timeline in self["timelines"]:
+        for timeline in timelines:
             timeline.link_blender_logic()
-        for object_ in self["objects"]:
+        for object_ in objects:
             if object_["link"] is not None:
                 object_["link"].link_blender_logic()
-        for trigger in self["trigger_events"]:
+        for trigger in triggers:
             trigger.link_blender_logic()
 
+    def _blend_incremental(self, previous):
+        """Update previously exported .blend file to match this project
+
+        :returns: False if a full rebuild is required instead, in which case
+        the Blender scene is left in an undefined state
+        """
+        if not os.path.isfile(previous):
+            return False
+        open_blender_file(previous)
+        manifest = project_manifest(self)
+        plan = plan_rebuild(read_manifest(), manifest)
+        if plan is None:
+            LOGGER.info("Full rebuild of {} required".format(previous))
+            return False
+        LOGGER.info("Rebuilding {} of {} features in {}".format(
+            sum(len(names) for names in plan.rebuild.values()),
+            sum(len(self[key]) for key in MANIFEST_SECTIONS), previous))
+        for key in MANIFEST_SECTIONS:
+            remove_blender_features(key, plan.remove[key])
+        W3DPlacement._find_relative_to_objects()
+        particle_objects = self.particle_object_names()
+        changed = {
+            key: [
+                feature for feature in self[key]
+                if feature["name"] in plan.rebuild[key]
+            ] for key in MANIFEST_SECTIONS
+        }
+        W3DImage.processed_files = {}
+        if self["max_image_size"]:
+            W3DImage.processed_files = preprocess_images(
+                changed["objects"], self["max_image_size"])
+        # Rebuilt images get textures of their own until the next full build
+        W3DImage.atlas_regions = {}
+        W3DImage.atlas_materials = {}
+        for object_ in changed["objects"]:
+            object_.blend(
+                particle_template=object_["name"] in particle_objects)
+        bpy.context.scene.update()
+        for timeline in changed["timelines"]:
+            timeline.blend(
+                scheduled=self["scheduled_timelines"],
+                tabulated=self["action_tables"])
+        for trigger in changed["trigger_events"]:
+            trigger.blend(indexed=self["indexed_triggers"])
+        self._blend_activator_logic(
+            changed["objects"], changed["timelines"],
+            changed["trigger_events"])
+        if self["indexed_triggers"]:
+            setup_event_boxes(self["trigger_events"])
+        write_manifest(manifest)
+
         bpy.context.scene.update()
-        setup_blender_layout()
         bpy.ops.file.pack_all()
+        return True
@@ -0,0 +1,115 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tools for caching fully-built W3DProjects
+
+Cache files are kept in PROJECT_CACHE_DIR within the user's workspace and
+are named by the sha256 digest of the XML file they were built from, so the
+same story is found again wherever it is stored, and nothing is ever read
+from or written to the story's own directory. Since cache files are
+unpickled, this directory must only be writable by the user.
+
+A cache file (extension .w3dc) begins with a single header line of the form
+"W3DC <pyw3d source digest> <sha256 of XML file>" followed by the pickled
+project. It is only used if both digests match (see
+:py:func:`pyw3d.source_digest`).
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from . import source_digest, WORKSPACE
+LOGGER = logging.getLogger("pyw3d")
+
+PROJECT_CACHE_DIR = os.path.join(WORKSPACE, "project_cache")
+CACHE_EXTENSION = ".w3dc"
+CACHE_MAGIC = b"W3DC"
+
+
+def cache_filename(xml_digest):
+    """Return filename of the cache for XML file with given digest"""
+    return os.path.join(PROJECT_CACHE_DIR, xml_digest + CACHE_EXTENSION)
+
+
+def hash_file(filename):
+    """Return hex sha256 digest of contents of given file"""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as source_file:
+        for chunk in iter(lambda: source_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_header(xml_digest):
+    return b" ".join((
+        CACHE_MAGIC, source_digest().encode("ascii"),
+        xml_digest.encode("ascii"))) + b"\n"
+
+
+def load_project_cache(xml_filename, xml_digest):
+    """Return project stored in cache for given XML file or None if there is
+    no valid cache
+
+    :param str xml_filename: Filename of XML file for project
+    :param str xml_digest: Digest of XML file as returned by hash_file
+    """
+    try:
+        with open(cache_filename(xml_digest), "rb") as cache_file:
+            if cache_file.readline() != _cache_header(xml_digest):
+                LOGGER.debug("Cache for {} is stale".format(xml_filename))
+                return None
+            return pickle.load(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception as error:
+        LOGGER.warning("Could not read cache for {}: {}".format(
+            xml_filename, error))
+        return None
+
+
+def save_project_cache(project, xml_filename, xml_digest):
+    """Store project in cache for given XML file
+
+    Failure to write the cache (e.g. because the workspace is read-only) is
+    logged but not raised.
+
+    :param W3DProject project: The project read from xml_filename
+    :param str xml_filename: Filename of XML file for project
+    :param str xml_digest: Digest of XML file as returned by hash_file
+    """
+    filename = cache_filename(xml_digest)
+    try:
+        os.makedirs(PROJECT_CACHE_DIR, mode=0o700, exist_ok=True)
+        cache_fd, temp_filename = tempfile.mkstemp(
+            dir=os.path.dirname(filename), suffix=CACHE_EXTENSION)
+    except OSError as error:
+        LOGGER.info("Could not write cache for {}: {}".format(
+            xml_filename, error))
+        return
+    try:
+        with os.fdopen(cache_fd, "wb") as cache_file:
+            cache_file.write(_cache_header(xml_digest))
+            pickle.dump(project, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, filename)
+    except Exception as error:
+        LOGGER.info("Could not write cache for {}: {}".format(
+            xml_filename, error))
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
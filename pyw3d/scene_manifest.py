@@ -0,0 +1,269 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Tools for rebuilding only the changed parts of an exported project
+
+Every .blend file exported by W3DProject.blend contains a text block
+(MANIFEST_TEXT) recording a digest of each object, timeline and trigger, and
+a single digest of everything else in the project (settings, groups, sounds
+and particle actions). When the project is exported over that file again,
+the manifests are compared and only the Blender objects and scripts belonging
+to features which were added, changed or removed are rebuilt. Any change to
+the rest of the project, or to the pyw3d source that built the scene (see
+:py:func:`pyw3d.source_digest`), requires a full rebuild.
+
+Features which refer to a rebuilt object by name (directly or through a
+group) are rebuilt along with it, since their logic bricks may be linked to
+that object's actuators.
+"""
+import hashlib
+import json
+import logging
+from collections import defaultdict, namedtuple
+from . import source_digest
+from .build_cache import canonical_encoding, asset_files
+from .assets import file_digest
+from .groups import group_members
+from .logic_bricks import remove_named_logic
+from .names import generate_blender_object_name, \
+    generate_blender_particle_name, generate_blender_timeline_name, \
+    generate_trigger_name
+LOGGER = logging.getLogger("pyw3d")
+try:
+    import bpy
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.scene_manifest as standalone")
+
+MANIFEST_TEXT = "w3d_manifest.json"
+MANIFEST_SECTIONS = ("objects", "timelines", "trigger_events")
+"""Project sections whose features can be rebuilt individually"""
+
+RebuildPlan = namedtuple("RebuildPlan", ["rebuild", "remove"])
+"""Features to be rebuilt by an incremental export
+
+:ivar dict rebuild: Maps each of MANIFEST_SECTIONS to set of names of
+features which must be created in Blender
+:ivar dict remove: Maps each of MANIFEST_SECTIONS to set of names of features
+whose existing Blender objects and scripts must be deleted
+"""
+
+
+def _digest(value, directory, file_digests):
+    """Return hex digest of value and the contents of any files it
+    references
+
+    :param str directory: Directory against which relative paths of files
+    are resolved
+    :param dict file_digests: Digests of files already hashed, which is
+    updated with any newly-hashed files
+    """
+    digest = hashlib.sha256(
+        json.dumps(canonical_encoding(value), sort_keys=True).encode("utf-8"))
+    for filename in asset_files(value, directory):
+        if filename not in file_digests:
+            file_digests[filename] = file_digest(filename)
+        digest.update(
+            "{}:{}".format(filename, file_digests[filename]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _strings(value):
+    """Return set of all strings appearing in value"""
+    found = set()
+    pending = [value]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, str):
+            found.add(value)
+        elif isinstance(value, dict):
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        else:
+            try:
+                pending.extend(value)
+            except TypeError:
+                pass
+    return found
+
+
+def project_manifest(project):
+    """Return manifest describing the given project
+
+    :param W3DProject project: The fully-read project
+    :returns: A JSON-compatible dictionary, or None if the project cannot be
+    rebuilt incrementally because features of some section do not have
+    unique names
+    """
+    file_digests = {}
+    settings = [
+        [key, value] for key, value in sorted(project.items())
+        if key not in MANIFEST_SECTIONS + ("groups",)
+    ]
+    # Groups are reordered by W3DProject.sort_groups during a build
+    settings.append(sorted(
+        project["groups"], key=lambda group: group["name"]))
+    settings.append(sorted(project.particle_object_names()))
+    manifest = {
+        "version": source_digest(),
+        "settings": _digest(
+            settings, project.call_directory, file_digests),
+        "features": {},
+        "references": {}
+    }
+    object_names = set(object_["name"] for object_ in project["objects"])
+    groups = group_members(project["groups"])
+    for section in MANIFEST_SECTIONS:
+        digests = {}
+        references = {}
+        for feature in project[section]:
+            name = feature["name"]
+            if name in digests:
+                LOGGER.info(
+                    "Duplicate name {} in {}; incremental export "
+                    "unavailable".format(name, section))
+                return None
+            digests[name] = _digest(
+                feature, project.call_directory, file_digests)
+            referenced = set()
+            for string in _strings(feature):
+                if string in object_names:
+                    referenced.add(string)
+                elif string in groups:
+                    referenced.update(groups[string])
+            references[name] = sorted(referenced)
+        manifest["features"][section] = digests
+        manifest["references"][section] = references
+    return manifest
+
+
+def plan_rebuild(old_manifest, new_manifest):
+    """Determine which features must be rebuilt to update a scene built from
+    one manifest's project to match another's
+
+    :param dict old_manifest: Manifest stored with the existing scene
+    :param dict new_manifest: Manifest of the project to be built
+    :returns: A :py:class:`RebuildPlan` or None if a full rebuild is needed
+    """
+    if old_manifest is None or new_manifest is None:
+        return None
+    if (old_manifest.get("version") != new_manifest["version"] or
+            old_manifest.get("settings") != new_manifest["settings"]):
+        return None
+    rebuild = {}
+    remove = {}
+    for section in MANIFEST_SECTIONS:
+        old_digests = old_manifest["features"][section]
+        new_digests = new_manifest["features"][section]
+        rebuild[section] = set(
+            name for name, digest in new_digests.items()
+            if old_digests.get(name) != digest)
+        remove[section] = set(old_digests) - set(new_digests)
+
+    referrers = defaultdict(list)
+    for section, references in new_manifest["references"].items():
+        for name, object_names in references.items():
+            for object_name in object_names:
+                referrers[object_name].append((section, name))
+    pending = list(rebuild["objects"] | remove["objects"])
+    while pending:
+        object_name = pending.pop()
+        for section, name in referrers[object_name]:
+            if name not in rebuild[section]:
+                rebuild[section].add(name)
+                if section == "objects":
+                    pending.append(name)
+
+    for section in MANIFEST_SECTIONS:
+        remove[section].update(
+            rebuild[section] & set(old_manifest["features"][section]))
+    return RebuildPlan(rebuild, remove)
+
+
+def read_manifest():
+    """Return manifest stored in the current Blender file or None if it has
+    none"""
+    try:
+        text = bpy.data.texts[MANIFEST_TEXT]
+    except KeyError:
+        return None
+    try:
+        return json.loads(text.as_string())
+    except ValueError:
+        LOGGER.warning("Ignoring malformed {}".format(MANIFEST_TEXT))
+        return None
+
+
+def write_manifest(manifest):
+    """Store manifest in the current Blender file, replacing any existing
+    manifest
+
+    :param dict manifest: Manifest as returned by project_manifest or None to
+    remove the existing manifest
+    """
+    if MANIFEST_TEXT in bpy.data.texts:
+        bpy.data.texts.remove(bpy.data.texts[MANIFEST_TEXT])
+    if manifest is not None:
+        text = bpy.data.texts.new(MANIFEST_TEXT)
+        text.write(json.dumps(manifest, sort_keys=True))
+
+
+def blender_object_names(section, name):
+    """Return names of the Blender objects created for a feature
+
+    :param str section: One of MANIFEST_SECTIONS
+    :param str name: The feature's name
+    """
+    if section == "objects":
+        object_name = generate_blender_object_name(name)
+        return [object_name, generate_blender_particle_name(object_name)]
+    if section == "timelines":
+        return [generate_blender_timeline_name(name)]
+    return [generate_trigger_name(name)]
+
+
+def remove_blender_features(section, names):
+    """Delete the Blender objects of the given features along with the
+    scripts used by their Python controllers
+
+    For triggers, the game property and logic bricks which look triggers add
+    to the camera under the trigger's name are also removed.
+
+    :param str section: One of MANIFEST_SECTIONS
+    :param names: Names of features in section
+    """
+    scene = bpy.context.scene
+    for name in names:
+        for object_name in blender_object_names(section, name):
+            try:
+                blender_object = bpy.data.objects[object_name]
+            except KeyError:
+                continue
+            for controller in blender_object.game.controllers:
+                if controller.type == "PYTHON" and controller.mode == "MODULE":
+                    script_name = "{}.py".format(
+                        controller.module.split(".")[0])
+                    if script_name in bpy.data.texts:
+                        bpy.data.texts.remove(bpy.data.texts[script_name])
+            if blender_object.name in scene.objects:
+                scene.objects.unlink(blender_object)
+            bpy.data.objects.remove(blender_object)
+        if section == "trigger_events" and "CAMERA" in bpy.data.objects:
+            remove_named_logic(
+                bpy.data.objects["CAMERA"], generate_trigger_name(name))
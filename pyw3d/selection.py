@@ -0,0 +1,73 @@
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""Constant-time management of which Blender objects are selected"""
+import logging
+LOGGER = logging.getLogger("pyw3d")
+try:
+    import bpy
+except ImportError:
+    LOGGER.debug(
+        "Module bpy not found. Loading pyw3d.selection as standalone")
+
+
+class SelectionManager(object):
+    """Keep track of the Blender objects selected while building a project
+
+    Rather than deselecting every object in the scene before selecting a new
+    one, only the objects known to have been selected since the last call to
+    :py:meth:`select_only` are deselected. Objects which pyw3d selects by any
+    other means (e.g. by copying a selected object) must be reported with
+    :py:meth:`track`. Blender operators which change the selection
+    themselves (such as those adding primitives) deselect everything else,
+    so tracked objects are at worst deselected twice.
+
+    The selection is only scanned in full the first time it is needed after
+    :py:meth:`forget`, which must be called whenever tracked objects may
+    have been deleted (e.g. after loading a new file).
+    """
+    _selected = None
+    """List of objects which may be selected, or None if unknown"""
+
+    @classmethod
+    def forget(manager_class):
+        """Forget which objects are selected"""
+        manager_class._selected = None
+
+    @classmethod
+    def track(manager_class, *blender_objects):
+        """Record that given objects may have been selected"""
+        if manager_class._selected is not None:
+            manager_class._selected.extend(blender_objects)
+
+    @classmethod
+    def select_only(manager_class, blender_object):
+        """Make blender_object the only selected object and the active object
+
+        :returns: blender_object
+        """
+        if manager_class._selected is None:
+            manager_class._selected = list(bpy.context.selected_objects)
+        for selected_object in manager_class._selected:
+            try:
+                selected_object.select = False
+            except ReferenceError:  # Object has since been removed
+                pass
+        blender_object.select = True
+        bpy.context.scene.objects.active = blender_object
+        manager_class._selected = [blender_object]
+        return blender_object
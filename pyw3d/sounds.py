@@ -26,12 +26,11 @@ from .features import W3DFeature
 from .validators import IsNumeric, OptionValidator, ValidPyString, IsBoolean,\
     ValidFile
 from .errors import ConsistencyError, BadW3DXML
-from .xml_tools import bool2text, text2bool
+from .xml_tools import bool2text, text2bool, XMLCodec, XMLField
 from .names import generate_blender_sound_name
+from .logic_bricks import add_actuator
 try:
     import bpy
-    from _bpy import ops as ops_module
-    BPY_OPS_CALL = ops_module.call
 except ImportError:
     pass
 
@@ -56,14 +55,76 @@ def generate_blender_audio_from_file(filename):
     except AttributeError:
         generate_blender_audio_from_file._sounds = {}
     except KeyError:
-        BPY_OPS_CALL(
-            "sound.open", None, {'filepath': filename}
-        )
         generate_blender_audio_from_file._sounds[
-            filename] = bpy.data.sounds[0]
+            filename] = bpy.data.sounds.load(filename)
     return generate_blender_audio_from_file(filename)
 
 
+def _read_sound_mode(sound, mode_node):
+    """Read movement_mode from Mode node"""
+    for mode in sound.argument_validators["movement_mode"].valid_options:
+        if mode_node.find(mode) is not None:
+            sound["movement_mode"] = mode
+            return
+    raise BadW3DXML(
+        "Mode node must contain child node specifying a valid mode")
+
+
+def _write_sound_mode(sound, sound_root):
+    """Write movement_mode as Mode node"""
+    node = ET.SubElement(sound_root, "Mode")
+    ET.SubElement(node, sound["movement_mode"])
+
+
+def _read_sound_repeat(sound, repeat_node):
+    """Read repetitions from Repeat node"""
+    if repeat_node.find("NoRepeat") is not None:
+        sound["repetitions"] = 0
+    elif repeat_node.find("RepeatForever") is not None:
+        sound["repetitions"] = -1
+    else:
+        repeat_node = repeat_node.find("RepeatNum")
+        try:
+            sound["repetitions"] = int(repeat_node.text.strip())
+        except AttributeError:
+            raise BadW3DXML(
+                "Repeat node must contain child node specifying"
+                " repetitions")
+
+
+def _write_sound_repeat(sound, sound_root):
+    """Write repetitions as Repeat node"""
+    node = ET.SubElement(sound_root, "Repeat")
+    if sound["repetitions"] == 0:
+        ET.SubElement(node, "NoRepeat")
+    if sound["repetitions"] < 0:
+        ET.SubElement(node, "RepeatForever")
+    if sound["repetitions"] > 0:
+        node = ET.SubElement(node, "RepeatNum")
+        node.text = str(sound["repetitions"])
+
+
+SOUND_SETTINGS = {
+    "freq": "frequency_scale", "volume": "volume_scale", "pan": "pan"}
+"""Dictionary mapping attributes of Settings node to W3DSound keys"""
+
+
+def _read_sound_settings(sound, settings_node):
+    """Read frequency_scale, volume_scale and pan from Settings node"""
+    for xml_attrib, key in SOUND_SETTINGS.items():
+        if xml_attrib in settings_node.attrib:
+            sound[key] = float(settings_node.attrib[xml_attrib])
+
+
+def _write_sound_settings(sound, sound_root):
+    """Write frequency_scale, volume_scale and pan as Settings node"""
+    settings = {}
+    for xml_attrib, key in SOUND_SETTINGS.items():
+        if not sound.is_default(key):
+            settings[xml_attrib] = str(sound[key])
+    ET.SubElement(sound_root, "Settings", attrib=settings)
+
+
 @total_ordering
 class W3DSound(W3DFeature):
     """Store data on a sound to be used in the W3D
@@ -98,6 +159,17 @@ class W3DSound(W3DFeature):
         "volume_scale": 1,
         "pan": 0}
 
+    xml_codec = XMLCodec(
+        XMLField(
+            "Mode", _read_sound_mode, _write_sound_mode, required=True),
+        XMLField(
+            "Repeat", _read_sound_repeat, _write_sound_repeat,
+            required=True),
+        XMLField(
+            "Settings", _read_sound_settings, _write_sound_settings,
+            required=True)
+    )
+
     def toXML(self, all_sounds_root):
         """Store W3DSound as Sound node within SoundRoot node
 
@@ -117,27 +189,7 @@ class W3DSound(W3DFeature):
         if not self.is_default("autostart"):
             attrib["autostart"] = bool2text(self["autostart"])
         sound_root = ET.SubElement(all_sounds_root, "Sound", attrib=attrib)
-
-        node = ET.SubElement(sound_root, "Mode")
-        ET.SubElement(node, self["movement_mode"])
-
-        node = ET.SubElement(sound_root, "Repeat")
-        if self["repetitions"] == 0:
-            ET.SubElement(node, "NoRepeat")
-        if self["repetitions"] < 0:
-            ET.SubElement(node, "RepeatForever")
-        if self["repetitions"] > 0:
-            node = ET.SubElement(node, "RepeatNum")
-            node.text = str(self["repetitions"])
-
-        settings = {}
-        attrib_map = {
-            "frequency_scale": "freq", "volume_scale": "volume", "pan": "pan"}
-        for key, xml_attrib in attrib_map.items():
-            if not self.is_default(key):
-                settings[xml_attrib] = str(self[key])
-        node = ET.SubElement(sound_root, "Settings", attrib=settings)
-
+        self.xml_codec.write(self, sound_root)
         return sound_root
 
     @classmethod
@@ -160,47 +212,7 @@ class W3DSound(W3DFeature):
         if "autostart" in sound_root.attrib:
             new_sound["autostart"] = text2bool(sound_root.attrib["autostart"])
 
-        movement_node = sound_root.find("Mode")
-        if movement_node is None:
-            raise BadW3DXML(
-                "Sound node must contain Mode child node")
-        for mode in new_sound.argument_validators[
-                "movement_mode"].valid_options:
-            if movement_node.find(mode) is not None:
-                new_sound["movement_mode"] = mode
-                break
-        if "movement_mode" not in new_sound:
-            raise BadW3DXML(
-                "Mode node must contain child node specifying a valid mode"
-            )
-
-        repeat_node = sound_root.find("Repeat")
-        if repeat_node is None:
-            raise BadW3DXML(
-                "Sound node must contain Repeat child node")
-        if repeat_node.find("NoRepeat") is not None:
-            new_sound["repetitions"] = 0
-        elif repeat_node.find("RepeatForever") is not None:
-            new_sound["repetitions"] = -1
-        else:
-            repeat_node = repeat_node.find("RepeatNum")
-            try:
-                new_sound["repetitions"] = int(repeat_node.text.strip())
-            except AttributeError:
-                raise BadW3DXML(
-                    "Repeat node must contain child node specifying"
-                    " repetitions")
-
-        settings_node = sound_root.find("Settings")
-        if settings_node is None:
-            raise BadW3DXML(
-                "Sound node must have Settings child node")
-        xml_map = {
-            "freq": "frequency_scale", "volume": "volume_scale", "pan": "pan"}
-        for key, value in xml_map.items():
-            if key in settings_node.attrib:
-                new_sound[value] = float(settings_node.attrib[key])
-
+        sound_class.xml_codec.read(new_sound, sound_root)
         return new_sound
 
     def blend(self):
@@ -213,17 +225,7 @@ class W3DSound(W3DFeature):
         blender_sound.name = sound_name
 
         LOGGER.debug("Creating actuator for {}".format(sound_name))
-        bpy.context.scene.objects.active = audio_playback_object()
-        BPY_OPS_CALL(
-            "logic.actuator_add", None,
-            {
-                'type': 'SOUND',
-                'object': "AUDIO",
-                'name': sound_name
-            }
-        )
-        actuator = audio_playback_object().game.actuators[-1]
-        actuator.name = sound_name
+        actuator = add_actuator(audio_playback_object(), "SOUND", sound_name)
         actuator.sound = blender_sound
         actuator.use_sound_3d = (self["movement_mode"] == "Positional")
         if self["repetitions"] < 0:
@@ -17,6 +17,7 @@
 
 """Non-feature data structures used by Writing3D
 """
+import xml.etree.ElementTree as ET
 from collections import MutableSequence
 
 
@@ -71,3 +72,107 @@ class SortedList(MutableSequence):
 
     def reverse(self):
         raise NotImplementedError("Cannot reverse a SortedList")
+
+
+class LazyFeatureList(MutableSequence):
+    """A list of W3DFeatures which are only read from XML when first accessed
+
+    Unread elements are stored as (source_index, name) pairs, where
+    source_index refers to a (start, end) byte range in spans. Each is
+    replaced by the corresponding W3DFeature the first time it is retrieved.
+
+    :param feature_class: The W3DFeature subclass used to read each element
+    :param str filename: The XML file from which elements are read
+    :param list spans: List of (start, end) byte ranges of nodes within
+    filename, shared with the project which owns this list"""
+    def __init__(self, feature_class, filename, spans=None):
+        self.feature_class = feature_class
+        self.filename = filename
+        if spans is None:
+            spans = []
+        self.spans = spans
+        self._data = []
+
+    def add_unread(self, start, end, name=None):
+        """Append the XML node stored between given byte offsets of filename
+
+        :param int start: Offset of the first byte of the node
+        :param int end: Offset one past the last byte of the node
+        :param str name: Value of the node's name attribute, if any"""
+        self.spans.append((start, end))
+        self._data.append((len(self.spans) - 1, name))
+
+    def _read(self, index):
+        source_index, name = self._data[index]
+        start, end = self.spans[source_index]
+        with open(self.filename, "rb") as xml_file:
+            xml_file.seek(start)
+            node = ET.fromstring(xml_file.read(end - start))
+        feature = self.feature_class.fromXML(node)
+        feature.mark_clean()
+        feature._xml_source = (self.spans, source_index)
+        self._data[index] = feature
+        return feature
+
+    def is_read(self, index):
+        """Return True if element at given index has already been read"""
+        return not isinstance(self._data[index], tuple)
+
+    def unread_span(self, index):
+        """Return (start, end) byte range of element at given index or None if
+        it has already been read"""
+        if self.is_read(index):
+            return None
+        return self.spans[self._data[index][0]]
+
+    def set_source(self, filename, spans):
+        """Point unread elements at a new file
+
+        :param str filename: The XML file from which elements are now read
+        :param list spans: New byte ranges, such that spans[i] is the range
+        of the element at index i"""
+        self.filename = filename
+        self.spans = spans
+        for index, item in enumerate(self._data):
+            if isinstance(item, tuple):
+                self._data[index] = (index, item[1])
+
+    def __setitem__(self, index, value):
+        self._data.__setitem__(index, value)
+
+    def __delitem__(self, index):
+        del self._data[index]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self[i] for i in range(*index.indices(len(self._data)))]
+        if isinstance(self._data[index], tuple):
+            return self._read(index)
+        return self._data[index]
+
+    def insert(self, index, new_item):
+        self._data.insert(index, new_item)
+
+    def index_of_name(self, name):
+        """Return index of the element with given name without reading any
+        other elements
+
+        :raises KeyError: if no element has the given name"""
+        for index, item in enumerate(self._data):
+            if isinstance(item, tuple):
+                item_name = item[1]
+            else:
+                item_name = item.get("name")
+            if item_name == name:
+                return index
+        raise KeyError(name)
+
+    def get_by_name(self, name):
+        """Return the element with given name, reading only that element
+
+        :raises KeyError: if no element has the given name"""
+        return self[self.index_of_name(name)]
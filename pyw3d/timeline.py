@@ -110,11 +110,19 @@ class W3DTimeline(W3DFeature):
 
         return new_timeline
 
-    def blend(self):
-        """Create Blender object to implement W3DTimeline"""
+    def blend(self, scheduled=False, tabulated=False):
+        """Create Blender object to implement W3DTimeline
+
+        :param bool scheduled: If True, build the timeline with the scheduled
+        runtime of :py:class:`pyw3d.activators.BlenderTimeline`
+        :param bool tabulated: If True, describe simple object and group
+        actions by rows of an action table rather than by generated Python
+        logic
+        """
         self.activator = BlenderTimeline(
             self["name"], self["actions"],
-            start_immediately=self["start_immediately"])
+            start_immediately=self["start_immediately"],
+            scheduled=scheduled, tabulated=tabulated)
         LOGGER.debug("Creating timeline {}".format(self["name"]))
         self.activator.create_blender_objects()
         return self.activator.base_object
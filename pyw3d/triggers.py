@@ -27,7 +27,9 @@ from .validators import IsNumeric, ListValidator, \
     FeatureValidator, ReferenceValidator
 from .errors import ConsistencyError, BadW3DXML, InvalidArgument, \
     EBKAC
-from .xml_tools import bool2text, text2tuple, text2bool
+from .xml_tools import bool2text, text2floats3, text2bool
+from .names import generate_trigger_name, generate_blender_object_name, \
+    generate_group_name
 from .activators import BlenderTrigger, BlenderPositionTrigger, \
     BlenderPointTrigger, BlenderDirectionTrigger, BlenderLookObjectTrigger, \
     BlenderObjectPositionTrigger
@@ -40,6 +42,7 @@ class W3DTrigger(W3DFeature):
     :ivar base_trigger: A trigger object wrapped by this trigger (see
     __setitem__ and __getitem__ implementation for details)
     """
+
     def __init__(self, *args, **kwargs):
         self.base_trigger = BareTrigger()
         super(W3DTrigger, self).__init__(*args, **kwargs)
@@ -77,8 +80,25 @@ class W3DTrigger(W3DFeature):
                 return trigger_class.fromXML(trigger_root)
         return BareTrigger.fromXML(trigger_root)
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
+    def box_entry(self):
+        """Return entry of the table of boxes checked by
+        :py:mod:`pyw3d.event_boxes`, or None if this trigger has no box
+
+        Entries are tuples of the Blender name of the trigger, the names of
+        the Blender objects it tracks (or of the group containing them),
+        whether any (rather than all) tracked objects must meet the
+        condition, whether the condition is being inside the box, the number
+        of axes checked and the lower and upper corners of the box.
+        """
+        return None
+
+    def blend(self, indexed=False):
+        """Create representation of W3DTrigger in Blender
+
+        :param bool indexed: If True, any box of this trigger is checked by
+        the shared script in :py:mod:`pyw3d.event_boxes` rather than by the
+        trigger itself
+        """
         self.activator = BlenderTrigger(
             self["name"],
             self["actions"],
@@ -263,8 +283,7 @@ class EventBox(W3DFeature):
         new_box = box_class()
         for corner in ("corner1", "corner2"):
             try:
-                new_box[corner] = text2tuple(
-                    box_root.attrib[corner], evaluator=float)
+                new_box[corner] = text2floats3(box_root.attrib[corner])
             except KeyError:
                 raise BadW3DXML(
                     'Box node must specify attribute {}'.format(corner))
@@ -287,6 +306,25 @@ class EventBox(W3DFeature):
         return new_box
 
 
+def generate_box_entry(trigger, trackers, detect_any):
+    """Return entry of the table of boxes checked by
+    :py:mod:`pyw3d.event_boxes` for a trigger with an EventBox
+
+    :param W3DTrigger trigger: A HeadPositionTrigger or MovementTrigger
+    :param trackers: List of names of Blender objects tracked or name of
+    group containing them
+    :param bool detect_any: Must any (rather than all) tracked objects meet
+    the condition?
+    """
+    box = trigger["box"]
+    return (
+        generate_trigger_name(trigger["name"]), trackers, detect_any,
+        box["direction"] == "Inside", (3, 2)[box["ignore_y"]],
+        tuple(map(min, box["corner1"], box["corner2"])),
+        tuple(map(max, box["corner1"], box["corner2"]))
+    )
+
+
 class HeadPositionTrigger(HeadTrackTrigger):
     """For triggers based on position of user in W3D
 
@@ -335,14 +373,20 @@ class HeadPositionTrigger(HeadTrackTrigger):
             new_trigger["box"] = EventBox.fromXML(box_node)
         return new_trigger
 
-    def blend(self):
+    def box_entry(self):
+        if self["box"] is None:
+            return None
+        return generate_box_entry(self, ["CAMERA"], True)
+
+    def blend(self, indexed=False):
         """Create representation of W3DTrigger in Blender"""
         self.activator = BlenderPositionTrigger(
             self["name"],
             self["actions"],
             self["box"],
             enable_immediately=self["enabled"],
-            remain_enabled=self["remain_enabled"])
+            remain_enabled=self["remain_enabled"],
+            indexed=indexed and self["box"] is not None)
         self.activator.create_blender_objects()
         return self.activator.base_object
 
@@ -394,12 +438,11 @@ class LookAtPoint(HeadTrackTrigger):
         node = trigger_root.find("HeadTrack")
         node = node.find("Direction")
         node = node.find("PointTarget")
-        new_trigger["point"] = text2tuple(
-            node.attrib["point"], evaluator=float)
+        new_trigger["point"] = text2floats3(node.attrib["point"])
         new_trigger["angle"] = float(node.attrib["angle"])
         return new_trigger
 
-    def blend(self):
+    def blend(self, indexed=False):
         """Create representation of W3DTrigger in Blender"""
         self.activator = BlenderPointTrigger(
             self["name"],
@@ -460,12 +503,11 @@ class LookAtDirection(HeadTrackTrigger):
         node = trigger_root.find("HeadTrack")
         node = node.find("Direction")
         node = node.find("DirectionTarget")
-        new_trigger["direction"] = text2tuple(
-            node.attrib["direction"], evaluator=float)
+        new_trigger["direction"] = text2floats3(node.attrib["direction"])
         new_trigger["angle"] = float(node.attrib["angle"])
         return new_trigger
 
-    def blend(self):
+    def blend(self, indexed=False):
         """Create representation of W3DTrigger in Blender"""
         self.activator = BlenderDirectionTrigger(
             self["name"],
@@ -525,7 +567,7 @@ class LookAtObject(HeadTrackTrigger):
         new_trigger["object"] = node.attrib["name"].strip()
         return new_trigger
 
-    def blend(self):
+    def blend(self, indexed=False):
         """Create representation of W3DTrigger in Blender"""
         self.activator = BlenderLookObjectTrigger(
             self["name"],
@@ -621,14 +663,25 @@ class MovementTrigger(W3DTrigger):
         new_trigger["box"] = EventBox.fromXML(node)
         return new_trigger
 
-    def blend(self):
-        """Create representation of W3DTrigger in Blender"""
+    def trackers(self):
+        """Return list of names of Blender objects tracked by this trigger or
+        name of group containing them"""
         if self["type"] == "Single Object":
-            objects_string = "['{}']".format(self["object_name"])
+            return [generate_blender_object_name(self["object_name"])]
+        return generate_group_name(self["object_name"])
+
+    def box_entry(self):
+        return generate_box_entry(
+            self, self.trackers(), "All" not in self["type"])
+
+    def blend(self, indexed=False):
+        """Create representation of W3DTrigger in Blender"""
+        trackers = self.trackers()
+        if isinstance(trackers, str):
+            objects_string = trackers
         else:
-            objects_string = self["object_name"]
-        if "All" in self["type"]:
-            detect_any = False
+            objects_string = repr(trackers)
+        detect_any = "All" not in self["type"]
         self.activator = BlenderObjectPositionTrigger(
             self["name"],
             self["actions"],
@@ -636,6 +689,7 @@ class MovementTrigger(W3DTrigger):
             objects_string,
             enable_immediately=self["enabled"],
             remain_enabled=self["remain_enabled"],
-            detect_any=detect_any)
+            detect_any=detect_any,
+            indexed=indexed)
         self.activator.create_blender_objects()
         return self.activator.base_object
@@ -20,49 +20,538 @@
 
 import os
 import sys
-import pickle
+import binascii
+import hmac
+import json
+import queue
+import shutil
+import socket
 import subprocess
 import argparse
-from pyw3d import BLENDER_EXEC, BLENDER_PLAY
+import tempfile
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pyw3d import BLENDER_EXEC, BLENDER_PLAY, LOGGER
 from pyw3d import project
+from pyw3d.assets import describe_asset, use_asset_manifest
+from pyw3d.build_cache import build_key, cached_build, store_build, \
+    asset_files
+from pyw3d.image_cache import image_targets, downscale_image_file
+from pyw3d.errors import ExportError, BadInterchange
+from pyw3d.interchange import write_project, ProjectReader, write_record, \
+    read_record, write_end
 
 EXPORT_SCRIPT = os.path.abspath(__file__)
+WORKER_TOKEN_VARIABLE = "W3D_WORKER_TOKEN"
 
 
-def pickle_w3dproject(input_project, filename="run.p"):
-    """Dump W3DProject to pickle file"""
-    pickle.dump(input_project, open(filename, "wb"))
+def describe_assets(input_project, jobs=None):
+    """Describe the asset files of a project in parallel
 
+    Every file is hashed and its header read (see :py:mod:`pyw3d.assets`).
+    The work is shared among a pool of threads, since hashing and reading
+    release the GIL.
+
+    :param W3DProject input_project: The project to be exported
+    :param int jobs: Number of threads to use. Defaults to the number of
+    CPUs.
+    :returns: Asset manifest of the project
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    manifest = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        descriptions = [
+            (filename, executor.submit(describe_asset, filename))
+            for filename in asset_files(
+                input_project, input_project.call_directory)
+        ]
+        for filename, description in descriptions:
+            try:
+                manifest[filename] = description.result()
+            except OSError as error:
+                LOGGER.warning("Could not read {}: {}".format(
+                    filename, error))
+    return manifest
+
+
+def prepare_assets(input_project, jobs=None, manifest=None):
+    """Prepare the asset files of a project in parallel, before it is built
+
+    The files are first described (see :py:func:`describe_assets`) unless a
+    manifest is given. If the project sets max_image_size and Pillow is
+    installed, oversized images are then scaled down into the image cache
+    (see :py:mod:`pyw3d.image_cache`), also in parallel.
+
+    Asset paths are resolved against the project's call_directory rather
+    than the current directory, so projects from different directories may
+    be prepared at once (e.g. by :py:func:`export_many`).
+
+    :param W3DProject input_project: The project to be exported
+    :param int jobs: Number of threads to use. Defaults to the number of
+    CPUs.
+    :param dict manifest: Asset manifest already made by describe_assets
+    :returns: Asset manifest of the project
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if manifest is None:
+        manifest = describe_assets(input_project, jobs=jobs)
+    if input_project["max_image_size"]:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # Cached images are named by the digests in the manifest. The
+            # current directory may belong to another project, so paths are
+            # resolved against this project's own directory.
+            conversions = [
+                executor.submit(
+                    downscale_image_file,
+                    os.path.join(input_project.call_directory, filename),
+                    long_side, manifest)
+                for filename, long_side in image_targets(
+                    input_project["objects"],
+                    input_project["max_image_size"]).items()
+            ]
+            for conversion in conversions:
+                conversion.result()
+    return manifest
+
+
+def save_blend(
+        input_project, filename="run.blend", reader=None, incremental=False,
+        assets=None):
+    """Build project in Blender and save it as .blend file
+
+    Must be called from within Blender.
+
+    :param str filename: Name of .blend file to export to
+    :param reader: Optional :py:class:`pyw3d.interchange.ProjectReader` from
+    which the rest of input_project is still being read
+    :param bool incremental: If True and filename already exists, update it
+    by rebuilding only those features which have changed since it was
+    exported (see :py:mod:`pyw3d.scene_manifest`)
+    :param dict assets: Optional asset manifest prepared by
+    :py:func:`prepare_assets`
+    """
+    import bpy
+    use_asset_manifest(assets)
+    try:
+        previous = None
+        if incremental and os.path.isfile(filename):
+            previous = filename
+        input_project.blend(reader=reader, previous=previous)
+        if os.path.exists(filename):
+            os.remove(filename)
+        bpy.ops.wm.save_as_mainfile(filepath=filename)
+    finally:
+        use_asset_manifest(None)
+
+
+class BlenderWorker(object):
+    """A background Blender process which exports any number of projects
+
+    Blender is started only once, when the worker is created, so that each
+    export costs only the time taken to build and save its scene. Projects
+    are sent to Blender over a local socket in interchange format (see
+    :py:mod:`pyw3d.interchange`), and Blender is reset to its startup state
+    before each one is built.
+
+    Example::
+
+        with BlenderWorker() as worker:
+            worker.export(my_project, "preview.blend")
+
+    :param float timeout: Seconds to wait for Blender to start
+    :raises ExportError: if Blender does not connect within timeout
+    """
+    def __init__(self, timeout=60):
+        token = binascii.hexlify(os.urandom(16)).decode("ascii")
+        environment = dict(os.environ)
+        environment[WORKER_TOKEN_VARIABLE] = token
+        self._connection = None
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            listener.bind(("127.0.0.1", 0))
+            listener.listen(1)
+            listener.settimeout(timeout)
+            self.process = subprocess.Popen(
+                [
+                    BLENDER_EXEC, "--background", "--python", EXPORT_SCRIPT,
+                    "--", "--worker",
+                    "127.0.0.1:{}".format(listener.getsockname()[1])
+                ],
+                env=environment
+            )
+            while self._connection is None:
+                try:
+                    connection = listener.accept()[0]
+                except socket.timeout:
+                    self.process.kill()
+                    raise ExportError("Blender worker failed to start")
+                self._accept(connection, token)
+        finally:
+            listener.close()
+
+    def _accept(self, connection, token):
+        """Keep connection if it is from the worker process"""
+        connection.settimeout(None)
+        stream = connection.makefile("rwb")
+        try:
+            greeting = read_record(stream)
+            if hmac.compare_digest(greeting[1], token):
+                self._connection = connection
+                self._stream = stream
+                return
+        except (OSError, BadInterchange, IndexError, TypeError):
+            pass
+        LOGGER.warning("Rejected unexpected connection to Blender worker")
+        stream.close()
+        connection.close()
+
+    def is_running(self):
+        """Return True if this worker can accept further exports"""
+        return self._connection is not None
+
+    def export(
+            self, input_project, filename="run.blend", incremental=False,
+            assets=None):
+        """Export project to .blend file
+
+        :param W3DProject input_project: The project to export
+        :param str filename: Name of .blend file to export to
+        :param bool incremental: Update an existing .blend file rather than
+        rebuilding it from scratch (see :py:func:`save_blend`)
+        :param dict assets: Optional asset manifest prepared by
+        :py:func:`prepare_assets`
+        :returns: Absolute path of the .blend file written
+        :raises ExportError: if the project could not be exported
+        """
+        return self._request(
+            ["export", os.path.abspath(filename), incremental, assets],
+            input_project)
+
+    def export_file(
+            self, project_filename, filename="run.blend", incremental=False):
+        """Export project stored in XML file to .blend file
+
+        The XML is read, and its assets prepared (see
+        :py:func:`prepare_assets`), by the Blender process itself, so that
+        several workers can do so in parallel.
+
+        :param str project_filename: Filename of XML file for project
+        :param str filename: Name of .blend file to export to
+        :param bool incremental: Update an existing .blend file rather than
+        rebuilding it from scratch (see :py:func:`save_blend`)
+        :returns: Absolute path of the .blend file written
+        :raises ExportError: if the project could not be exported
+        """
+        return self._request([
+            "export_file", os.path.abspath(filename), incremental, None,
+            os.path.abspath(project_filename)
+        ])
+
+    def _request(self, job, input_project=None):
+        if self._connection is None:
+            raise ExportError("Blender worker has been closed")
+        filename = job[1]
+        try:
+            write_record(self._stream, job)
+            if input_project is None:
+                self._stream.flush()
+            else:
+                write_project(input_project, self._stream)
+            response = read_record(self._stream)
+        except (OSError, BadInterchange) as error:
+            self.close()
+            raise ExportError(
+                "Lost connection to Blender worker: {}".format(error))
+        if response is None:
+            self.close()
+            raise ExportError("Blender worker exited unexpectedly")
+        output, error = response[1:]
+        if error is not None:
+            raise ExportError("Blender failed to export {}:\n{}".format(
+                filename, error))
+        return output
+
+    def close(self):
+        """Shut down the Blender process"""
+        if self._connection is not None:
+            try:
+                write_end(self._stream)
+                self._stream.close()
+            except OSError:
+                pass
+            self._connection.close()
+            self._connection = None
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
-def unpickle_w3dproject(filename="run.p"):
-    """Create w3dproject from pickle file"""
-    return pickle.load(open(filename, "rb"))
+
+def run_worker(address):
+    """Export projects sent by a :py:class:`BlenderWorker` until it closes
+    the connection
+
+    Must be called from within Blender.
+
+    :param str address: host:port on which the BlenderWorker is listening
+    """
+    host, port = address.rsplit(":", 1)
+    connection = socket.create_connection((host, int(port)))
+    stream = connection.makefile("rwb")
+    write_record(stream, ["token", os.environ[WORKER_TOKEN_VARIABLE]])
+    stream.flush()
+    while True:
+        job = read_record(stream)
+        if job is None:
+            break
+        filename, incremental, assets = job[1:4]
+        reader = None
+        error = None
+        try:
+            project.reset_blender_state()
+            if job[0] == "export_file":
+                input_project = project.W3DProject.fromXML_file(job[4])
+                save_blend(
+                    input_project, filename=filename,
+                    incremental=incremental,
+                    assets=prepare_assets(input_project))
+            else:
+                reader = ProjectReader(stream)
+                save_blend(
+                    reader.project, filename=filename, reader=reader,
+                    incremental=incremental, assets=assets)
+        except Exception:
+            error = traceback.format_exc()
+            LOGGER.error(error)
+        if reader is not None:
+            reader.discard()
+        write_record(stream, ["result", filename, error])
+        stream.flush()
+        if reader is None and job[0] != "export_file":
+            # Position within the stream is unknown, so no further jobs can
+            # be read
+            break
+    stream.close()
+    connection.close()
+
+
+ExportResult = namedtuple(
+    "ExportResult", ["source", "output", "seconds", "error"])
+"""Outcome of exporting a single project with :py:func:`export_many`
+
+:ivar source: The W3DProject or XML filename that was exported
+:ivar str output: Absolute path of the .blend file
+:ivar float seconds: Wall time taken to export the project
+:ivar str error: Description of the failure or None if export succeeded
+"""
+
+
+def _blend_filename(project_filename, output_directory=None):
+    """Return .blend filename corresponding to given XML filename"""
+    filename = os.path.splitext(project_filename)[0] + ".blend"
+    if output_directory is not None:
+        filename = os.path.join(output_directory, os.path.basename(filename))
+    return os.path.abspath(filename)
+
+
+def export_many(
+        projects, jobs=None, output_directory=None, summary_file=None,
+        timeout=60):
+    """Export many independent projects in parallel
+
+    Projects are shared among jobs background Blender processes (see
+    :py:class:`BlenderWorker`). A failure to export one project is recorded
+    in its result and does not stop the others; a worker whose Blender
+    process dies is replaced.
+
+    :param projects: Iterable whose elements are either XML filenames or
+    (project, filename) pairs, where project is a W3DProject or XML filename
+    and filename is the .blend file to export it to. For a bare XML filename,
+    the .blend file has the same base name and is written alongside it
+    :param int jobs: Number of Blender processes to use. Defaults to the
+    number of CPUs.
+    :param str output_directory: If set, write .blend files for bare XML
+    filenames here instead
+    :param str summary_file: If set, write a JSON summary of all results to
+    this file
+    :param float timeout: Seconds to wait for each Blender process to start
+    :returns: List of :py:data:`ExportResult`, in the same order as projects
+    """
+    tasks = []
+    for item in projects:
+        if isinstance(item, str):
+            item = (item, _blend_filename(item, output_directory))
+        tasks.append((len(tasks), item[0], os.path.abspath(item[1])))
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    pending = queue.Queue()
+    for task in tasks:
+        pending.put(task)
+    results = [None] * len(tasks)
+
+    def run_jobs():
+        worker = None
+        while True:
+            try:
+                index, source, filename = pending.get_nowait()
+            except queue.Empty:
+                break
+            start_time = time.time()
+            error = None
+            try:
+                if worker is None or not worker.is_running():
+                    worker = BlenderWorker(timeout=timeout)
+                if isinstance(source, str):
+                    worker.export_file(source, filename)
+                else:
+                    worker.export(
+                        source, filename, assets=prepare_assets(source))
+            except Exception as exc:
+                error = str(exc)
+            results[index] = ExportResult(
+                source, filename, time.time() - start_time, error)
+            if error is None:
+                LOGGER.info("Exported {} in {:.1f} s".format(
+                    filename, results[index].seconds))
+            else:
+                LOGGER.error("Failed to export {}: {}".format(
+                    filename, error))
+        if worker is not None:
+            worker.close()
+
+    start_time = time.time()
+    threads = [threading.Thread(target=run_jobs) for _ in range(jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total_seconds = time.time() - start_time
+
+    if summary_file is not None:
+        summary = {
+            "jobs": jobs,
+            "seconds": total_seconds,
+            "failures": sum(result.error is not None for result in results),
+            "results": [
+                {
+                    "source": (
+                        result.source if isinstance(result.source, str)
+                        else None),
+                    "output": result.output,
+                    "seconds": result.seconds,
+                    "error": result.error
+                } for result in results
+            ]
+        }
+        with open(summary_file, "w") as summary_json:
+            json.dump(summary, summary_json, indent=2)
+    return results
 
 
 def export_to_blender(
-        input_project, filename="run.blend", display=True, fullscreen=False):
+        input_project, filename="run.blend", display=True, fullscreen=False,
+        worker=None, use_cache=True, incremental=False, assets=None):
     """Save project as .blend file
 
+    Outside of Blender, the project's assets are first described in parallel
+    (see :py:func:`describe_assets`). If an identical project with identical
+    assets has been exported before, the .blend file stored in the build
+    cache is reused (see :py:mod:`pyw3d.build_cache`). Otherwise, the assets
+    are prepared (see :py:func:`prepare_assets`) and the project is streamed
+    to a background Blender process (see :py:mod:`pyw3d.interchange`).
+
     :param str filename: Name of .blend file to export to
     :param bool display: Display project in standalone player after export?
+    :param BlenderWorker worker: If given, export using this already-running
+    Blender process rather than starting a new one
+    :param bool use_cache: If False, neither read nor write the build cache.
+    The cache is never used for projects with profiling enabled, and
+    incremental exports are never stored in it.
+    :param bool incremental: If True and filename already exists, rebuild
+    only those features which have changed since it was exported
+    :param dict assets: Asset manifest of the project, if already prepared
+    by prepare_assets
     """
     try:
         import bpy  # Check if we're in Blender environment
-        input_project.blend()
-        if os.path.exists(filename):
-            os.remove(filename)
-        bpy.ops.wm.save_as_mainfile(filepath=filename)
+        save_blend(
+            input_project, filename=filename, incremental=incremental,
+            assets=assets)
     except ImportError:
-        pickle_w3dproject(input_project)
-        subprocess.check_call([
-            BLENDER_EXEC, "--background", "--python", EXPORT_SCRIPT, "--", "-f"
-            "pickle", "run.p", "-o", os.path.abspath(filename)]
-        )
+        prepared = assets is not None
+        if not prepared:
+            assets = describe_assets(input_project)
+        key = None
+        cached_filename = None
+        if use_cache and not input_project["profile"]:
+            key = build_key(input_project, assets)
+            cached_filename = cached_build(key)
+        if cached_filename is not None:
+            LOGGER.info("Reusing cached build of {}".format(filename))
+            shutil.copyfile(cached_filename, filename)
+        else:
+            if not prepared:
+                prepare_assets(input_project, manifest=assets)
+            if worker is not None:
+                worker.export(
+                    input_project, filename=filename, incremental=incremental,
+                    assets=assets)
+            else:
+                _export_in_subprocess(
+                    input_project, filename, incremental=incremental,
+                    assets=assets)
+            if key is not None and not incremental:
+                store_build(key, filename)
     if display:
         display_blender_output(
             filename=os.path.abspath(filename), fullscreen=fullscreen)
 
 
+def _export_in_subprocess(
+        input_project, filename, incremental=False, assets=None):
+    """Export project using a new background Blender process, streaming it
+    over that process's standard input
+
+    Any asset manifest is passed to Blender in a temporary JSON file.
+    """
+    blender_call = [
+        BLENDER_EXEC, "--background", "--python", EXPORT_SCRIPT, "--",
+        "-f", "w3di", "-", "-o", os.path.abspath(filename)]
+    if incremental:
+        blender_call.append("--incremental")
+    assets_filename = None
+    if assets is not None:
+        assets_fd, assets_filename = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(assets_fd, "w") as assets_file:
+            json.dump(assets, assets_file)
+        blender_call.extend(["--assets", assets_filename])
+    try:
+        blender_process = subprocess.Popen(
+            blender_call, stdin=subprocess.PIPE)
+        try:
+            write_project(input_project, blender_process.stdin)
+            blender_process.stdin.close()
+        except BrokenPipeError:
+            # Blender exited early; report its return code below
+            pass
+        if blender_process.wait():
+            raise subprocess.CalledProcessError(
+                blender_process.returncode, blender_call)
+    finally:
+        if assets_filename is not None:
+            os.remove(assets_filename)
+
+
 def display_blender_output(filename="run.blend", fullscreen=False):
     """Display exported project using blenderplayer"""
     blender_play_call = [BLENDER_PLAY]
@@ -81,10 +570,11 @@ if __name__ == "__main__":
     else:
         argv = argv[1:]
     parser = argparse.ArgumentParser()
-    parser.add_argument("project_file")
+    parser.add_argument("project_file", nargs="*")
     parser.add_argument(
-        "-f", "--filetype", default="xml", choices=["xml", "pickle"],
-        help="input filetype")
+        "-f", "--filetype", default="xml", choices=["xml", "w3di"],
+        help="input filetype (w3di for the interchange format, in which case"
+        " project_file may be - to read from standard input)")
     parser.add_argument(
         "-o", "--output", default="run.blend",
         help="filename for output blend file")
@@ -92,12 +582,81 @@ if __name__ == "__main__":
         "-d", "--display", default=False, action="store_true")
     parser.add_argument(
         "-s", "--fullscreen", default=False, action="store_true")
+    parser.add_argument(
+        "-i", "--incremental", default=False, action="store_true",
+        help="if the output file exists, rebuild only the objects, timelines"
+        " and triggers which have changed since it was exported")
+    parser.add_argument(
+        "--project-cache", default=False, action="store_true",
+        help="read the XML project from, and store it in, the project cache"
+        " in the workspace (see pyw3d.project_cache)")
+    parser.add_argument(
+        "--assets", default=None,
+        help="JSON file holding the project's asset manifest (see"
+        " pyw3d.assets)")
+    parser.add_argument(
+        "--worker", metavar="HOST:PORT",
+        help="serve export requests from a BlenderWorker at given address")
+    parser.add_argument(
+        "-b", "--batch", default=False, action="store_true",
+        help="export each of several XML project files to a .blend file"
+        " with the same base name, in parallel")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="number of Blender processes for batch export (default: number"
+        " of CPUs)")
+    parser.add_argument(
+        "--output-dir", default=None,
+        help="directory for .blend files from batch export (default: next to"
+        " each project file)")
+    parser.add_argument(
+        "--summary", default=None,
+        help="if set, write a JSON summary of batch export to this file")
     args = parser.parse_args(argv)
+    asset_manifest = None
+    if args.assets is not None:
+        with open(args.assets) as assets_file:
+            asset_manifest = json.load(assets_file)
 
-    if args.filetype == "xml":
-        input_project = project.W3DProject.fromXML_file(args.project_file)
-    elif args.filetype == "pickle":
-        input_project = unpickle_w3dproject(args.project_file)
-    export_to_blender(
-        input_project, filename=args.output, display=args.display,
-        fullscreen=args.fullscreen)
+    if args.worker is not None:
+        run_worker(args.worker)
+    elif args.batch:
+        if args.output_dir is not None and not os.path.isdir(
+                args.output_dir):
+            os.makedirs(args.output_dir)
+        batch_results = export_many(
+            args.project_file, jobs=args.jobs,
+            output_directory=args.output_dir, summary_file=args.summary)
+        for result in batch_results:
+            print("{:<8}{:8.1f} s  {}".format(
+                "FAILED" if result.error else "OK", result.seconds,
+                result.source))
+        failures = sum(result.error is not None for result in batch_results)
+        print("{} of {} projects exported.".format(
+            len(batch_results) - failures, len(batch_results)))
+        if args.summary is not None:
+            print("Summary written to {}".format(args.summary))
+        sys.exit(1 if failures else 0)
+    elif len(args.project_file) != 1:
+        parser.error("exactly one project_file is required without --batch")
+    elif args.filetype == "xml":
+        input_project = project.W3DProject.fromXML_file(
+            args.project_file[0], use_cache=args.project_cache)
+        export_to_blender(
+            input_project, filename=args.output, display=args.display,
+            fullscreen=args.fullscreen, incremental=args.incremental,
+            assets=asset_manifest)
+    elif args.filetype == "w3di":
+        if args.project_file[0] == "-":
+            project_stream = sys.stdin.buffer
+        else:
+            project_stream = open(args.project_file[0], "rb")
+        with project_stream:
+            reader = ProjectReader(project_stream)
+            save_blend(
+                reader.project, filename=args.output, reader=reader,
+                incremental=args.incremental, assets=asset_manifest)
+        if args.display:
+            display_blender_output(
+                filename=os.path.abspath(args.output),
+                fullscreen=args.fullscreen)
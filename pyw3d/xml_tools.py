@@ -16,8 +16,28 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 
 """Convenience tools for working with W3D xml"""
+import io
 import re
+import mmap
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from collections import OrderedDict
 from .errors import BadW3DXML
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+SEPARATOR_REGEX = re.compile(r',\s*')
+"""Pattern matching the separator between elements of a sequence"""
+
+TUPLE_CACHE_SIZE = 4096
+"""Maximum number of parsed sequences remembered by text2floats3 and
+text2ints3"""
+
+_FLOATS3_CACHE = OrderedDict()
+_INTS3_CACHE = OrderedDict()
 
 
 def text2tuple(text, evaluator=str):
@@ -28,13 +48,105 @@ def text2tuple(text, evaluator=str):
     sequence. For instance "float" could be used to read in a tuple of floats.
     Default is "str", yielding a tuple of strings.
     """
-    sep_regex = re.compile(r',\s*')
     text = text.strip()
     text = text.strip("[()]")
-    data = sep_regex.split(text)
+    data = SEPARATOR_REGEX.split(text)
     return tuple([evaluator(datum) for datum in data])
 
 
+def _cache_tuple(cache, text, value):
+    """Store value for text in cache, evicting the least recently used
+    entries beyond TUPLE_CACHE_SIZE"""
+    cache[text] = value
+    while len(cache) > TUPLE_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _cached_text2tuple(text, evaluator, cache):
+    try:
+        value = cache[text]
+    except KeyError:
+        pass
+    else:
+        cache.move_to_end(text)
+        return value
+    # float and int ignore surrounding whitespace, so a plain split on ","
+    # is equivalent to splitting on SEPARATOR_REGEX here
+    data = text.strip().strip("[()]").split(",")
+    if len(data) == 3:
+        value = (evaluator(data[0]), evaluator(data[1]), evaluator(data[2]))
+    else:
+        value = tuple([evaluator(datum) for datum in data])
+    _cache_tuple(cache, text, value)
+    return value
+
+
+def text2floats3(text):
+    """Fast equivalent of text2tuple(text, evaluator=float) for vectors
+
+    The most recently used results are cached by text, since the same
+    positions and directions tend to recur many times within a project.
+    Sequences that do not have three elements are returned as-is and left to
+    the caller to validate.
+    """
+    return _cached_text2tuple(text, float, _FLOATS3_CACHE)
+
+
+def text2ints3(text):
+    """Fast equivalent of text2tuple(text, evaluator=int) for colors
+
+    Results are cached by text, as in text2floats3.
+    """
+    return _cached_text2tuple(text, int, _INTS3_CACHE)
+
+
+def texts2floats3(texts):
+    """Parse many vector strings at once, returning a list of float tuples
+
+    If NumPy is available, all well-formed three-element strings are converted
+    in a single batch; anything else falls back to text2floats3. Results are
+    added to the text2floats3 cache.
+
+    :param texts: Iterable of strings of the format accepted by text2tuple
+    """
+    texts = list(texts)
+    if np is None:
+        return [text2floats3(text) for text in texts]
+    pending = []
+    fields = []
+    for text in texts:
+        if text in _FLOATS3_CACHE:
+            continue
+        split_text = text.strip().strip("[()]").split(",")
+        if len(split_text) == 3:
+            pending.append(text)
+            fields.extend(split_text)
+    if pending:
+        try:
+            values = np.array(fields, dtype=float).reshape(-1, 3).tolist()
+        except ValueError:
+            return [text2floats3(text) for text in texts]
+        for text, value in zip(pending, values):
+            _cache_tuple(_FLOATS3_CACHE, text, tuple(value))
+    return [text2floats3(text) for text in texts]
+
+
+def preparse_positions(*roots):
+    """Batch-parse the text of every Position node beneath the given roots
+
+    This warms the text2floats3 cache so that reading the individual features
+    of a large document does not parse each position separately. Does nothing
+    if NumPy is unavailable.
+
+    :param roots: :py:class:xml.etree.ElementTree.Element nodes to search
+    """
+    if np is None:
+        return
+    texts2floats3(
+        node.text for root in roots for node in root.iter("Position")
+        if node.text is not None)
+
+
 def attrib2bool(root, attrib_name, default=None):
     """Take an xml node and try to evaluate given attribute as true/false
 
@@ -85,3 +197,315 @@ def find_xml_text(root, search):
         return search_root.text
     except AttributeError:
         return None
+
+
+class XMLField(object):
+    """Describes how one kind of child node maps onto data in a W3DFeature
+
+    :param tags: Tag (or tuple of alternative tags) of the child node
+    :param read: Callable taking (feature, node) which stores data read from
+    node in feature
+    :param write: Callable taking (feature, parent_node) which stores data
+    from feature as child node(s) of parent_node, or None if this field is
+    never written
+    :param bool repeated: If True, read every child with a matching tag.
+    Otherwise, only one match is read: the first child with the earliest of
+    the alternative tags
+    :param bool required: If True, it is an error for no child to match"""
+
+    def __init__(self, tags, read, write=None, repeated=False,
+                 required=False):
+        if isinstance(tags, str):
+            tags = (tags,)
+        self.tags = tuple(tags)
+        self.read = read
+        self.write = write
+        self.repeated = repeated
+        self.required = required
+
+
+def text_field(
+        tag, key, from_text=str, to_text=str, write_default=True):
+    """Create XMLField for a child node whose text holds a single value
+
+    :param str tag: Tag of the child node
+    :param str key: Key of the value within the feature
+    :param from_text: Function converting node text to value
+    :param to_text: Function converting value to node text
+    :param bool write_default: Write node even if value has not been set"""
+    def read(feature, node):
+        feature[key] = from_text(node.text)
+
+    def write(feature, parent_node):
+        ET.SubElement(parent_node, tag).text = to_text(feature[key])
+
+    def write_if_set(feature, parent_node):
+        if key in feature:
+            write(feature, parent_node)
+
+    if write_default:
+        return XMLField(tag, read, write)
+    return XMLField(tag, read, write_if_set)
+
+
+def feature_field(tags, key, feature_class, write_default=True):
+    """Create XMLField for a child node which holds a nested W3DFeature
+
+    :param tags: Tag (or tuple of alternative tags) of the child node
+    :param str key: Key of the nested feature within the parent feature
+    :param feature_class: Class whose fromXML is used to read the node
+    :param bool write_default: Write node even if value has not been set"""
+    def read(feature, node):
+        feature[key] = feature_class.fromXML(node)
+
+    def write(feature, parent_node):
+        if write_default or not feature.is_default(key):
+            value = feature[key]
+            if value is not None:
+                value.toXML(parent_node)
+
+    return XMLField(tags, read, write)
+
+
+class XMLCodec(object):
+    """Reads and writes the child nodes of a W3DFeature's XML node
+
+    Fields are compiled into a table mapping each tag to its XMLField when the
+    codec is created, so reading visits each child node once instead of
+    searching all children for every field. Writing visits fields in the
+    order given.
+
+    W3DObject, W3DLink, W3DPlacement and W3DSound use codecs. Other features
+    (e.g. W3DRotation and the W3DContent subclasses, whose node layout
+    depends on which kind of data they hold, as well as timelines, groups,
+    triggers and actions) still read and write their XML directly.
+
+    :param fields: XMLFields in the order their nodes should be written"""
+
+    def __init__(self, *fields):
+        self.fields = fields
+        self._readers = {}
+        for field in fields:
+            for tag in field.tags:
+                self._readers[tag] = field
+        self._writers = [
+            field.write for field in fields if field.write is not None]
+
+    def read(self, feature, node):
+        """Store data from children of node in feature
+
+        :raises BadW3DXML: If node has no child for a required field"""
+        readers = self._readers
+        read_fields = {}
+        for child in node:
+            field = readers.get(child.tag)
+            if field is None:
+                continue
+            if not field.repeated:
+                priority = field.tags.index(child.tag)
+                if read_fields.get(field, priority + 1) <= priority:
+                    continue
+                read_fields[field] = priority
+            else:
+                read_fields[field] = 0
+            field.read(feature, child)
+        for field in self.fields:
+            if field.required and field not in read_fields:
+                raise BadW3DXML(
+                    "{} node must contain {} child node".format(
+                        node.tag, field.tags[0]))
+        return feature
+
+    def write(self, feature, node):
+        """Store data from feature as children of node"""
+        for write in self._writers:
+            write(feature, node)
+        return node
+
+
+def _escape_pretty(text):
+    """Escape text or attribute data as xml.dom.minidom does when writing"""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _normalize_newlines(text):
+    """Replace line endings as an XML parser would when reading text"""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class _BlankLineFilter(object):
+    """File-like wrapper which drops every line containing only whitespace
+
+    Lines are separated by (but not terminated with) newlines in the output,
+    so the result is identical to joining the non-blank lines of the
+    unfiltered output with "\n"
+
+    :param file_: File-like object to which filtered text is written"""
+
+    def __init__(self, file_):
+        self.file_ = file_
+        self.line = []
+        self.line_written = False
+
+    def _end_line(self):
+        line = "".join(self.line)
+        if line.strip():
+            if self.line_written:
+                self.file_.write("\n")
+            self.file_.write(line)
+            self.line_written = True
+        self.line = []
+
+    def write(self, text):
+        lines = text.split("\n")
+        self.line.append(lines[0])
+        for line in lines[1:]:
+            self._end_line()
+            self.line.append(line)
+
+    def close(self):
+        """Write any remaining text"""
+        self._end_line()
+
+
+def _write_pretty_node(node, writer, indent, addindent, newl):
+    """Recursively write indented representation of node"""
+    opening = [indent, "<", node.tag]
+    for name, value in node.attrib.items():
+        opening.extend((" ", name, '="', _escape_pretty(value), '"'))
+
+    children = []
+    if node.text:
+        children.append(node.text)
+    for child in node:
+        children.append(child)
+        if child.tail:
+            children.append(child.tail)
+
+    if not children:
+        opening.extend(("/>", newl))
+        writer.write("".join(opening))
+    elif len(children) == 1 and isinstance(children[0], str):
+        opening.extend((
+            ">", _escape_pretty(_normalize_newlines(children[0])),
+            "</", node.tag, ">", newl
+        ))
+        writer.write("".join(opening))
+    else:
+        opening.extend((">", newl))
+        writer.write("".join(opening))
+        child_indent = indent + addindent
+        for child in children:
+            if isinstance(child, str):
+                writer.write(_escape_pretty("".join(
+                    (child_indent, _normalize_newlines(child), newl))))
+            else:
+                _write_pretty_node(
+                    child, writer, child_indent, addindent, newl)
+        writer.write("".join((indent, "</", node.tag, ">", newl)))
+
+
+def write_pretty_xml(root, file_, addindent="\t", newl="\n"):
+    """Write indented XML for an element tree directly to a file
+
+    Output is identical to serializing root with ElementTree, reparsing it
+    with xml.dom.minidom, calling toprettyxml, and removing all blank lines,
+    but no intermediate string or DOM is created.
+
+    :param xml.etree.ElementTree.Element root: Root node of tree to write
+    :param file_: Text file-like object to write to
+    :param str addindent: Indentation added for each level of the tree
+    :param str newl: String written after each node"""
+    writer = _BlankLineFilter(file_)
+    writer.write('<?xml version="1.0" ?>')
+    writer.write(newl)
+    _write_pretty_node(root, writer, "", addindent, newl)
+    writer.close()
+    return file_
+
+
+def pretty_xml_node(node, level=0, addindent="\t", newl="\n"):
+    """Return indented XML for a single node as it would appear at the given
+    depth of a document written by write_pretty_xml
+
+    The result begins with the node's opening tag (without leading
+    indentation) and has no trailing newline.
+
+    :param xml.etree.ElementTree.Element node: Node to write
+    :param int level: Depth of node within its document"""
+    xml_file = io.StringIO()
+    writer = _BlankLineFilter(xml_file)
+    indent = addindent * level
+    _write_pretty_node(node, writer, indent, addindent, newl)
+    writer.close()
+    return xml_file.getvalue()[len(indent):]
+
+
+def index_xml_nodes(filename, max_depth=2):
+    """Find the byte range of every node of an XML file down to a given depth
+    without building an element tree
+
+    :param str filename: The XML file to index
+    :param int max_depth: Deepest level of nodes to be indexed (the root node
+    is at depth 0)
+    :returns: A list of (depth, parent_tag, tag, attrib, start, end) tuples in
+    document order, where start and end are byte offsets such that
+    data[start:end] is the complete serialized node
+    :raises BadW3DXML: if the file is not well-formed XML
+    """
+    nodes = []
+    open_nodes = []  # [tag, attrib, start, has_content] for each open node
+    with open(filename, "rb") as xml_file:
+        data = mmap.mmap(xml_file.fileno(), 0, access=mmap.ACCESS_READ)
+        parser = xml.parsers.expat.ParserCreate()
+
+        def mark_content(*args):
+            if open_nodes:
+                open_nodes[-1][3] = True
+
+        def start_node(tag, attrib):
+            mark_content()
+            open_nodes.append([tag, attrib, parser.CurrentByteIndex, False])
+
+        def end_node(tag):
+            tag, attrib, start, has_content = open_nodes.pop()
+            depth = len(open_nodes)
+            if depth > max_depth:
+                return
+            end = parser.CurrentByteIndex
+            # Expat reports the end of an empty-element tag (<Tag/>) just
+            # past the node, with no events between its start and end, and
+            # the end of any other node at the start of its end tag
+            if has_content or data[end - 2:end] != b"/>":
+                end = data.find(b">", end) + 1
+            if depth:
+                parent_tag = open_nodes[-1][0]
+            else:
+                parent_tag = None
+            nodes.append((depth, parent_tag, tag, attrib, start, end))
+
+        parser.StartElementHandler = start_node
+        parser.EndElementHandler = end_node
+        parser.CharacterDataHandler = mark_content
+        parser.CommentHandler = mark_content
+        parser.ProcessingInstructionHandler = mark_content
+        parser.StartCdataSectionHandler = mark_content
+        try:
+            parser.Parse(data, True)
+        except xml.parsers.expat.ExpatError as parse_error:
+            raise BadW3DXML("Could not parse {}: {}".format(
+                filename, parse_error))
+        finally:
+            data.close()
+    nodes.sort(key=lambda node: node[4])
+    return nodes
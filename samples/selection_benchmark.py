@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A benchmark of selecting objects while building large projects
+
+Must be run from within Blender, e.g.::
+
+    blender --background --python selection_benchmark.py
+
+For scenes of increasing size, compares the time taken to select each new
+object by deselecting every selectable object (as W3DObject.blend once did)
+with the time taken by SelectionManager, then times W3DProject.blend for
+projects of the same sizes. If no step is quadratic, the time per object
+stays roughly constant as the number of objects grows.
+"""
+
+import time
+import bpy
+from pyw3d import project, objects, placement
+from pyw3d.selection import SelectionManager
+
+SIZES = (1000, 2500, 5000, 10000)
+
+
+def legacy_select(blender_object):
+    """Select object as W3DObject.blend originally did"""
+    for object_ in bpy.context.selectable_objects:
+        object_.select = False
+    blender_object.select = True
+    bpy.context.scene.objects.active = blender_object
+
+
+def build_scene(size):
+    """Return list of size new empties linked to a fresh scene"""
+    project.reset_blender_state()
+    new_objects = []
+    for index in range(size):
+        new_object = bpy.data.objects.new("empty{}".format(index), None)
+        bpy.context.scene.objects.link(new_object)
+        new_objects.append(new_object)
+    return new_objects
+
+
+def time_selection(size, select):
+    """Return seconds taken to select each of size objects in turn"""
+    new_objects = build_scene(size)
+    start = time.perf_counter()
+    for new_object in new_objects:
+        select(new_object)
+    return time.perf_counter() - start
+
+
+def build_project(size):
+    """Create a project with size simple objects"""
+    my_project = project.W3DProject()
+    for index in range(size):
+        my_project["objects"].append(objects.W3DObject(
+            name="elem{}".format(index),
+            placement=placement.W3DPlacement(
+                position=(index % 100, index // 100, -10)),
+            content=objects.W3DText(text="W3D")
+        ))
+    return my_project
+
+
+def time_blend(size):
+    """Return seconds taken to build a project with size objects"""
+    my_project = build_project(size)
+    project.reset_blender_state()
+    start = time.perf_counter()
+    my_project.blend()
+    return time.perf_counter() - start
+
+
+def main():
+    print("{:>8}{:>20}{:>20}{:>20}".format(
+        "objects", "legacy (us/obj)", "manager (us/obj)", "blend (ms/obj)"))
+    for size in SIZES:
+        legacy = time_selection(size, legacy_select)
+        managed = time_selection(size, SelectionManager.select_only)
+        blend = time_blend(size)
+        print("{:>8}{:>20.1f}{:>20.1f}{:>20.3f}".format(
+            size, legacy / size * 1e6, managed / size * 1e6,
+            blend / size * 1e3))
+
+
+if __name__ == "__main__":
+    main()
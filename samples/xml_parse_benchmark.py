@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# Copyright (C) 2016 William Hicks
+#
+# This file is part of Writing3D.
+#
+# Writing3D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+
+"""A micro-benchmark for parsing tuples from W3D XML
+
+Builds a project of roughly the same size as performance.py (without
+exporting it to Blender) and compares the time taken to parse its positions,
+colors and vectors with the generic text2tuple and the specialized
+text2floats3/text2ints3 helpers.
+"""
+
+import re
+import timeit
+from random import randint
+from math import pi, sin, cos
+import xml.etree.ElementTree as ET
+from pyw3d import project, objects, placement, xml_tools
+
+REPEATS = 25
+
+
+def legacy_text2tuple(text, evaluator=str):
+    """text2tuple as originally written, compiling its pattern on every
+    call"""
+    sep_regex = re.compile(r',\s*')
+    text = text.strip()
+    text = text.strip("[()]")
+    data = sep_regex.split(text)
+    return tuple([evaluator(datum) for datum in data])
+
+
+def build_project(theta_div=20, phi_div=10, radius=10):
+    """Create a project with the objects of performance.py"""
+    my_project = project.W3DProject()
+    for i in range(1, theta_div):
+        for j in range(phi_div):
+            theta = pi / theta_div * i
+            phi = 2 * pi / phi_div * j
+            for offset, prefix in ((0, "elem"), (-2, "shape"), (-3, "image"),
+                                   (5, "room"), (8, "system")):
+                my_project["objects"].append(objects.W3DObject(
+                    name="{}{}x{}".format(prefix, i, j),
+                    color=(randint(0, 255), randint(0, 255), randint(0, 255)),
+                    placement=placement.W3DPlacement(
+                        position=(
+                            (radius + offset) * sin(theta) * cos(phi),
+                            (radius + offset) * sin(theta) * sin(phi),
+                            (radius + offset) * cos(theta)
+                        ),
+                        rotation=placement.W3DRotation(
+                            rotation_mode="LookAt",
+                            rotation_vector=(0, 0, 0)
+                        )
+                    ),
+                    content=objects.W3DText(text="W3D")
+                ))
+    return my_project
+
+
+def best_time(func):
+    """Return the best of REPEATS timings of func, in milliseconds"""
+    return min(timeit.repeat(func, number=1, repeat=REPEATS)) * 1000
+
+
+def clear_caches():
+    xml_tools._FLOATS3_CACHE.clear()
+    xml_tools._INTS3_CACHE.clear()
+
+
+def main():
+    project_root = build_project().toXML()
+    xml_text = ET.tostring(project_root)
+    position_texts = [
+        node.text for node in project_root.iter("Position")]
+    vector_texts = [
+        node.attrib["target"] for node in project_root.iter("LookAt")]
+    color_texts = [node.text for node in project_root.iter("Color")]
+    float_texts = position_texts + vector_texts
+
+    print("{} float vectors, {} colors".format(
+        len(float_texts), len(color_texts)))
+
+    def legacy():
+        for text in float_texts:
+            legacy_text2tuple(text, evaluator=float)
+        for text in color_texts:
+            legacy_text2tuple(text, evaluator=int)
+
+    def generic():
+        for text in float_texts:
+            xml_tools.text2tuple(text, evaluator=float)
+        for text in color_texts:
+            xml_tools.text2tuple(text, evaluator=int)
+
+    def specialized_cold():
+        clear_caches()
+        for text in float_texts:
+            xml_tools.text2floats3(text)
+        for text in color_texts:
+            xml_tools.text2ints3(text)
+
+    def specialized_warm():
+        for text in float_texts:
+            xml_tools.text2floats3(text)
+        for text in color_texts:
+            xml_tools.text2ints3(text)
+
+    def batch():
+        clear_caches()
+        xml_tools.texts2floats3(float_texts)
+
+    results = [
+        ("Legacy text2tuple", legacy),
+        ("text2tuple", generic),
+        ("text2floats3/text2ints3 (cold)", specialized_cold),
+        ("text2floats3/text2ints3 (warm)", specialized_warm),
+        ("texts2floats3 (NumPy: {})".format(xml_tools.np is not None),
+         batch)
+    ]
+    for label, func in results:
+        print("{:<40}{:8.3f} ms".format(label, best_time(func)))
+
+    def load():
+        clear_caches()
+        project.W3DProject.fromXML(ET.fromstring(xml_text))
+    print("{:<40}{:8.3f} ms".format("W3DProject.fromXML", best_time(load)))
+
+
+if __name__ == "__main__":
+    main()
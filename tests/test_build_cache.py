@@ -0,0 +1,54 @@
+"""Tests for pyw3d.build_cache"""
+import os
+import shutil
+import tempfile
+import unittest
+from pyw3d.project import W3DProject
+from pyw3d.objects import W3DObject, W3DImage
+from pyw3d.build_cache import asset_files, build_key
+
+
+class TestAssetPaths(unittest.TestCase):
+    """Asset files of a project are found relative to its call directory,
+    whatever the current directory"""
+
+    def setUp(self):
+        self.original_directory = os.getcwd()
+        self.root = tempfile.mkdtemp()
+        self.projects = {}
+        for name in ("A", "B"):
+            directory = os.path.join(self.root, name)
+            os.makedirs(os.path.join(directory, "images"))
+            with open(os.path.join(directory, "images", "x.png"), "wb") as (
+                    image_file):
+                image_file.write(name.encode("utf-8"))
+            project = W3DProject(call_directory=directory)
+            project["objects"].append(W3DObject(
+                name="image", content=W3DImage(filename="images/x.png")))
+            self.projects[name] = project
+        # Loading B last leaves the current directory in B's directory
+        self.assertEqual(
+            os.path.realpath(os.getcwd()),
+            os.path.realpath(os.path.join(self.root, "B")))
+
+    def tearDown(self):
+        os.chdir(self.original_directory)
+        shutil.rmtree(self.root)
+
+    def test_asset_files(self):
+        project = self.projects["A"]
+        self.assertEqual(
+            asset_files(project, project.call_directory),
+            [os.path.join(self.root, "A", "images", "x.png")])
+
+    def test_build_key_changes_with_asset(self):
+        project = self.projects["A"]
+        original_key = build_key(project)
+        with open(os.path.join(self.root, "A", "images", "x.png"), "ab") as (
+                image_file):
+            image_file.write(b"edited")
+        self.assertNotEqual(build_key(project), original_key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -51,7 +51,7 @@ class ListInput(ProjectInput, ScrollableFrame):
                     self._elem_count += 1
             except AttributeError:
                 pass
-        self.project_path.get_element().append(initial_value)
+        self.project_path.append_element(initial_value)
         self.entry_widgets.append(tk.Frame(self.entry_widgets[0]))
         self.entry_widgets[-1].pack(fill=tk.X, expand=1)
         creator_kwargs = {
@@ -217,7 +217,7 @@ class DictInput(ProjectInput, ScrollableFrame):
             value_widget = self.value_widgets[pair_index]
             old_key = value_widget.project_path.get_specifier()
             value_widget.project_path = new_path
-            del self.project_path.get_element()[old_key]
+            self.project_path.create_child_path(old_key).del_element()
         else:
             self._add_value(self, pair_index, initial_value=initial_value)
 